@@ -0,0 +1,16 @@
+"""
+Performance benchmarks for the API.
+
+These are not part of the regular test run. Run them with:
+
+    python manage.py test benchmarks --pattern="bench_*.py"
+
+bench_endpoints compares every route with baselines.json; refresh it with
+BENCH_UPDATE_BASELINES=1.
+
+bench_serialization compares the rows/second of compiled serializers with
+their DRF serializers on 10k-issue pages.
+
+load_servers is a script comparing the WSGI and ASGI deployments under
+concurrent load; run it with ``python benchmarks/load_servers.py --help``.
+"""
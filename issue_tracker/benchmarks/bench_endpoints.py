@@ -0,0 +1,324 @@
+"""
+Query-count and latency regression checks of every API route.
+
+Each route is requested against datasets generated by ``core.seed`` at
+every size of BENCH_SIZES. The query count, SQL time and wall-clock
+percentiles of each route are compared with ``baselines.json``:
+
+* a route may not run more queries than its baseline at a size;
+* paginated routes must run as many queries for large pages as for small
+  ones;
+* the median latency may not exceed its baseline by more than
+  BENCH_LATENCY_TOLERANCE (plus BENCH_LATENCY_SLACK_MS, absorbing noise
+  on fast routes).
+
+Latency baselines depend on the machine; record new ones with
+BENCH_UPDATE_BASELINES=1 after an intended change or on a new machine.
+"""
+import json
+import os
+import time
+from itertools import count
+from pathlib import Path
+from statistics import median, quantiles
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from core.models import Comment, Issue, Project, ProjectMembership
+from core.seed import SEED_PASSWORD, Seeder
+from user.serializers import TokenObtainPairSerializer
+
+SIZES = [
+    int(size) for size in os.getenv('BENCH_SIZES', '2000,20000').split(',')
+]
+REPEATS = int(os.getenv('BENCH_REPEATS', 15))
+LATENCY_TOLERANCE = float(os.getenv('BENCH_LATENCY_TOLERANCE', 2.0))
+LATENCY_SLACK_MS = float(os.getenv('BENCH_LATENCY_SLACK_MS', 5))
+UPDATE_BASELINES = bool(os.getenv('BENCH_UPDATE_BASELINES'))
+BASELINES = Path(__file__).with_name('baselines.json')
+PAGE_SIZES = (10, 100)
+
+USERS = 200
+PROJECTS = 20
+
+_numbers = count()
+
+
+def _issue(context):
+    return {'title': 'Benchmark issue', 'assigned_to_id': context.user.id}
+
+
+# Fixtures of the write routes, created before each request is measured.
+def _new_issue(context):
+    return Issue.objects.create(
+        project_id=context.project_id, created_by=context.user,
+        assigned_to=context.user, title='Benchmark issue',
+    )
+
+
+def _new_comment(context):
+    return Comment.objects.create(
+        issue=context.issue, created_by=context.user, text='Benchmark'
+    )
+
+
+def _new_project(context):
+    project = Project.objects.create(
+        name='Benchmark project', created_by=context.user
+    )
+    ProjectMembership.objects.create(
+        user=context.user, project=project, role='admin'
+    )
+    return project
+
+
+def _new_user(context):
+    return get_user_model().objects.create_user(
+        email=f'bench{next(_numbers)}@example.com', name='Bench'
+    )
+
+
+def _new_member(context):
+    user = _new_user(context)
+    ProjectMembership.objects.create(
+        user=user, project_id=context.project_id, role='member'
+    )
+    return user
+
+
+def _matching_url(context):
+    url = reverse(
+        'projects:project-issues-bulk-matching', args=[context.project_id]
+    )
+    return f'{url}?assigned_to={context.user.id}'
+
+
+# (name, method, URL name, URL args, params or payload, paginated).
+# URL args and payloads may be callables of the test case, called before
+# every request; the URL name may be a callable returning the URL.
+ROUTES = [
+    ('issue-list', 'get', 'issues:issue-list', (), {}, True),
+    ('issue-assigned', 'get', 'issues:issue-assigned', (), {}, True),
+    ('issue-detail', 'get', 'issues:issue-detail',
+     lambda c: [c.issue.id], {}, False),
+    ('issue-comments', 'get', 'issues:issue-comments',
+     lambda c: [c.issue.id], {}, False),
+    ('issue-search', 'get', 'issues:issue-search', (),
+     {'q': 'synthetic'}, False),
+    ('comment-detail', 'get', 'issues:comment-detail',
+     lambda c: [c.comment.id], {}, False),
+    ('project-list', 'get', 'projects:project-list', (), {}, False),
+    ('project-detail', 'get', 'projects:project-detail',
+     lambda c: [c.project_id], {}, False),
+    ('project-stats', 'get', 'projects:project-stats',
+     lambda c: [c.project_id], {}, False),
+    ('project-members', 'get', 'projects:project-members',
+     lambda c: [c.project_id], {}, False),
+    ('project-memberships', 'get', 'projects:project-memberships',
+     lambda c: [c.project_id], {}, False),
+    ('project-issues', 'get', 'projects:project-issues',
+     lambda c: [c.project_id], {}, True),
+    ('project-issues-export', 'get', 'projects:project-issues-export',
+     lambda c: [c.project_id], {'format': 'ndjson'}, False),
+    ('user-me', 'get', 'user:me', (), {}, False),
+    ('issue-create', 'post', 'projects:project-issues',
+     lambda c: [c.project_id], _issue, False),
+    ('issue-update', 'patch', 'issues:issue-detail',
+     lambda c: [c.issue.id], {'status': 'Closed'}, False),
+    ('comment-create', 'post', 'issues:issue-comments',
+     lambda c: [c.issue.id], {'text': 'Benchmark comment'}, False),
+    ('issue-bulk-create', 'post', 'projects:project-issues-bulk',
+     lambda c: [c.project_id], lambda c: [_issue(c)] * 10, False),
+    ('user-create', 'post', 'user:create', (), lambda c: {
+        'email': f'bench{next(_numbers)}@example.com',
+        'password': 'testpass123',
+        'name': 'Bench',
+    }, False),
+    ('token-obtain', 'post', 'user:token_obtain_pair', (), lambda c: {
+        'email': c.user.email, 'password': SEED_PASSWORD,
+    }, False),
+    ('token-refresh', 'post', 'user:token_refresh', (), lambda c: {
+        'refresh': str(TokenObtainPairSerializer.get_token(c.user)),
+    }, False),
+    ('issue-delete', 'delete', 'issues:issue-detail',
+     lambda c: [_new_issue(c).id], {}, False),
+    ('comment-update', 'patch', 'issues:comment-detail',
+     lambda c: [c.comment.id], {'text': 'Benchmark edit'}, False),
+    ('comment-delete', 'delete', 'issues:comment-detail',
+     lambda c: [_new_comment(c).id], {}, False),
+    ('issue-changes', 'get', 'projects:project-issues-changes',
+     lambda c: [c.project_id], {}, False),
+    ('issue-bulk-update', 'patch', 'projects:project-issues-bulk',
+     lambda c: [c.project_id], lambda c: [
+         {'id': issue_id, 'priority': 'High'} for issue_id in c.bulk_ids
+     ], False),
+    ('issue-bulk-delete', 'delete', 'projects:project-issues-bulk',
+     lambda c: [c.project_id],
+     lambda c: {'ids': [_new_issue(c).id for _ in range(10)]}, False),
+    ('issue-bulk-matching', 'patch', _matching_url, (),
+     {'priority': 'High'}, False),
+    ('project-create', 'post', 'projects:project-list', (),
+     {'name': 'Benchmark project'}, False),
+    ('project-update', 'patch', 'projects:project-detail',
+     lambda c: [c.project_id], {'description': 'Benchmark'}, False),
+    ('project-delete', 'delete', 'projects:project-detail',
+     lambda c: [_new_project(c).id], {}, False),
+    ('project-member-add', 'post', 'projects:project-add_member',
+     lambda c: [c.project_id],
+     lambda c: {'email': _new_user(c).email, 'role': 'member'}, False),
+    ('project-member-remove', 'delete', 'projects:project-remove_member',
+     lambda c: [c.project_id],
+     lambda c: {'email': _new_member(c).email}, False),
+    ('slow-queries', 'get', 'slow-queries', (), {}, False),
+    ('metrics', 'get', 'metrics', (), {}, False),
+]
+
+_results = {}
+
+
+def _load_baselines():
+    if not BASELINES.exists():
+        return {}
+    return json.loads(BASELINES.read_text())
+
+
+def tearDownModule():
+    if not UPDATE_BASELINES:
+        return
+    baselines = _load_baselines()
+    for (name, size), result in sorted(_results.items()):
+        baselines.setdefault(name, {})[str(size)] = {
+            'queries': result['queries'],
+            'p50_ms': result['p50_ms'],
+        }
+    BASELINES.write_text(
+        json.dumps(baselines, indent=2, sort_keys=True) + '\n'
+    )
+    print(f'\nWrote {BASELINES}')
+
+
+# Measure the queries rather than the response cache.
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+})
+class EndpointBenchmark(APITestCase):
+    """Every route must stay within its query and latency baselines."""
+    # Set by the subclasses generated for every size of SIZES.
+    size = None
+
+    @classmethod
+    def setUpTestData(cls):
+        seeder = Seeder(seed=cls.size)
+        user_ids = seeder.create_users(USERS)
+        teams = seeder.create_projects(PROJECTS, user_ids)
+        seeder.create_issues(cls.size, teams)
+        seeder.recount(teams)
+        # The owner of the largest project.
+        cls.project_id, members = teams[0]
+        cls.user = get_user_model().objects.get(id=members[0])
+        # Staff may read the slow queries and metrics.
+        cls.user.is_staff = True
+        cls.user.save(update_fields=['is_staff'])
+        cls.issue = Issue.objects.filter(project_id=cls.project_id).first()
+        cls.bulk_ids = list(Issue.objects.filter(
+            project_id=cls.project_id
+        ).values_list('id', flat=True)[:10])
+        cls.comment = Comment.objects.filter(
+            issue__project_id=cls.project_id
+        ).first()
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # /metrics is a plain Django view, authenticated by the session.
+        self.client.force_login(self.user)
+
+    def _request(self, method, url, data):
+        if method == 'get':
+            res = self.client.get(url, data)
+        else:
+            res = getattr(self.client, method)(url, data, format='json')
+        if res.streaming:
+            b''.join(res.streaming_content)
+        self.assertLess(res.status_code, 400, f'{method} {url}: {res}')
+        return res
+
+    def _url(self, url_name, args):
+        if callable(url_name):
+            return url_name(self)
+        return reverse(url_name, args=args(self) if callable(args) else args)
+
+    def measure(self, method, url_name, args, data):
+        """Return the queries, SQL time and latency of a request."""
+        queries, sql_times, samples = [], [], []
+        for _ in range(REPEATS):
+            url = self._url(url_name, args)
+            payload = data(self) if callable(data) else data
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                self._request(method, url, payload)
+                samples.append((time.perf_counter() - start) * 1000)
+            queries.append(len(ctx.captured_queries))
+            sql_times.append(sum(
+                float(query['time']) for query in ctx.captured_queries
+            ) * 1000)
+        return {
+            # The first request may warm in-process caches.
+            'queries': max(queries[1:] or queries),
+            'sql_ms': round(median(sql_times), 2),
+            'p50_ms': round(median(samples), 2),
+            'p95_ms': round(quantiles(samples, n=20)[-1], 2)
+            if len(samples) > 1 else samples[0],
+        }
+
+    def test_routes(self):
+        baselines = _load_baselines()
+        print(f'\n{self.size} issues')
+        print(f'{"route":<24} {"queries":>7} {"sql ms":>8} {"p50 ms":>8} '
+              f'{"p95 ms":>8}')
+        for name, method, url_name, args, data, paginated in ROUTES:
+            with self.subTest(route=name, size=self.size):
+                if paginated:
+                    data = {'page_size': PAGE_SIZES[0]}
+                result = self.measure(method, url_name, args, data)
+                _results[name, self.size] = result
+                print(f'{name:<24} {result["queries"]:>7} '
+                      f'{result["sql_ms"]:>8.2f} {result["p50_ms"]:>8.2f} '
+                      f'{result["p95_ms"]:>8.2f}')
+
+                if paginated:
+                    large = self.measure(
+                        method, url_name, args, {'page_size': PAGE_SIZES[-1]}
+                    )
+                    self.assertEqual(
+                        large['queries'], result['queries'],
+                        f'{name} runs more queries for larger pages',
+                    )
+
+                baseline = baselines.get(name, {}).get(str(self.size))
+                if UPDATE_BASELINES or baseline is None:
+                    continue
+                self.assertLessEqual(
+                    result['queries'], baseline['queries'],
+                    f'{name} runs more queries than its baseline',
+                )
+                self.assertLessEqual(
+                    result['p50_ms'],
+                    baseline['p50_ms'] * LATENCY_TOLERANCE + LATENCY_SLACK_MS,
+                    f'{name} is slower than its baseline',
+                )
+
+
+for _size in SIZES:
+    _name = f'EndpointBenchmark{_size}'
+    globals()[_name] = type(_name, (EndpointBenchmark,), {'size': _size})
+del EndpointBenchmark
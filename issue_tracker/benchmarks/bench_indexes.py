@@ -0,0 +1,149 @@
+"""
+Check that the hot endpoint queries are served by indexes.
+
+Every query the main endpoints run against a seeded dataset is captured
+and EXPLAINed; a full table scan of any table fails the check. Set
+BENCH_ISSUES to change the dataset size and BENCH_VERBOSE=1 to print
+each query with its plan.
+"""
+import os
+import random
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from core.models import Issue, Label, Project, ProjectMembership
+from core.tests.utils import create_user
+
+ISSUES = int(os.getenv('BENCH_ISSUES', 1000000))
+USERS = 200
+PROJECTS = 100
+LABELS = 20
+BATCH_SIZE = 10000
+
+# SQLite reports "SCAN <table>" for full scans and "SEARCH <table> USING
+# ..." or "SCAN <table> USING [COVERING] INDEX" when an index is used.
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)')
+POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain(sql):
+    """Return the plan of sql as a list of lines."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(sql):
+    """Return the tables read by a full scan in the plan of sql."""
+    pattern = SQLITE_FULL_SCAN if connection.vendor == 'sqlite' \
+        else POSTGRES_FULL_SCAN
+    return [
+        match.group(1)
+        for line in explain(sql)
+        for match in pattern.finditer(line)
+    ]
+
+
+class IndexUsageBenchmark(APITestCase):
+    """The main endpoint queries must use index scans at scale."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.user = create_user()
+        users = [cls.user] + get_user_model().objects.bulk_create(
+            get_user_model()(email=f'user{i}@example.com', name=f'User {i}')
+            for i in range(1, USERS)
+        )
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {i}', created_by=rng.choice(users))
+            for i in range(PROJECTS)
+        )
+        ProjectMembership.objects.bulk_create(
+            ProjectMembership(
+                user=user,
+                project=project,
+                role='admin' if user == project.created_by else 'developer',
+            )
+            for project in projects
+            for user in {project.created_by, cls.user, rng.choice(users)}
+        )
+        labels = Label.objects.bulk_create(
+            Label(name=f'label{i}') for i in range(LABELS)
+        )
+        cls.project = projects[0]
+
+        IssueLabel = Issue.labels.through
+        for start in range(0, ISSUES, BATCH_SIZE):
+            issues = Issue.objects.bulk_create(
+                Issue(
+                    title=f'Issue {i}',
+                    created_by=rng.choice(users),
+                    assigned_to=rng.choice(users),
+                    project=rng.choice(projects),
+                    status=rng.choice(['Open', 'Open', 'Closed']),
+                )
+                for i in range(start, min(start + BATCH_SIZE, ISSUES))
+            )
+            IssueLabel.objects.bulk_create(
+                IssueLabel(issue_id=issue.id, label_id=label.id)
+                for issue in issues
+                for label in rng.sample(labels, rng.randint(0, 2))
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertIndexed(self, url, params=None):
+        """Assert no query run by GET url does a full table scan."""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, 200)
+
+        for query in ctx.captured_queries:
+            with self.subTest(url=url, sql=query['sql']):
+                if os.getenv('BENCH_VERBOSE'):
+                    print(query['sql'], *explain(query['sql']), sep='\n  ')
+                self.assertEqual(full_scans(query['sql']), [])
+
+    def test_issue_list(self):
+        self.assertIndexed(reverse('issues:issue-list'))
+
+    def test_assigned_issues(self):
+        self.assertIndexed(reverse('issues:issue-assigned'))
+
+    def test_project_issues(self):
+        self.assertIndexed(
+            reverse('projects:project-issues', args=[self.project.id])
+        )
+
+    def test_project_issues_by_label(self):
+        self.assertIndexed(
+            reverse('projects:project-issues', args=[self.project.id]),
+            {'labels': 'label1,label2'},
+        )
+
+    def test_project_list(self):
+        self.assertIndexed(reverse('projects:project-list'))
+
+    def test_project_detail(self):
+        self.assertIndexed(
+            reverse('projects:project-detail', args=[self.project.id])
+        )
+
+    def test_project_memberships(self):
+        self.assertIndexed(
+            reverse('projects:project-memberships', args=[self.project.id])
+        )
@@ -0,0 +1,92 @@
+"""
+Benchmark page latency of the cursor-paginated issue lists.
+"""
+import os
+import time
+from statistics import median
+
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+from rest_framework.pagination import Cursor
+
+from core.models import Issue
+from core.pagination import IssueCursorPagination
+from core.tests.utils import create_project, create_user
+
+PAGE_SIZE = 10
+DEEPEST_PAGE = int(os.getenv('BENCH_DEEPEST_PAGE', 10000))
+SAMPLED_PAGES = [1, 10, 100, 1000, DEEPEST_PAGE]
+REPEATS = int(os.getenv('BENCH_REPEATS', 15))
+BATCH_SIZE = 5000
+
+# Deep pages may be at most this many times slower than the first page.
+TOLERANCE = 3.0
+
+
+# Measure the queries rather than the response cache.
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+})
+class CursorPaginationBenchmark(APITestCase):
+    """Page latency must stay flat from the first to the deepest page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+        cls.project = create_project(user=cls.user)
+        total = PAGE_SIZE * DEEPEST_PAGE
+        for start in range(0, total, BATCH_SIZE):
+            Issue.objects.bulk_create(
+                Issue(
+                    title=f'Issue {i}',
+                    created_by=cls.user,
+                    assigned_to=cls.user,
+                    project=cls.project,
+                )
+                for i in range(start, min(start + BATCH_SIZE, total))
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _page_url(self, page):
+        """Return the cursor URL of a page without walking the pages."""
+        url = reverse('projects:project-issues', args=[self.project.id])
+        if page == 1:
+            return f'{url}?page_size={PAGE_SIZE}'
+
+        position = Issue.objects.order_by('-id').values_list(
+            'id', flat=True
+        )[(page - 1) * PAGE_SIZE - 1]
+        paginator = IssueCursorPagination()
+        paginator.base_url = f'http://testserver{url}?page_size={PAGE_SIZE}'
+        return paginator.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+
+    def _median_latency(self, url):
+        """Return the median wall-clock latency of a GET in milliseconds."""
+        samples = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            res = self.client.get(url)
+            samples.append((time.perf_counter() - start) * 1000)
+            self.assertEqual(len(res.data['results']), PAGE_SIZE)
+        return median(samples)
+
+    def test_page_latency_is_flat(self):
+        """Benchmark sampled pages up to the deepest page."""
+        latencies = {
+            page: self._median_latency(self._page_url(page))
+            for page in SAMPLED_PAGES
+        }
+
+        print('\npage       median ms')
+        for page, latency in latencies.items():
+            print(f'{page:<10} {latency:9.2f}')
+
+        self.assertLess(
+            latencies[DEEPEST_PAGE], latencies[1] * TOLERANCE
+        )
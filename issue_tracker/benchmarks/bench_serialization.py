@@ -0,0 +1,95 @@
+"""
+Benchmark rendering 10k-issue pages with compiled serializers.
+"""
+import os
+import time
+from statistics import median
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from core.compiled_serializers import compile_serializer
+from core.models import Issue, Label
+from core.query_plan import plan_queryset
+from core.renderers import FastJSONRenderer
+from core.tests.utils import create_project, create_user
+from issues.serializers import IssueDetailSerializer, IssueSerializer
+
+ROWS = int(os.getenv('BENCH_SERIALIZED_ROWS', 10000))
+REPEATS = int(os.getenv('BENCH_REPEATS', 5))
+BATCH_SIZE = 5000
+LABELS = 20
+
+
+class CompiledSerializationBenchmark(APITestCase):
+    """Compiled pages must render the same bytes, faster."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            create_user(email=f'user{i}@example.com', name=f'User {i}')
+            for i in range(10)
+        ]
+        project = create_project(user=users[0])
+        labels = Label.objects.bulk_create(
+            Label(name=f'label-{i}') for i in range(LABELS)
+        )
+        for start in range(0, ROWS, BATCH_SIZE):
+            Issue.objects.bulk_create(
+                Issue(
+                    title=f'Issue {i}',
+                    description=f'Description of issue {i}',
+                    created_by=users[i % len(users)],
+                    assigned_to=users[i * 7 % len(users)],
+                    project=project,
+                )
+                for i in range(start, min(start + BATCH_SIZE, ROWS))
+            )
+        Issue.labels.through.objects.bulk_create(
+            Issue.labels.through(issue_id=issue_id, label=labels[i % LABELS])
+            for i, issue_id in enumerate(
+                Issue.objects.values_list('id', flat=True)
+            )
+        )
+
+    def _median_seconds(self, render):
+        """Return the median wall-clock time of render() and its output."""
+        samples = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            output = render()
+            samples.append(time.perf_counter() - start)
+        return median(samples), output
+
+    def _compare(self, serializer_class):
+        queryset = Issue.objects.order_by('-id')[:ROWS]
+        compiled = compile_serializer(serializer_class)
+
+        def serializer_page():
+            data = serializer_class(
+                plan_queryset(queryset, serializer_class), many=True
+            ).data
+            return JSONRenderer().render(data)
+
+        def compiled_page():
+            rows = list(compiled.values(queryset))
+            return FastJSONRenderer().render(compiled.render(rows))
+
+        baseline, expected = self._median_seconds(serializer_page)
+        fast, output = self._median_seconds(compiled_page)
+
+        print(f'\n{serializer_class.__name__} ({ROWS} rows)')
+        print(f'serializer {ROWS / baseline:12.0f} rows/s')
+        print(f'compiled   {ROWS / fast:12.0f} rows/s')
+        print(f'speedup    {baseline / fast:12.1f}x')
+
+        self.assertEqual(output, expected)
+        self.assertLess(fast, baseline)
+
+    def test_issue_list(self):
+        """Benchmark the issue list serializer."""
+        self._compare(IssueSerializer)
+
+    def test_issue_detail(self):
+        """Benchmark the detailed issue serializer."""
+        self._compare(IssueDetailSerializer)
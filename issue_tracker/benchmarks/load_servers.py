@@ -0,0 +1,189 @@
+"""
+Throughput and tail latency of the WSGI and ASGI deployments under load.
+
+Serves the app with each server in turn, against the database configured
+by the environment, keeps --concurrency connections busy with the hot read
+routes for --duration seconds and reports requests/second and latency
+percentiles per route:
+
+    python benchmarks/load_servers.py --email seed1-user0@example.com
+
+``wsgi`` is the current deployment, gunicorn sync workers; ``asgi`` is
+gunicorn with uvicorn workers, serving the async views of
+``core.async_views``. Seed a large database first (``manage.py
+seed_data``) and log in as the owner of a large project. The load runs on
+threads of this process, so give it cores the server does not use.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from statistics import quantiles
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+SERVERS = {
+    'wsgi': ['issue_tracker.wsgi:application'],
+    'asgi': [
+        '--worker-class', 'uvicorn_worker.UvicornWorker',
+        'issue_tracker.asgi:application',
+    ],
+}
+
+ROUTES = {
+    'issue-list': '/api/issues/?page_size=50',
+    'issue-detail': '/api/issues/{issue}/',
+    'issue-comments': '/api/issues/{issue}/comments/',
+    'project-list': '/api/projects/',
+}
+
+
+def request(connection, method, path, token=None, body=None):
+    """Return the status and body of a request."""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start.')
+
+
+def resolve_routes(port, email, password):
+    """Log in and return the token and the concrete route paths."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    status, body = request(
+        connection, 'POST', '/api/user/token/',
+        body=json.dumps({'email': email, 'password': password}),
+    )
+    if status != 200:
+        raise RuntimeError(f'Login failed ({status}): {body[:200]!r}')
+    token = json.loads(body)['access']
+
+    _, body = request(connection, 'GET', '/api/projects/', token)
+    project = json.loads(body)[0]['id']
+    _, body = request(
+        connection, 'GET', f'/api/projects/{project}/issues/?page_size=1',
+        token,
+    )
+    issue = json.loads(body)['results'][0]['id']
+    connection.close()
+    return token, {
+        name: path.format(issue=issue) for name, path in ROUTES.items()
+    }
+
+
+def run_load(port, token, routes, concurrency, duration):
+    """Return {route: [(latency_s, status)]} of duration seconds of load."""
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        names = list(routes)
+        own = defaultdict(list)
+        number = offset
+        while time.monotonic() < deadline:
+            name = names[number % len(names)]
+            number += 1
+            start = time.perf_counter()
+            try:
+                status, _ = request(connection, 'GET', routes[name], token)
+            except (OSError, http.client.HTTPException):
+                status = None
+                connection.close()
+            own[name].append((time.perf_counter() - start, status))
+        with lock:
+            for name, values in own.items():
+                samples[name].extend(values)
+
+    threads = [
+        threading.Thread(target=worker, args=(offset,))
+        for offset in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(name, values, duration):
+    latencies = sorted(latency for latency, _ in values)
+    errors = sum(status != 200 for _, status in values)
+    if len(latencies) > 1:
+        percentiles = quantiles(latencies, n=100)
+        p50, p99 = percentiles[49], percentiles[98]
+    else:
+        p50 = p99 = latencies[0] if latencies else 0.0
+    return (f'{name:<16} {len(values):>8} {len(values) / duration:>9.1f} '
+            f'{p50 * 1000:>9.1f} {p99 * 1000:>9.1f} {errors:>7}')
+
+
+def bench(server, args):
+    """Serve with server, load it and print its results."""
+    address = f'127.0.0.1:{args.port}'
+    env = {**os.environ, 'ASYNC_VIEWS': '1' if server == 'asgi' else '0'}
+    process = subprocess.Popen(
+        ['gunicorn', '--workers', str(args.workers), '--bind', address,
+         '--timeout', '120', *SERVERS[server]],
+        cwd=PROJECT_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(args.port)
+        token, routes = resolve_routes(args.port, args.email, args.password)
+        run_load(args.port, token, routes, args.concurrency, args.warmup)
+        samples = run_load(
+            args.port, token, routes, args.concurrency, args.duration
+        )
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f'\n{server}: {args.workers} workers, '
+          f'{args.concurrency} connections, {args.duration}s')
+    print(f'{"route":<16} {"requests":>8} {"req/s":>9} {"p50 ms":>9} '
+          f'{"p99 ms":>9} {"errors":>7}')
+    for name in routes:
+        print(summarize(name, samples[name], args.duration))
+    print(summarize(
+        'all', [value for values in samples.values() for value in values],
+        args.duration,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--servers', default='wsgi,asgi')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    for server in args.servers.split(','):
+        bench(server, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,8 @@ class UserAdmin(BaseUserAdmin):
         (_('Important dates'), {'fields': ('last_login',)}),
     )
     readonly_fields = ['last_login']
+    # Changing these revokes the tokens issued to the user.
+    revoking_fields = {'is_active', 'is_staff', 'is_superuser'}
     add_fieldsets = (
         (None, {
             'classes': ('wide',),
@@ -45,6 +47,11 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        if change and self.revoking_fields & set(form.changed_data):
+            obj.auth_version += 1
+        super().save_model(request, obj, form, change)
+
 
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Project)
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import metrics, signals, slow_queries  # noqa
+        # The first execute wrapper is the outermost, so the slow query
+        # stacks start at the code that ran the query.
+        slow_queries.install_all()
+        metrics.install_all()
@@ -0,0 +1,86 @@
+"""
+Async read paths for the ASGI server.
+
+Under ASGI a sync view holds a thread for its whole request, mostly waiting
+on the database. ``AsyncViewSetMixin`` gives a viewset an async dispatch:
+actions written as coroutines run on the event loop and await their
+queries through the async ORM, while sync actions run in a thread as they
+would under WSGI. Authentication and permission checks, which may query,
+run in a thread ahead of async actions.
+
+Serializers render on the event loop, where the ORM raises
+``SynchronousOnlyOperation`` on any query, so async actions must load every
+row their serializer reads up front; the query plans of ``core.query_plan``
+do exactly that.
+"""
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+
+class AsyncViewSetMixin:
+    """Viewset mixin dispatching to coroutine actions on the event loop."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        # The view returns the coroutine of dispatch().
+        return markcoroutinefunction(super().as_view(actions, **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if not iscoroutinefunction(handler):
+            return await sync_to_async(super().dispatch)(
+                request, *args, **kwargs
+            )
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def aget_object(self):
+        """Async get_object()."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError,
+                ValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def alist_response(self, queryset):
+        """Return the serialized page of queryset, or all of it."""
+        if self.paginator is not None:
+            # Cursor pages need several dependent queries.
+            page = await sync_to_async(self.paginate_queryset)(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(
+            [obj async for obj in queryset], many=True
+        )
+        return Response(serializer.data)
+
+    async def aretrieve_response(self):
+        """Return the serialized requested object."""
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(serializer.data)
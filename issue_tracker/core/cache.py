@@ -0,0 +1,125 @@
+"""
+Response caching for list endpoints.
+
+Cached responses are keyed by the user, the endpoint, the normalized query
+params, the local date and a data version of the projects the response
+covers. Writes bump ``Project.data_version`` (see ``core.signals``),
+including renames of the users responses embed, so stale entries become
+unreachable and age out of the bounded cache instead of being deleted. The
+date keys counts relative to today, like the overdue issue count.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.models import Project
+
+_MISSING = object()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class CountingLocMemCache(LocMemCache):
+    """Local-memory cache counting the hits and misses of get()."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        with _stats_lock:
+            self._stats = _stats.setdefault(name, Counter())
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        with _stats_lock:
+            self._stats['misses' if value is _MISSING else 'hits'] += 1
+        return default if value is _MISSING else value
+
+    # The cache lives in memory, so its async methods need no thread.
+    async def aget(self, key, default=None, version=None):
+        return self.get(key, default, version)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set(key, value, timeout, version)
+
+    def stats(self):
+        """Return the hit and miss counts of this process."""
+        with _stats_lock:
+            return {
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+            }
+
+
+class ResponseCacheMixin:
+    """
+    Viewset mixin caching list responses.
+
+    Responses are keyed by the data versions of the projects returned by
+    get_versioned_projects(), by default the project of the
+    ``project_url_kwarg`` URL kwarg. Views may instead override
+    get_data_version(), returning a value that changes whenever any data in
+    the response may have.
+    """
+    cache_alias = 'default'
+    project_url_kwarg = 'project_id'
+
+    def get_versioned_projects(self):
+        """Return a queryset of the projects the response covers."""
+        return Project.objects.filter(id=self.kwargs[self.project_url_kwarg])
+
+    def get_data_version(self):
+        return list(self.get_versioned_projects().order_by('id').values_list(
+            'id', 'data_version'
+        ))
+
+    def get_response_cache_key(self):
+        request = self.request
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+        )
+        parts = (
+            request.user.pk,
+            request.resolver_match.view_name,
+            sorted(self.kwargs.items()),
+            params,
+            self.get_data_version(),
+            timezone.localdate(),
+        )
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+        return f'response:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        cache = caches[self.cache_alias]
+        key = self.get_response_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data)
+        return response
+
+    async def acached_list(self, respond):
+        """
+        Async list(): return the cached data, or the response of the
+        coroutine respond() after caching it.
+        """
+        cache = caches[self.cache_alias]
+        key = await sync_to_async(self.get_response_cache_key)()
+        data = await cache.aget(key)
+        if data is not None:
+            return Response(data)
+
+        response = await respond()
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, response.data)
+        return response
@@ -0,0 +1,245 @@
+"""
+Live change feeds of projects.
+
+Writes to issues and comments append compact events to the
+``ChangeEvent`` log once their transaction commits. The log is bounded: it
+keeps about the last ``CHANGE_FEED_BUFFER_SIZE`` events of all projects,
+which is how far back a client can resume from its ``Last-Event-ID``.
+
+Every process runs one ``ChangeFeed`` poller per event loop, reading new
+events every ``CHANGE_FEED_POLL_INTERVAL`` seconds while any client is
+connected and fanning them out to the queues of the project's streams. An
+idle stream is a coroutine waiting on its queue, so idle clients cost no
+queries and no thread. Events reach clients at least once: a stream may
+repeat events around a resume.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.db.models import Max, Min, Q
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.export import ExportRenderer
+from core.models import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+ISSUE_FIELDS = (
+    'title', 'status', 'priority', 'assigned_to_id', 'due_date',
+    'updated_at',
+)
+COMMENT_FIELDS = ('issue_id', 'created_by_id', 'created_at')
+EVENT_FIELDS = ('id', 'project_id', 'kind', 'data')
+
+# Events are pruned once every PRUNE_EVERY inserts.
+PRUNE_EVERY = 100
+# Events of concurrent transactions may commit out of id order; the poller
+# reads this many ids behind the newest it has seen to catch them.
+LOOKBACK = 100
+# Events a slow client may fall behind before its stream is closed; it
+# resumes from its Last-Event-ID on reconnecting.
+QUEUE_SIZE = 1000
+
+
+def issue_data(issue):
+    return {
+        'id': issue.id,
+        **{field: getattr(issue, field) for field in ISSUE_FIELDS},
+    }
+
+
+def comment_data(comment):
+    return {
+        'id': comment.id,
+        **{field: getattr(comment, field) for field in COMMENT_FIELDS},
+    }
+
+
+def record(events):
+    """Append (project_id, kind, data) events once the write commits."""
+    events = [
+        ChangeEvent(project_id=project_id, kind=kind, data=data)
+        for project_id, kind, data in events
+    ]
+    if events:
+        transaction.on_commit(partial(_insert, events))
+
+
+def _insert(events):
+    events = ChangeEvent.objects.bulk_create(events)
+    last_id = events[-1].id
+    # Ids of bulk inserts are only known on some databases.
+    if last_id is not None and \
+            last_id // PRUNE_EVERY != (events[0].id - 1) // PRUNE_EVERY:
+        prune(last_id)
+
+
+def prune(last_id):
+    """Keep the last CHANGE_FEED_BUFFER_SIZE events before last_id."""
+    ChangeEvent.objects.filter(
+        id__lte=last_id - settings.CHANGE_FEED_BUFFER_SIZE
+    ).delete()
+
+
+def backlog(project_id, last_event_id):
+    """
+    Return the events of a project after last_event_id, or None if some
+    may have been pruned.
+    """
+    oldest = ChangeEvent.objects.aggregate(oldest=Min('id'))['oldest']
+    if oldest is not None and oldest > last_event_id + 1:
+        return None
+    return list(ChangeEvent.objects.filter(
+        project_id=project_id, id__gt=last_event_id
+    ).order_by('id').values(*EVENT_FIELDS))
+
+
+class StreamsUnavailable(APIException):
+    """Streams are not served by sync workers."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Live changes are only served under ASGI.'
+    default_code = 'streams_unavailable'
+
+
+class EventStreamRenderer(ExportRenderer):
+    """Renderer accepting streams; errors are rendered as JSON."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+
+def format_event(event):
+    """Return an event in the text/event-stream format."""
+    data = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f'id: {event["id"]}\nevent: {event["kind"]}\ndata: {data}\n\n'
+
+
+class Subscription:
+    """The queue of events of one stream."""
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+
+class ChangeFeed:
+    """Polls the change log for the streams of one event loop."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._task = None
+        self._last_id = self._floor = None
+        self._seen = deque(maxlen=LOOKBACK * 2)
+
+    def subscribe(self, project_id):
+        subscription = Subscription(project_id)
+        self._subscriptions[project_id].add(subscription)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self._subscriptions[subscription.project_id]
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.project_id]
+
+    async def _poll(self):
+        try:
+            while self._subscriptions:
+                try:
+                    await self._read()
+                except DatabaseError:
+                    logger.exception('Reading the change log failed.')
+                await asyncio.sleep(settings.CHANGE_FEED_POLL_INTERVAL)
+        finally:
+            # The next subscriber starts from the events after it came.
+            self._task = self._last_id = self._floor = None
+            self._seen.clear()
+
+    async def _read(self):
+        if self._last_id is None:
+            state = await ChangeEvent.objects.aaggregate(last_id=Max('id'))
+            self._last_id = self._floor = state['last_id'] or 0
+        # Ids of the window that were not seen yet, in case they commit
+        # late; ids of rolled back transactions are looked up in vain.
+        missing = set(range(
+            max(self._floor, self._last_id - LOOKBACK) + 1,
+            self._last_id + 1,
+        )).difference(self._seen)
+        async for event in ChangeEvent.objects.filter(
+            Q(id__gt=self._last_id) | Q(id__in=missing)
+        ).order_by('id').values(*EVENT_FIELDS):
+            self._publish(event)
+
+    def _publish(self, event):
+        if event['id'] in self._seen:
+            return
+        self._seen.append(event['id'])
+        self._last_id = max(self._last_id, event['id'])
+        for subscription in list(
+            self._subscriptions.get(event['project_id'], ())
+        ):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+
+
+_feeds = {}
+
+
+def get_feed():
+    """Return the ChangeFeed of the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _feeds:
+        # Feeds of closed loops, as left by tests, are dropped.
+        for closed in [loop for loop in _feeds if loop.is_closed()]:
+            del _feeds[closed]
+        _feeds[loop] = ChangeFeed()
+    return _feeds[loop]
+
+
+async def stream(project_id, last_event_id=None):
+    """Yield the events of a project as text/event-stream chunks."""
+    feed = get_feed()
+    subscription = feed.subscribe(project_id)
+    try:
+        yield f'retry: {settings.CHANGE_FEED_RETRY_MS}\n\n'
+        sent = set()
+        if last_event_id is not None:
+            events = await sync_to_async(backlog)(project_id, last_event_id)
+            if events is None:
+                # The client must refetch what it shows.
+                yield 'event: reset\ndata: {}\n\n'
+                events = []
+            for event in events:
+                sent.add(event['id'])
+                yield format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    settings.CHANGE_FEED_HEARTBEAT,
+                )
+            except asyncio.TimeoutError:
+                if subscription.overflowed:
+                    return
+                yield ': keep-alive\n\n'
+                continue
+            if event['id'] not in sent:
+                yield format_event(event)
+            if subscription.overflowed and subscription.queue.empty():
+                return
+    finally:
+        feed.unsubscribe(subscription)
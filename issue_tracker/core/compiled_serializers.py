@@ -0,0 +1,320 @@
+"""
+Compiled serializers for read-only list pages.
+
+DRF renders a list row by row, through the ``get_attribute()`` and
+``to_representation()`` of every field of model instances, which costs
+more than reading the rows on large pages. ``compile_serializer()`` turns
+a model serializer into a ``CompiledSerializer`` rendering the same output
+straight from ``.values()`` rows: plain columns are copied, other columns
+go through their field's ``to_representation()``, the columns of nested
+foreign key objects are joined into the rows, and other nested objects are
+read with one ``.values()`` query per relation and page, then rendered by
+their own compiled serializers.
+
+Serializers reading attributes that are not columns (method fields,
+``source='*'``, hyperlinks, dotted sources, properties) are not compiled;
+``CompiledListMixin`` falls back to the serializer for them.
+"""
+import operator
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.utils.field_mapping import ClassLookupDict
+
+# Serializer fields returning values of their model field's type as is.
+VERBATIM_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+# The alias of the parent key of the rows of to-many relations.
+PARENT = '_parent'
+
+_model_field_mapping = ClassLookupDict(
+    serializers.ModelSerializer.serializer_field_mapping
+)
+
+
+class NotCompilable(Exception):
+    """The serializer reads attributes that are not columns."""
+
+
+class NotJoinable(Exception):
+    """The nested serializer reads more than the columns of its row."""
+
+
+class CompiledSerializer:
+    """Renders the .values() rows of one model as a serializer would."""
+
+    def __init__(self, model):
+        self.model = model
+        self.pk = model._meta.pk.attname
+        self.columns = [self.pk]
+        self.annotations = []
+        # (name, load) pairs; load(rows) returns the getter of the field's
+        # value in a row, or None to leave the field out.
+        self.fields = []
+
+    def values(self, queryset, **expressions):
+        """Return queryset reading the rows this serializer renders."""
+        annotations = [
+            name for name in self.annotations
+            if name in queryset.query.annotations
+        ]
+        return queryset.prefetch_related(None).values(
+            *self.columns, *annotations, **expressions
+        )
+
+    def render(self, rows):
+        """Return the representations of rows read by values()."""
+        getters = []
+        for name, load in self.fields:
+            get = load(rows)
+            if get is not None:
+                getters.append((name, get))
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    def render_by_pk(self, queryset):
+        """Return {pk: representation} of the objects of queryset."""
+        rows = list(self.values(queryset))
+        return dict(zip(
+            (row[self.pk] for row in rows), self.render(rows)
+        ))
+
+
+def _static(get):
+    return lambda rows: get
+
+
+def _is_pk_only(field):
+    return isinstance(field, serializers.PrimaryKeyRelatedField) \
+        and field.pk_field is None
+
+
+def _is_verbatim(field, model_field):
+    try:
+        expected = _model_field_mapping[model_field]
+    except KeyError:
+        return False
+    if model_field.choices:
+        expected = serializers.ChoiceField
+    return type(field) is expected and issubclass(expected, VERBATIM_FIELDS)
+
+
+def _converted(key, field):
+    """Return the getter of the representation of a column."""
+    to_representation = field.to_representation
+
+    def get(row):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return get
+
+
+def _annotation(key, field):
+    get = _converted(key, field)
+    # Missing annotations are skipped, as the serializer skips attributes
+    # the instances do not have.
+    return lambda rows: get if rows and key in rows[0] else None
+
+
+def _joined_object(key, fields):
+    """Return the load of the object of a foreign key joined into rows."""
+    def load(rows):
+        getters = [(name, field_load(rows)) for name, field_load in fields]
+
+        def get(row):
+            if row[key] is None:
+                return None
+            return {name: get(row) for name, get in getters}
+        return get
+    return load
+
+
+def _nested_object(key, model_field, compiled):
+    """Return the load of the related objects of a foreign key."""
+    manager = model_field.related_model._base_manager
+
+    def load(rows):
+        ids = {row[key] for row in rows}
+        ids.discard(None)
+        related = compiled.render_by_pk(
+            manager.filter(pk__in=ids)
+        ) if ids else {}
+        get = related.get
+        return lambda row: get(row[key])
+    return load
+
+
+def _nested_many(pk, model_field, compiled):
+    """
+    Return the load of the objects of a to-many relation, rendered by
+    compiled or as their primary keys if it is None.
+    """
+    if model_field.concrete:
+        parent = model_field.related_query_name()
+    else:
+        parent = model_field.field.name
+    manager = model_field.related_model._default_manager
+
+    def load(rows):
+        related = {}
+        if rows:
+            queryset = manager.filter(
+                **{f'{parent}__in': [row[pk] for row in rows]}
+            )
+            if compiled is None:
+                pairs = queryset.values_list(F(parent), 'pk')
+            else:
+                related_rows = list(
+                    compiled.values(queryset, **{PARENT: F(parent)})
+                )
+                pairs = zip(
+                    (row[PARENT] for row in related_rows),
+                    compiled.render(related_rows),
+                )
+            for parent_id, value in pairs:
+                related.setdefault(parent_id, []).append(value)
+        return lambda row: related.get(row[pk], [])
+    return load
+
+
+def _compile_field(compiled, model, field, prefix=''):
+    """
+    Return the load of a field, registering the columns it reads.
+
+    prefix is the lookup path of the foreign keys joining model into the
+    rows of compiled; joined fields raise NotJoinable if they need more
+    than those rows.
+    """
+    if field.source == '*' or len(field.source_attrs) != 1:
+        raise NotCompilable
+    source = field.source
+    key = prefix + source
+    try:
+        model_field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        if hasattr(model, source):
+            raise NotCompilable
+        if prefix:
+            raise NotJoinable
+        compiled.annotations.append(source)
+        return _annotation(source, field)
+
+    if not model_field.is_relation:
+        compiled.columns.append(key)
+        if _is_verbatim(field, model_field):
+            return _static(operator.itemgetter(key))
+        return _static(_converted(key, field))
+
+    if model_field.many_to_many or model_field.one_to_many:
+        if prefix:
+            raise NotJoinable
+        if isinstance(field, serializers.ManyRelatedField) \
+                and _is_pk_only(field.child_relation):
+            return _nested_many(compiled.pk, model_field, None)
+        if isinstance(field, serializers.ListSerializer):
+            return _nested_many(compiled.pk, model_field, _compile(
+                field.child, model_field.related_model
+            ))
+    elif model_field.concrete:
+        # Foreign key values are the related primary keys.
+        compiled.columns.append(key)
+        if _is_pk_only(field):
+            return _static(operator.itemgetter(key))
+        if isinstance(field, serializers.Serializer):
+            related_model = model_field.related_model
+            columns = list(compiled.columns)
+            try:
+                return _joined_object(key, _compile_fields(
+                    compiled, field, related_model, f'{key}__'
+                ))
+            except NotJoinable:
+                if prefix:
+                    raise
+                compiled.columns = columns
+            return _nested_object(
+                key, model_field, _compile(field, related_model)
+            )
+    raise NotCompilable
+
+
+def _compile_fields(compiled, serializer, model, prefix=''):
+    """Return the (name, load) pairs of the readable fields."""
+    return [
+        (name, _compile_field(compiled, model, field, prefix))
+        for name, field in serializer.fields.items()
+        if not field.write_only
+    ]
+
+
+def _compile(serializer, model):
+    compiled = CompiledSerializer(model)
+    compiled.fields = _compile_fields(compiled, serializer, model)
+    compiled.columns = list(dict.fromkeys(compiled.columns))
+    return compiled
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class, fields=None, expand=None):
+    """
+    Return the CompiledSerializer of serializer_class, or None if it
+    cannot be compiled.
+
+    fields and expand are the frozensets of a sparse serializer (see
+    ``core.sparse_fields``).
+    """
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if model is None:
+        return None
+    kwargs = {
+        name: value
+        for name, value in (('fields', fields), ('expand', expand))
+        if value is not None
+    }
+    try:
+        return _compile(serializer_class(**kwargs), model)
+    except NotCompilable:
+        return None
+
+
+class CompiledListMixin:
+    """
+    Viewset mixin rendering the pages of compiled_actions from rows.
+
+    Requires QueryPlanMixin, whose sparse fieldsets are compiled too.
+    """
+    compiled_actions = ('list',)
+
+    def get_compiled_serializer(self):
+        """Return the CompiledSerializer of the request, or None."""
+        if self.action not in self.compiled_actions \
+                or self.request.method not in SAFE_METHODS:
+            return None
+        return compile_serializer(
+            self.get_serializer_class(), **self.get_sparse_kwargs()
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        """Return the serialized page of queryset, or all of it."""
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        rows = compiled.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.render(page))
+        return Response(compiled.render(list(rows)))
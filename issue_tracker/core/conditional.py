@@ -0,0 +1,136 @@
+"""
+Conditional GET support for viewsets.
+
+ETags are derived from cheap aggregates over the filtered queryset, before
+anything is serialized, so a request whose ``If-None-Match`` still matches
+is answered with a 304 without rendering the payload.
+"""
+import hashlib
+from functools import partial
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Return a strong ETag hashing parts."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    """Return True if the If-None-Match header of request matches etag."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison.
+    etags = {tag.removeprefix('W/') for tag in parse_etags(header)}
+    return '*' in etags or etag in etags
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin answering conditional list and retrieve requests.
+
+    List ETags cover the request URL, the user and ``(max(updated_at),
+    count)`` of the filtered queryset. Object ETags cover the URL and the
+    ``etag_fields`` and ``etag_annotations`` of the object.
+    """
+    etag_fields = ['updated_at']
+    etag_annotations = {}
+    list_etag_aggregates = {
+        'updated_at': Max('updated_at'), 'count': Count('pk'),
+    }
+
+    def _list_etag(self, state):
+        return make_etag(
+            self.request.get_full_path(),
+            self.request.user.pk,
+            state['updated_at'],
+            state['count'],
+        )
+
+    def get_list_etag(self, queryset):
+        return self._list_etag(
+            queryset.aggregate(**self.list_etag_aggregates)
+        )
+
+    async def aget_list_etag(self, queryset):
+        return self._list_etag(
+            await queryset.aaggregate(**self.list_etag_aggregates)
+        )
+
+    def _object_etag_state(self):
+        """Return the queryset of the requested object's ETag state."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return queryset.prefetch_related(None).annotate(
+            **self.etag_annotations
+        ).values_list(*self.etag_fields, *self.etag_annotations)
+
+    def _object_etag(self, state):
+        if state is None:
+            return None
+        return make_etag(self.request.get_full_path(), *state)
+
+    def get_object_etag(self):
+        """Return the ETag of the requested object, or None if missing."""
+        return self._object_etag(self._object_etag_state().first())
+
+    async def aget_object_etag(self):
+        return self._object_etag(await self._object_etag_state().afirst())
+
+    def _not_modified(self, etag):
+        if etag is not None and etag_matches(self.request, etag):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        return None
+
+    def _tag(self, response, etag):
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def conditional_response(self, etag, respond):
+        """Return a 304 if etag matches, else respond() tagged with etag."""
+        not_modified = self._not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self._tag(respond(), etag)
+
+    async def aconditional_response(self, etag, respond):
+        """conditional_response() awaiting the coroutine respond()."""
+        not_modified = self._not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self._tag(await respond(), etag)
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_list_etag(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(
+            etag, partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_object_etag(),
+            partial(super().retrieve, request, *args, **kwargs),
+        )
+
+
+class IssueConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GETs of issues, whose ETags also cover comments.
+
+    Comment writes and renames of the users an issue embeds touch its
+    updated_at (see ``core.signals``), so list ETags change with them too.
+    """
+    etag_annotations = {
+        'comment_count': Count('comments'),
+        'last_comment_at': Max('comments__created_at'),
+    }
@@ -0,0 +1,210 @@
+"""
+Denormalized per-project issue counters.
+
+Projects hold their open, closed and open high-priority issue counts, and
+``ProjectDueDateCount`` rows hold the open issue count of every due date
+of a project, so overdue counts are a short indexed range sum.
+``ProjectStat`` rows roll issue counts up by status and priority, by
+assignee and by label for the project dashboards.
+
+Counters are adjusted with F() expressions by the issue signal handlers in
+``core.signals`` and by the bulk issue endpoints; ``recount()`` repairs
+any drift.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from core.models import Issue, Project, ProjectDueDateCount, ProjectStat
+
+COUNTERS = {
+    'open_issue_count': Q(status='Open'),
+    'closed_issue_count': Q(status='Closed'),
+    'high_priority_issue_count': Q(status='Open', priority='High'),
+}
+
+# Issue fields the counters depend on.
+COUNTED_FIELDS = (
+    'project_id', 'status', 'priority', 'due_date', 'assigned_to_id'
+)
+
+
+def counted_state(issue):
+    """Return the counted fields of an issue instance."""
+    return {field: getattr(issue, field) for field in COUNTED_FIELDS}
+
+
+def _contribution(state):
+    """Return the counters, due date and stats an issue state counts in."""
+    is_open = state['status'] == 'Open'
+    counters = {
+        'open_issue_count': is_open,
+        'closed_issue_count': state['status'] == 'Closed',
+        'high_priority_issue_count': is_open and state['priority'] == 'High',
+    }
+    stats = [
+        (ProjectStat.STATUS_PRIORITY,
+         f"{state['status']}:{state['priority']}"),
+        (ProjectStat.ASSIGNEE, str(state['assigned_to_id'])),
+    ]
+    return counters, state['due_date'] if is_open else None, stats
+
+
+def adjust(added=(), removed=()):
+    """
+    Move the counters by the states of added and removed issues.
+
+    States are dicts of the COUNTED_FIELDS, as returned by
+    counted_state() or a values() query, and may carry the ``count`` of
+    issues sharing them.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    due_deltas = defaultdict(int)
+    stat_deltas = defaultdict(int)
+    for states, sign in ((added, 1), (removed, -1)):
+        for state in states:
+            project_id = state['project_id']
+            weight = sign * state.get('count', 1)
+            counters, due_date, stats = _contribution(state)
+            for name, counted in counters.items():
+                deltas[project_id][name] += weight * counted
+            if due_date is not None:
+                due_deltas[project_id, due_date] += weight
+            for dimension, key in stats:
+                stat_deltas[project_id, dimension, key] += weight
+
+    for project_id, counters in deltas.items():
+        updates = {
+            name: F(name) + delta for name, delta in counters.items() if delta
+        }
+        if updates:
+            Project.objects.filter(id=project_id).update(**updates)
+    _add(ProjectDueDateCount, 'open_issue_count',
+         ('project_id', 'due_date'), due_deltas)
+    _add(ProjectStat, 'issue_count',
+         ('project_id', 'dimension', 'key'), stat_deltas)
+
+
+def adjust_labels(label_deltas):
+    """Move the label stats by {(project_id, label_id): delta}."""
+    _add(ProjectStat, 'issue_count', ('project_id', 'dimension', 'key'), {
+        (project_id, ProjectStat.LABEL, str(label_id)): delta
+        for (project_id, label_id), delta in label_deltas.items()
+    })
+
+
+def _add(model, field, lookup_fields, deltas):
+    """
+    Add deltas to the counter field of model rows.
+
+    deltas maps tuples of lookup_fields values, identifying a row, to the
+    amount added to its counter. Missing rows are created first, so the
+    counters are moved by one UPDATE whatever the number of rows.
+    """
+    deltas = {lookup: delta for lookup, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    model.objects.bulk_create(
+        [model(**dict(zip(lookup_fields, lookup))) for lookup in deltas],
+        ignore_conflicts=True,
+    )
+    candidates = model.objects.filter(**{
+        f'{name}__in': {lookup[index] for lookup in deltas}
+        for index, name in enumerate(lookup_fields)
+    }).only(*lookup_fields)
+    rows = []
+    for row in candidates:
+        lookup = tuple(getattr(row, name) for name in lookup_fields)
+        if lookup in deltas:
+            setattr(row, field, F(field) + deltas[lookup])
+            rows.append(row)
+    model.objects.bulk_update(rows, [field])
+
+
+def recount(project_ids):
+    """Recompute the counters of project_ids from their issues."""
+    project_ids = list(project_ids)
+    issues = Issue.objects.filter(project_id__in=project_ids).order_by()
+    counts = {
+        row.pop('project_id'): row
+        for row in issues.values('project_id').annotate(**{
+            name: Count('id', filter=condition)
+            for name, condition in COUNTERS.items()
+        })
+    }
+    projects = list(Project.objects.filter(id__in=project_ids).only('id'))
+    for project in projects:
+        for name in COUNTERS:
+            setattr(project, name, counts.get(project.id, {}).get(name, 0))
+
+    stats = [
+        ProjectStat(
+            project_id=row['project_id'],
+            dimension=ProjectStat.STATUS_PRIORITY,
+            key=f"{row['status']}:{row['priority']}",
+            issue_count=row['count'],
+        )
+        for row in issues.values(
+            'project_id', 'status', 'priority'
+        ).annotate(count=Count('id'))
+    ] + [
+        ProjectStat(
+            project_id=row['project_id'],
+            dimension=ProjectStat.ASSIGNEE,
+            key=str(row['assigned_to_id']),
+            issue_count=row['count'],
+        )
+        for row in issues.values(
+            'project_id', 'assigned_to_id'
+        ).annotate(count=Count('id'))
+    ] + [
+        ProjectStat(
+            project_id=row['issue__project_id'],
+            dimension=ProjectStat.LABEL,
+            key=str(row['label_id']),
+            issue_count=row['count'],
+        )
+        for row in Issue.labels.through.objects.filter(
+            issue__project_id__in=project_ids
+        ).order_by().values(
+            'issue__project_id', 'label_id'
+        ).annotate(count=Count('id'))
+    ]
+
+    with transaction.atomic():
+        Project.objects.bulk_update(projects, list(COUNTERS))
+        ProjectDueDateCount.objects.filter(
+            project_id__in=project_ids
+        ).delete()
+        ProjectDueDateCount.objects.bulk_create(
+            ProjectDueDateCount(**row)
+            for row in issues.filter(
+                status='Open', due_date__isnull=False
+            ).values('project_id', 'due_date').annotate(
+                open_issue_count=Count('id')
+            )
+        )
+        ProjectStat.objects.filter(project_id__in=project_ids).delete()
+        ProjectStat.objects.bulk_create(stats)
+
+
+def recount_all(chunk_size=1000, progress=None):
+    """
+    Recount every project in chunks of projects.
+
+    progress, if given, is called with the number of projects recounted
+    so far after every chunk. Return the number of projects recounted.
+    """
+    recounted, last_id = 0, 0
+    while True:
+        project_ids = list(Project.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', flat=True)[:chunk_size])
+        if not project_ids:
+            return recounted
+        recount(project_ids)
+        recounted += len(project_ids)
+        last_id = project_ids[-1]
+        if progress:
+            progress(recounted)
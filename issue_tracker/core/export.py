@@ -0,0 +1,100 @@
+"""
+Streaming exports of issues.
+
+Rows are read with ``values()`` from a server-side iterator and written as
+they arrive, so an export holds one chunk of issues in memory however
+large the project is, and the first rows are sent before the last are
+read.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from core.models import Issue
+
+EXPORT_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'due_date',
+    'assigned_to_id', 'created_by_id', 'created_at', 'updated_at',
+)
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Renderer selecting an export format.
+
+    Exports stream their rows themselves, so only error responses are
+    rendered, as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONExportRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def export_rows(queryset, chunk_size=None):
+    """
+    Yield the EXPORT_FIELDS of the issues of queryset as dicts.
+
+    Each row also holds the sorted names of its ``labels``, read with one
+    query per chunk of chunk_size issues, EXPORT_CHUNK_SIZE by default.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('id').values(*EXPORT_FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        labels = {row['id']: [] for row in chunk}
+        for issue_id, name in Issue.labels.through.objects.filter(
+            issue_id__in=labels
+        ).order_by('label__name').values_list('issue_id', 'label__name'):
+            labels[issue_id].append(name)
+        for row in chunk:
+            row['labels'] = labels[row['id']]
+            yield row
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(rows):
+    """Yield rows as CSV lines, after a header line."""
+    writer = csv.writer(_Echo())
+    fields = (*EXPORT_FIELDS, 'labels')
+    yield writer.writerow(fields)
+    for row in rows:
+        row['labels'] = ','.join(row['labels'])
+        yield writer.writerow(
+            '' if row[field] is None else row[field] for field in fields
+        )
+
+
+def export_ndjson(rows):
+    """Yield rows as newline-delimited JSON."""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORTERS = {
+    CSVExportRenderer.format: export_csv,
+    NDJSONExportRenderer.format: export_ndjson,
+}
@@ -0,0 +1,405 @@
+"""
+Bulk loading of issues with their labels and comments.
+
+Records are resolved against in-memory maps of users, projects and labels
+and written in batches: with ``COPY`` on PostgreSQL and ``executemany`` on
+SQLite. Issue ids are allocated up front so label links and comments can
+be written in the same batch. The writes bypass the model signals, so
+every batch also moves the project counters, indexes its issues for
+search and bumps the data version of their projects.
+"""
+import csv
+import io
+import json
+import os
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connection,
+    connections,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core import counters
+from core.models import Comment, Issue, Label, Project
+from core.search import index_issues
+from issues.serializers import resolve_label_ids
+
+IMPORT_BATCH_SIZE = 1000
+
+ISSUE_FIELDS = (
+    'id', 'project_id', 'title', 'description', 'status', 'priority',
+    'due_date', 'created_by_id', 'assigned_to_id', 'created_at',
+    'updated_at',
+)
+LABEL_FIELDS = ('issue_id', 'label_id')
+COMMENT_FIELDS = ('issue_id', 'created_by_id', 'text', 'created_at')
+
+FORMATS = ('csv', 'jsonl')
+
+TEMPORAL_FIELDS = ('DateField', 'DateTimeField', 'TimeField')
+
+
+class InvalidRecord(ValueError):
+    """A record that cannot be imported."""
+
+
+def read_records(stream, format):
+    """
+    Yield the records of a CSV or JSONL stream.
+
+    Records that cannot be decoded are yielded as InvalidRecord errors, so
+    they keep their place in the numbering of records.
+    """
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield InvalidRecord(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            record = InvalidRecord('Expected a JSON object.')
+        yield record
+
+
+def _prepare(model, fields, rows):
+    """
+    Return rows of values of fields prepared for the database.
+
+    Rows hold validated Python values, so only date and time values need
+    converting.
+    """
+    database = connections[DEFAULT_DB_ALIAS]
+    converters = []
+    for name in fields:
+        field = model._meta.get_field(name)
+        if field.get_internal_type() in TEMPORAL_FIELDS:
+            converters.append((
+                field.attname,
+                lambda value, field=field: field.get_db_prep_save(
+                    value, database
+                ),
+            ))
+        else:
+            converters.append((field.attname, None))
+    return [
+        [
+            convert(row[attname]) if convert else row[attname]
+            for attname, convert in converters
+        ]
+        for row in rows
+    ]
+
+
+def _columns(model, fields):
+    quote = connection.ops.quote_name
+    return ', '.join(
+        quote(model._meta.get_field(name).column) for name in fields
+    )
+
+
+def _copy_text(value):
+    """Return value in the text format of COPY."""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace(
+        '\n', '\\n'
+    ).replace('\r', '\\r')
+
+
+class PostgresWriter:
+    """Rows written with COPY, ids drawn from the table sequence."""
+
+    def allocate_ids(self, cursor, model, count):
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+            'FROM generate_series(1, %s)',
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def insert(self, cursor, model, fields, rows):
+        if not rows:
+            return
+        buffer = io.StringIO()
+        for values in _prepare(model, fields, rows):
+            buffer.write('\t'.join(map(_copy_text, values)) + '\n')
+        buffer.seek(0)
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({_columns(model, fields)}) FROM STDIN',
+            buffer,
+        )
+
+
+class SQLiteWriter:
+    """Rows written with executemany, ids following the table sequence."""
+
+    def allocate_ids(self, cursor, model, count):
+        # Writes are serialized, so the ids are free until the batch
+        # commits. Inserting them moves the AUTOINCREMENT sequence on.
+        cursor.execute(
+            'SELECT seq FROM sqlite_sequence WHERE name = %s',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+        start = (row[0] if row else 0) + 1
+        return list(range(start, start + count))
+
+    def insert(self, cursor, model, fields, rows):
+        if not rows:
+            return
+        placeholders = ', '.join(['%s'] * len(fields))
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} '
+            f'({_columns(model, fields)}) VALUES ({placeholders})',
+            _prepare(model, fields, rows),
+        )
+
+
+WRITERS = {
+    'postgresql': PostgresWriter(),
+    'sqlite': SQLiteWriter(),
+}
+
+
+class Checkpoint:
+    """
+    Number of records of a source already imported, kept in a JSON file.
+
+    The file is written after every committed batch, so an interrupted
+    import resumes after the last committed batch.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+
+    def load(self):
+        """Return the number of records imported, 0 for a new import."""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            state = json.load(f)
+        if state['source'] != self.source:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to {state['source']}."
+            )
+        return state['records']
+
+    def save(self, records):
+        if not self.path:
+            return
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'source': self.source, 'records': records}, f)
+        os.replace(temp_path, self.path)
+
+
+def _text(record, key, default=''):
+    value = record.get(key)
+    return default if value in (None, '') else value
+
+
+def _choice(record, key, field_name, default):
+    value = _text(record, key, default)
+    choices = dict(Issue._meta.get_field(field_name).choices)
+    if value not in choices:
+        raise InvalidRecord(f'Unknown {key} {value!r}.')
+    return value
+
+
+def _label_names(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise InvalidRecord('Expected labels to be a list of names.')
+    names = list(dict.fromkeys(
+        name.strip() for name in map(str, value) if name.strip()
+    ))
+    max_length = Label._meta.get_field('name').max_length
+    if any(len(name) > max_length for name in names):
+        raise InvalidRecord('Label name too long.')
+    return names
+
+
+class IssueImporter:
+    """
+    Import issue records in batches.
+
+    A record holds the ``project`` id or name, ``title``,
+    ``description``, ``status``, ``priority``, ``due_date``, the
+    ``created_by`` and ``assigned_to`` emails, ``labels`` and
+    ``created_at``. JSONL records may also hold a list of ``comments``
+    with ``created_by``, ``text`` and ``created_at``.
+    """
+
+    def __init__(self):
+        self.users = {
+            email.lower(): user_id
+            for email, user_id in get_user_model().objects.values_list(
+                'email', 'id'
+            )
+        }
+        self.project_ids = set()
+        self.project_names = defaultdict(set)
+        for project_id, name in Project.objects.values_list('id', 'name'):
+            self.project_ids.add(project_id)
+            self.project_names[name].add(project_id)
+        self.labels = dict(Label.objects.values_list('name', 'id'))
+        self.writer = WRITERS[connection.vendor]
+        self.now = timezone.now()
+
+    def _user_id(self, record, key, default=None):
+        email = _text(record, key, None)
+        if email is None:
+            if default is None:
+                raise InvalidRecord(f'Missing {key}.')
+            return default
+        try:
+            return self.users[str(email).lower()]
+        except KeyError:
+            raise InvalidRecord(f'Unknown user {email!r}.') from None
+
+    def _project_id(self, record):
+        project = _text(record, 'project', None)
+        if project is None:
+            raise InvalidRecord('Missing project.')
+        if str(project).isdigit() and int(project) in self.project_ids:
+            return int(project)
+        project_ids = self.project_names.get(project, ())
+        if len(project_ids) != 1:
+            raise InvalidRecord(
+                f'Unknown project {project!r}.' if not project_ids
+                else f'Ambiguous project name {project!r}.'
+            )
+        return next(iter(project_ids))
+
+    def _datetime(self, record, key):
+        value = _text(record, key, None)
+        if value is None:
+            return self.now
+        parsed = parse_datetime(str(value))
+        if parsed is None:
+            raise InvalidRecord(f'Invalid {key} {value!r}.')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def resolve(self, record):
+        """Return the issue row, label names and comment rows of record."""
+        if isinstance(record, InvalidRecord):
+            raise record
+        title = str(_text(record, 'title'))
+        if not title or len(title) > Issue._meta.get_field('title').max_length:
+            raise InvalidRecord('Missing or too long title.')
+        due_date = _text(record, 'due_date', None)
+        if due_date is not None:
+            try:
+                due_date = parse_date(str(due_date))
+            except ValueError:
+                due_date = None
+            if due_date is None:
+                raise InvalidRecord(
+                    f"Invalid due_date {record['due_date']!r}."
+                )
+        created_by_id = self._user_id(record, 'created_by')
+        created_at = self._datetime(record, 'created_at')
+        issue = {
+            'project_id': self._project_id(record),
+            'title': title,
+            'description': str(_text(record, 'description')),
+            'status': _choice(record, 'status', 'status', 'Open'),
+            'priority': _choice(record, 'priority', 'priority', 'Medium'),
+            'due_date': due_date,
+            'created_by_id': created_by_id,
+            'assigned_to_id': self._user_id(
+                record, 'assigned_to', created_by_id
+            ),
+            'created_at': created_at,
+        }
+
+        comments = record.get('comments') or []
+        if not isinstance(comments, list):
+            raise InvalidRecord('Expected comments to be a list.')
+        comment_rows = []
+        for comment in comments:
+            if not isinstance(comment, dict) or not _text(comment, 'text'):
+                raise InvalidRecord('Expected comments with a text.')
+            comment_rows.append({
+                'created_by_id': self._user_id(comment, 'created_by'),
+                'text': str(comment['text']),
+                'created_at': self._datetime(comment, 'created_at'),
+            })
+        return issue, _label_names(record.get('labels')), comment_rows
+
+    def write(self, resolved):
+        """
+        Write a batch of resolved records in one transaction.
+
+        Return the numbers of issues and comments written.
+        """
+        if not resolved:
+            return 0, 0
+        missing = {
+            name
+            for _, names, _ in resolved
+            for name in names
+            if name not in self.labels
+        }
+        IssueLabel = Issue.labels.through
+        with transaction.atomic():
+            if missing:
+                self.labels.update(resolve_label_ids(sorted(missing)))
+
+            with connection.cursor() as cursor:
+                issue_ids = self.writer.allocate_ids(
+                    cursor, Issue, len(resolved)
+                )
+                # Imported issues change when written, so delta syncs
+                # (core.sync) pick them up; only created_at is historical.
+                updated_at = timezone.now()
+                issues, pairs, comments = [], [], []
+                for issue_id, (issue, names, comment_rows) in zip(
+                    issue_ids, resolved
+                ):
+                    issues.append(
+                        {**issue, 'id': issue_id, 'updated_at': updated_at}
+                    )
+                    pairs.extend(
+                        {'issue_id': issue_id, 'label_id': self.labels[name]}
+                        for name in names
+                    )
+                    comments.extend(
+                        {**comment, 'issue_id': issue_id}
+                        for comment in comment_rows
+                    )
+                self.writer.insert(cursor, Issue, ISSUE_FIELDS, issues)
+                self.writer.insert(cursor, IssueLabel, LABEL_FIELDS, pairs)
+                self.writer.insert(cursor, Comment, COMMENT_FIELDS, comments)
+
+            counters.adjust(added=[
+                {field: issue[field] for field in counters.COUNTED_FIELDS}
+                for issue in issues
+            ])
+            label_deltas = defaultdict(int)
+            for issue, names, _ in resolved:
+                for name in names:
+                    label_deltas[issue['project_id'], self.labels[name]] += 1
+            counters.adjust_labels(label_deltas)
+            index_issues(issue_ids)
+            Project.objects.filter(
+                id__in={issue['project_id'] for issue in issues}
+            ).bump_data_version()
+        return len(issues), len(comments)
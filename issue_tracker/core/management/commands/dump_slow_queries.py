@@ -0,0 +1,44 @@
+"""
+Django command to print the slow query log.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import slow_query_log
+
+
+class Command(BaseCommand):
+    """Django command to print the slow queries of every worker."""
+
+    help = 'Print the recorded slow queries, newest first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=50,
+            help='Number of queries printed.',
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print the records as JSON lines.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        records = slow_query_log.records(options['limit'])
+        for record in records:
+            if options['json']:
+                self.stdout.write(json.dumps(record))
+                continue
+            self.stdout.write(
+                f"{record['time']} {record['duration_ms']} ms "
+                f"({record['database']}, pid {record['pid']})"
+            )
+            self.stdout.write(f"  {record['sql']}")
+            self.stdout.write(f"  params: {record['params']}")
+            for frame in record['stack']:
+                self.stdout.write(f'  at {frame}')
+            for line in record['plan'] or []:
+                self.stdout.write(f'  plan: {line}')
+        if not options['json']:
+            self.stdout.write(f'{len(records)} slow queries.')
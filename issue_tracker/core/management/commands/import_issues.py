@@ -0,0 +1,104 @@
+"""
+Django command to bulk import issues with their labels and comments.
+"""
+import os
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importer import (
+    FORMATS,
+    IMPORT_BATCH_SIZE,
+    Checkpoint,
+    InvalidRecord,
+    IssueImporter,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    """Django command to load issues exported from another tracker."""
+
+    help = (
+        'Import issues from a CSV or JSONL file, or from stdin with "-". '
+        'Records hold the project id or name, title, description, status, '
+        'priority, due_date, created_by and assigned_to emails, labels and '
+        'created_at; JSONL records may also hold a list of comments.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Path of the file, or "-".')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Format of the records, by default from the file name.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Number of issues written per transaction.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording the progress, to resume an import.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        source = options['source']
+        format = options['format'] or (
+            'csv' if source.lower().endswith('.csv') else 'jsonl'
+        )
+        checkpoint = Checkpoint(options['checkpoint'], source)
+        try:
+            done = checkpoint.load()
+        except ValueError as e:
+            raise CommandError(e) from e
+        if done:
+            self.stdout.write(f'Resuming after {done} records...')
+
+        if source == '-':
+            self._import(sys.stdin, format, options['batch_size'],
+                         checkpoint, done)
+        else:
+            if not os.path.exists(source):
+                raise CommandError(f'{source} does not exist.')
+            with open(source, newline='', encoding='utf-8') as stream:
+                self._import(stream, format, options['batch_size'],
+                             checkpoint, done)
+
+    def _import(self, stream, format, batch_size, checkpoint, done):
+        importer = IssueImporter()
+        records = enumerate(read_records(stream, format), start=1)
+        for _ in islice(records, done):
+            pass
+
+        started = time.monotonic()
+        issues = comments = skipped = 0
+        while batch := list(islice(records, batch_size)):
+            resolved = []
+            for number, record in batch:
+                try:
+                    resolved.append(importer.resolve(record))
+                except InvalidRecord as e:
+                    skipped += 1
+                    self.stderr.write(f'Record {number}: {e}')
+            written = importer.write(resolved)
+            issues += written[0]
+            comments += written[1]
+            checkpoint.save(batch[-1][0])
+            self.stdout.write(
+                f'Imported {issues} issues '
+                f'({self._rate(issues + comments, started)} rows/s)...'
+            )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {issues} issues and {comments} comments in '
+            f'{elapsed:.1f}s ({self._rate(issues + comments, started)} '
+            f'rows/s), skipped {skipped} records.'
+        ))
+
+    def _rate(self, rows, started):
+        elapsed = time.monotonic() - started
+        return round(rows / elapsed) if elapsed else rows
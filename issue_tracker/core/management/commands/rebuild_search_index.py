@@ -0,0 +1,33 @@
+"""
+Django command to rebuild the issue search index.
+"""
+from django.core.management.base import BaseCommand
+
+from core import search
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the full-text search index."""
+
+    help = 'Rebuild the full-text search index of issues in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of issues indexed per chunk.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if search.get_backend() is None:
+            self.stderr.write('Search is not supported on this database.')
+            return
+
+        self.stdout.write('Rebuilding search index...')
+        indexed = search.rebuild(
+            chunk_size=options['chunk_size'],
+            progress=lambda count: self.stdout.write(
+                f'Indexed {count} issues...'
+            ),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} issues.'))
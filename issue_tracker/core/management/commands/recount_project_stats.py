@@ -0,0 +1,31 @@
+"""
+Django command to recount the issue counters of projects.
+"""
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    """Django command to repair drift in the project issue counters."""
+
+    help = 'Recompute the issue counters of every project in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of projects recounted per chunk.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.stdout.write('Recounting project issues...')
+        recounted = counters.recount_all(
+            chunk_size=options['chunk_size'],
+            progress=lambda count: self.stdout.write(
+                f'Recounted {count} projects...'
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Recounted {recounted} projects.')
+        )
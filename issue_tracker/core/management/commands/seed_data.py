@@ -0,0 +1,70 @@
+"""
+Django command to generate a large synthetic dataset.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seed import LABEL_NAMES, SEED_BATCH_SIZE, Seeder
+
+
+class Command(BaseCommand):
+    """Django command to seed the database for local benchmarking."""
+
+    help = (
+        'Generate users, projects, memberships, issues and comments in '
+        'bulk. The same seed always generates the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--projects', type=int, default=100)
+        parser.add_argument('--issues', type=int, default=100000)
+        parser.add_argument(
+            '--labels', type=int, default=len(LABEL_NAMES),
+            help='Number of distinct labels used.',
+        )
+        parser.add_argument(
+            '--max-members', type=int, default=50,
+            help='Largest number of members of a project.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE,
+            help='Number of issues written per transaction.',
+        )
+        parser.add_argument(
+            '--skip-search-index', action='store_true',
+            help='Do not index the issues for search.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['users'] < 1 or options['projects'] < 1:
+            raise CommandError('At least one user and project are needed.')
+        seeder = Seeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            progress=self.stdout.write,
+        )
+        if get_user_model().objects.filter(email=seeder.email(0)).exists():
+            raise CommandError(
+                f"Seed {options['seed']} was already used; pick another."
+            )
+
+        started = time.monotonic()
+        user_ids = seeder.create_users(options['users'])
+        teams = seeder.create_projects(
+            options['projects'], user_ids, options['max_members']
+        )
+        issues, comments = seeder.create_issues(
+            options['issues'], teams, options['labels'],
+            index=not options['skip_search_index'],
+        )
+        seeder.recount(teams)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(user_ids)} users, {len(teams)} projects, '
+            f'{issues} issues and {comments} comments in '
+            f'{time.monotonic() - started:.1f}s.'
+        ))
@@ -0,0 +1,67 @@
+"""
+Cached resolution of a user's project memberships and roles.
+
+Roles are kept in a process-local LRU keyed by ``(user id, membership
+version)``. The version lives on the user row, which authentication
+provides on every request anyway, and is bumped by the
+``ProjectMembership`` signal handlers in ``core.signals``. A membership
+change made by any worker therefore changes the key the other workers
+look up once they reload the user (see ``user.authentication``), and
+stale entries simply age out of the LRU.
+"""
+import threading
+from collections import OrderedDict
+
+from core.models import ProjectMembership
+
+CACHE_SIZE = 10000
+
+
+class MembershipCache:
+    """Bounded LRU of {project_id: role} mappings per user version."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_roles(self, user):
+        """Return {project_id: role} for the memberships of user."""
+        key = (user.id, user.membership_version)
+        with self._lock:
+            roles = self._entries.get(key)
+            if roles is not None:
+                self._entries.move_to_end(key)
+                return roles
+
+        roles = dict(ProjectMembership.objects.filter(
+            user_id=user.id
+        ).values_list('project_id', 'role'))
+        with self._lock:
+            self._entries[key] = roles
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return roles
+
+    def invalidate(self, user_id):
+        """Drop every cached version of a user's memberships."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+membership_cache = MembershipCache()
+
+
+def get_project_roles(user):
+    """Return {project_id: role} for the memberships of user."""
+    return membership_cache.get_roles(user)
+
+
+def get_project_role(user, project_id):
+    """Return the role of user in a project, or None if not a member."""
+    return get_project_roles(user).get(int(project_id))
@@ -0,0 +1,335 @@
+"""
+Request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` counts requests, query counts and response sizes and
+fills latency histograms per view and method. Every metric is a counter
+(histograms are kept as their cumulative bucket counters), so the metrics
+of several worker processes merge by adding them up: a background thread
+of each process writes its counters to its own file in ``METRICS_DIR``
+every ``FLUSH_INTERVAL`` seconds, off the request path, and ``/metrics``
+sums the files of all processes. Files of exited workers are kept, so
+totals never go down while the directory lives; clear it when the server
+starts.
+
+``/metrics`` is served to staff users, and to clients sending
+``METRICS_TOKEN`` as a bearer token when it is set.
+"""
+import atexit
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 1.0
+
+# The query count of the current request; see count_query().
+_request_queries = ContextVar('request_queries', default=None)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Requests by view, method and status.'
+    ),
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency by view and method.'
+    ),
+    'http_request_db_queries_total': (
+        'counter', 'Database queries run by requests.'
+    ),
+    'http_response_size_bytes_total': (
+        'counter', 'Bytes of response bodies.'
+    ),
+    'cache_requests_total': (
+        'counter', 'Cache lookups by cache and result.'
+    ),
+}
+
+
+class MetricsStore:
+    """Counters of this process, merged with other processes' files."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_pid = None
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._name = f'{self._pid}-{secrets.token_hex(4)}.json'
+        self._counters = defaultdict(float)
+
+    def _check_fork(self):
+        # A forked worker starts its own counters, file and flusher.
+        if os.getpid() != self._pid:
+            self._reset()
+        if self._flusher_pid != self._pid:
+            self._flusher_pid = self._pid
+            threading.Thread(
+                target=self._flush_periodically, name='metrics-flush',
+                daemon=True,
+            ).start()
+            atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                logger.exception('Could not write the request metrics.')
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._check_fork()
+            self._counters[name, tuple(sorted(labels.items()))] += amount
+
+    def observe(self, name, labels, value, buckets):
+        """Add value to the histogram name."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._check_fork()
+            for bound in buckets:
+                self._counters[f'{name}_bucket',
+                               key + (('le', str(bound)),)] += value <= bound
+            self._counters[f'{name}_bucket', key + (('le', '+Inf'),)] += 1
+            self._counters[f'{name}_sum', key] += value
+            self._counters[f'{name}_count', key] += 1
+
+    def _samples(self):
+        """Return the samples of this process."""
+        with self._lock:
+            self._check_fork()
+            samples = [
+                [name, list(labels), value]
+                for (name, labels), value in self._counters.items()
+            ]
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            if hasattr(cache, 'stats'):
+                stats = cache.stats()
+                for result, key in (('hit', 'hits'), ('miss', 'misses')):
+                    samples.append([
+                        'cache_requests_total',
+                        [['cache', alias], ['result', result]],
+                        stats[key],
+                    ])
+        return samples
+
+    def _path(self):
+        return os.path.join(settings.METRICS_DIR, self._name)
+
+    def flush(self):
+        """Write the samples of this process to its file."""
+        samples = self._samples()
+        with self._flush_lock:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            path = self._path()
+            temp_path = f'{path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(samples, f)
+            os.replace(temp_path, path)
+
+    def collect(self):
+        """Return {(name, labels): value} summed over every process."""
+        self.flush()
+        totals = defaultdict(float)
+        for entry in os.scandir(settings.METRICS_DIR):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path) as f:
+                    samples = json.load(f)
+            except (OSError, ValueError):
+                # Removed or replaced while reading.
+                continue
+            for name, labels, value in samples:
+                totals[name, tuple(map(tuple, labels))] += value
+        return totals
+
+
+store = MetricsStore()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        f'{key}="{_escape(value)}"' for key, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n'
+    )
+
+
+def _base_name(sample_name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        base = sample_name.removesuffix(suffix)
+        if base != sample_name and base in METRICS:
+            return base
+    return sample_name
+
+
+def render(totals):
+    """Return totals in the Prometheus text format."""
+    by_metric = defaultdict(list)
+    for (name, labels), value in totals.items():
+        by_metric[_base_name(name)].append((name, labels, value))
+
+    lines = []
+    for metric in sorted(by_metric):
+        kind, help_text = METRICS.get(metric, ('untyped', ''))
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for name, labels, value in sorted(
+            by_metric[metric], key=_sample_order
+        ):
+            lines.append(f'{name}{_format_labels(labels)} {value:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def _sample_order(sample):
+    name, labels, _ = sample
+    le = dict(labels).get('le')
+    bound = float('inf') if le in (None, '+Inf') else float(le)
+    return (
+        name.endswith('_count'), name.endswith('_sum'),
+        [item for item in labels if item[0] != 'le'], bound,
+    )
+
+
+def metrics_view(request):
+    """Serve the metrics of every process."""
+    token = settings.METRICS_TOKEN
+    has_token = bool(token) and secrets.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    )
+    if not (has_token or request.user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(store.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper counting the queries of the current request."""
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    """Add the query counter to a connection."""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def install_all():
+    """Count the queries of current and future connections."""
+    connection_created.connect(install)
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+
+
+class MetricsMiddleware:
+    """
+    Record the metrics of every request.
+
+    Queries are counted through a context variable rather than a
+    per-request execute wrapper, so the queries async views run in
+    threads are counted too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        # A one-item list, shared with the contexts copied for threads.
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        return self._record(request, response, start, queries[0])
+
+    async def _acall(self, request):
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        return self._record(request, response, start, queries[0])
+
+    def _record(self, request, response, start, queries):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        labels = {
+            'view': match.view_name if match else '<unresolved>',
+            'method': request.method,
+        }
+        store.inc('http_requests_total',
+                  {**labels, 'status': str(response.status_code)})
+        store.observe('http_request_duration_seconds', labels, duration,
+                      LATENCY_BUCKETS)
+        store.inc('http_request_db_queries_total', labels, queries)
+        if not response.streaming:
+            store.inc('http_response_size_bytes_total', labels,
+                      len(response.content))
+        elif response.is_async:
+            response.streaming_content = _acount_bytes(
+                response.streaming_content, labels
+            )
+        else:
+            response.streaming_content = _count_bytes(
+                response.streaming_content, labels
+            )
+        return response
+
+
+def _count_bytes(chunks, labels):
+    for chunk in chunks:
+        store.inc('http_response_size_bytes_total', labels, len(chunk))
+        yield chunk
+
+
+async def _acount_bytes(chunks, labels):
+    async for chunk in chunks:
+        store.inc('http_response_size_bytes_total', labels, len(chunk))
+        yield chunk
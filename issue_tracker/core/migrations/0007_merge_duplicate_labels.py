@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:47
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_labels(apps, schema_editor):
+    """Point issues at the oldest label of each name and drop the rest."""
+    Label = apps.get_model('core', 'Label')
+    IssueLabel = apps.get_model('core', 'Issue').labels.through
+
+    duplicates = Label.objects.values('name').annotate(
+        keep_id=Min('id'), count=Count('id')
+    ).filter(count__gt=1)
+    for duplicate in duplicates:
+        keep_id = duplicate['keep_id']
+        drop_ids = list(Label.objects.filter(
+            name=duplicate['name']
+        ).exclude(id=keep_id).values_list('id', flat=True))
+        issue_ids = IssueLabel.objects.filter(
+            label_id__in=drop_ids
+        ).values_list('issue_id', flat=True).distinct()
+        IssueLabel.objects.bulk_create(
+            [
+                IssueLabel(issue_id=issue_id, label_id=keep_id)
+                for issue_id in issue_ids
+            ],
+            ignore_conflicts=True,
+        )
+        Label.objects.filter(id__in=drop_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_issue_and_membership_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_labels, migrations.RunPython.noop
+        ),
+    ]
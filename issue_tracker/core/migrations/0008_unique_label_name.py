@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_merge_duplicate_labels'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='label',
+            name='name',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+    ]
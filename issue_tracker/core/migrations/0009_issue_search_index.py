@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:05
+
+from django.db import migrations
+
+POSTGRES_CREATE = [
+    '''
+    CREATE TABLE core_issuesearch (
+        issue_id bigint PRIMARY KEY
+            REFERENCES core_issue (id) ON DELETE CASCADE
+            DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    ''',
+    'CREATE INDEX core_issuesearch_document_idx '
+    'ON core_issuesearch USING gin (document)',
+]
+
+SQLITE_CREATE = [
+    '''
+    CREATE VIRTUAL TABLE core_issuesearch USING fts5(
+        title, description, comments, tokenize = 'porter unicode61'
+    )
+    ''',
+]
+
+
+def create_search_table(apps, schema_editor):
+    """Create the search table of the database backend, if supported."""
+    statements = {
+        'postgresql': POSTGRES_CREATE,
+        'sqlite': SQLITE_CREATE,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_table(apps, schema_editor):
+    """Drop the search table."""
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute('DROP TABLE core_issuesearch')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_unique_label_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
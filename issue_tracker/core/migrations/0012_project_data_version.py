@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:08
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_user_auth_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=core.models.random_version),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_project_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='closed_issue_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='high_priority_issue_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='open_issue_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ProjectDueDateCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField()),
+                ('open_issue_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='due_date_counts', to='core.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'due_date'), name='unique_project_due_date')],
+            },
+        ),
+    ]
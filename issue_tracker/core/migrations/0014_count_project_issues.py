@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:15
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def count_project_issues(apps, schema_editor):
+    """Fill the issue counters of the existing projects."""
+    Project = apps.get_model('core', 'Project')
+    Issue = apps.get_model('core', 'Issue')
+    ProjectDueDateCount = apps.get_model('core', 'ProjectDueDateCount')
+
+    issues = Issue.objects.order_by()
+    for row in issues.values('project_id').annotate(
+        open_issue_count=Count('id', filter=Q(status='Open')),
+        closed_issue_count=Count('id', filter=Q(status='Closed')),
+        high_priority_issue_count=Count(
+            'id', filter=Q(status='Open', priority='High')
+        ),
+    ):
+        Project.objects.filter(id=row.pop('project_id')).update(**row)
+
+    ProjectDueDateCount.objects.bulk_create(
+        ProjectDueDateCount(**row)
+        for row in issues.filter(
+            status='Open', due_date__isnull=False
+        ).values('project_id', 'due_date').annotate(
+            open_issue_count=Count('id')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_project_issue_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            count_project_issues, migrations.RunPython.noop
+        ),
+    ]
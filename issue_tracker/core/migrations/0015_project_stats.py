@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_count_project_issues'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('key', models.CharField(max_length=50)),
+                ('issue_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='core.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'dimension', 'key'), name='unique_project_stat')],
+            },
+        ),
+    ]
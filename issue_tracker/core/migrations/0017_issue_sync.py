@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_change_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedIssue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'updated_at', 'id'], name='issue_project_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletedissue',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_issues', to='core.project'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedissue',
+            index=models.Index(fields=['project', 'deleted_at', 'id'], name='deleted_issue_project_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_issue_sync'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deletedissue',
+            name='issue_id',
+            field=models.BigIntegerField(),
+        ),
+    ]
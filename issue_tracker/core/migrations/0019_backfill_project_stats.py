@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:40
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def count_project_stats(apps, schema_editor):
+    """
+    Fill the stats of the existing projects, grouped as
+    core.counters.recount() groups them.
+    """
+    Issue = apps.get_model('core', 'Issue')
+    ProjectStat = apps.get_model('core', 'ProjectStat')
+    issues = Issue.objects.order_by()
+
+    stats = [
+        ProjectStat(
+            project_id=row['project_id'],
+            dimension='status_priority',
+            key=f"{row['status']}:{row['priority']}",
+            issue_count=row['count'],
+        )
+        for row in issues.values(
+            'project_id', 'status', 'priority'
+        ).annotate(count=Count('id'))
+    ] + [
+        ProjectStat(
+            project_id=row['project_id'],
+            dimension='assignee',
+            key=str(row['assigned_to_id']),
+            issue_count=row['count'],
+        )
+        for row in issues.values(
+            'project_id', 'assigned_to_id'
+        ).annotate(count=Count('id'))
+    ] + [
+        ProjectStat(
+            project_id=row['issue__project_id'],
+            dimension='label',
+            key=str(row['label_id']),
+            issue_count=row['count'],
+        )
+        for row in Issue.labels.through.objects.order_by().values(
+            'issue__project_id', 'label_id'
+        ).annotate(count=Count('id'))
+    ]
+    # Rows moved by writes since the table was created are replaced.
+    ProjectStat.objects.all().delete()
+    ProjectStat.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_deleted_issue_big_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            count_project_stats, migrations.RunPython.noop
+        ),
+    ]
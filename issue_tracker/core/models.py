@@ -1,7 +1,13 @@
 """
 Database models.
 """
+import secrets
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -34,19 +40,117 @@ class UserManager(BaseUserManager):
         return user
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class CounterFieldsMixin:
+    """
+    Model mixin keeping save() from writing back counter_fields.
+
+    Counters are bumped in place with F() expressions, so the value held
+    by an instance may be stale and writing it back could lose bumps.
+    """
+    counter_fields = ()
+
+    def get_unsaved_fields(self):
+        """Return the names of the fields save() must not write back."""
+        return self.counter_fields
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            unsaved = self.get_unsaved_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in unsaved
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+def random_version():
+    """Return a starting version for a versioned row."""
+    # Rows reusing the id of a deleted (or rolled back) row must not
+    # start at a version cached for the earlier row.
+    return secrets.randbelow(2 ** 31)
+
+
+class User(CounterFieldsMixin, AbstractBaseUser, PermissionsMixin):
     """User in the system."""
     email = models.EmailField(max_length=255, unique=True)
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped whenever one of the user's project memberships changes.
+    membership_version = models.PositiveIntegerField(default=0)
+    # Bumped whenever the password or access flags change, revoking the
+    # tokens issued for earlier versions.
+    auth_version = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
+    counter_fields = ('membership_version',)
+    # Fields revoking access when changed. Copies of the user served by
+    # the authentication cache (from_cache) may hold stale values of them,
+    # so such copies never write them back.
+    access_fields = (
+        'password', 'is_active', 'is_staff', 'is_superuser', 'auth_version',
+    )
+    from_cache = False
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self.auth_version += 1
+
+    def get_unsaved_fields(self):
+        if self.from_cache:
+            return self.counter_fields + self.access_fields
+        return self.counter_fields
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if self.from_cache and update_fields is not None:
+            update_fields = [
+                name for name in update_fields
+                if name not in self.access_fields
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
 
 
-class Project(models.Model):
+def _count_per_project(queryset):
+    """Return a subquery counting the rows of queryset per outer project."""
+    counts = queryset.filter(project=OuterRef('pk')).order_by().values(
+        'project'
+    ).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts), 0)
+
+
+class ProjectQuerySet(models.QuerySet):
+    """Queries for projects."""
+
+    def with_counts(self, fields=None):
+        """
+        Annotate the overdue issue count and the member count, or only
+        those of them in fields.
+        """
+        counts = {}
+        if fields is None or 'overdue_issue_count' in fields:
+            overdue = ProjectDueDateCount.objects.filter(
+                project=OuterRef('pk'), due_date__lt=timezone.localdate()
+            ).order_by().values('project').annotate(
+                count=Sum('open_issue_count')
+            ).values('count')
+            counts['overdue_issue_count'] = Coalesce(Subquery(overdue), 0)
+        if fields is None or 'member_count' in fields:
+            counts['member_count'] = _count_per_project(
+                ProjectMembership.objects
+            )
+        return self.annotate(**counts)
+
+    def bump_data_version(self):
+        """Mark the cached data of the projects as stale."""
+        return self.update(data_version=F('data_version') + 1)
+
+
+class Project(CounterFieldsMixin, models.Model):
 
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -55,6 +159,21 @@ class Project(models.Model):
     )
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
+    # Bumped by every write to the project, its issues, their comments and
+    # labels, or its memberships. Keys cached responses.
+    data_version = models.PositiveBigIntegerField(default=random_version)
+    # Maintained by core.counters.
+    open_issue_count = models.IntegerField(default=0)
+    closed_issue_count = models.IntegerField(default=0)
+    high_priority_issue_count = models.IntegerField(default=0)
+
+    objects = ProjectQuerySet.as_manager()
+    counter_fields = (
+        'data_version',
+        'open_issue_count',
+        'closed_issue_count',
+        'high_priority_issue_count',
+    )
 
     def __str__(self) -> str:
         return self.name
@@ -72,10 +191,56 @@ class ProjectMembership(models.Model):
 
     class Meta:
         unique_together = ('user', 'project')
+        indexes = [
+            # Covers per-project member listings and role checks.
+            models.Index(
+                fields=['project', 'role', 'user'],
+                name='membership_project_role_idx',
+            ),
+        ]
+
+
+class ProjectDueDateCount(models.Model):
+    """Number of open issues of a project due on a date."""
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='due_date_counts'
+    )
+    due_date = models.DateField()
+    open_issue_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'due_date'],
+                name='unique_project_due_date',
+            ),
+        ]
+
+
+class ProjectStat(models.Model):
+    """Number of issues of a project sharing a value of a dimension."""
+    STATUS_PRIORITY = 'status_priority'
+    ASSIGNEE = 'assignee'
+    LABEL = 'label'
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='stats'
+    )
+    dimension = models.CharField(max_length=20)
+    key = models.CharField(max_length=50)
+    issue_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'dimension', 'key'],
+                name='unique_project_stat',
+            ),
+        ]
 
 
 class Label(models.Model):
-    name = models.CharField(max_length=50)
+    name = models.CharField(max_length=50, unique=True)
 
     def __str__(self):
         return self.name
@@ -128,6 +293,26 @@ class Issue(models.Model):
     )
     due_date = models.DateField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['project', 'status', '-id'],
+                name='issue_project_status_idx',
+            ),
+            models.Index(
+                fields=['assigned_to', '-id'],
+                name='issue_assigned_to_idx',
+            ),
+            models.Index(
+                fields=['created_by', '-id'],
+                name='issue_created_by_idx',
+            ),
+            models.Index(
+                fields=['project', 'updated_at', 'id'],
+                name='issue_project_updated_idx',
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.title
 
@@ -147,3 +332,43 @@ class Comment(models.Model):
 
     def __str__(self):
         return f"Comment by {self.created_by.email} on {self.issue.title}"
+
+
+class ChangeEvent(models.Model):
+    """
+    A change of an issue or comment, pushed to the live feed of its
+    project. The log is bounded; see ``core.changes``.
+    """
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='change_events'
+    )
+    kind = models.CharField(max_length=30)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['project', 'id'], name='change_event_project_idx'
+            ),
+        ]
+
+
+class DeletedIssue(models.Model):
+    """
+    The tombstone of a deleted issue, read by clients syncing the issues
+    of its project. Tombstones expire; see ``core.sync``.
+    """
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='deleted_issues'
+    )
+    issue_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['project', 'deleted_at', 'id'],
+                name='deleted_issue_project_idx',
+            ),
+        ]
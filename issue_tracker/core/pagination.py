@@ -0,0 +1,18 @@
+"""
+Pagination classes for the API views.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class IssueCursorPagination(CursorPagination):
+    """
+    Keyset pagination for issue lists.
+
+    Pages seek on the primary key (``WHERE id < <cursor>``) instead of
+    scanning an ``OFFSET``, so deep pages cost the same as the first one
+    and rows inserted while a client is paging never shift its pages.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,170 @@
+"""
+Opt-in profiling of requests.
+
+``ProfilingMiddleware`` profiles requests carrying the
+``REQUEST_PROFILING_HEADER`` header and a ``REQUEST_PROFILING_SAMPLE_RATE``
+share of all others. A profile splits the time of a request into disjoint
+phases:
+
+* ``db``: queries, timed with ``connection.execute_wrapper``;
+* ``auth``: authentication, timed by the authentication class;
+* ``app``: the rest of the view, mostly serialization;
+* ``render``: rendering the response;
+
+and reports them with the query count in a ``Server-Timing`` header and a
+JSON log line. Queries run while a streaming response is consumed are not
+covered. The middleware is sync-only: under ASGI, enabling it runs every
+request, async views included, in a thread.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('db', 'auth', 'app', 'render')
+
+
+class Profile:
+    """Phase durations of one request, in seconds."""
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.total = None
+        self._started = self.mark()
+        self._view = self._render = None
+
+    def mark(self):
+        """Return the time and the query time so far."""
+        return time.perf_counter(), self.durations['db']
+
+    def record_query(self, execute, sql, params, many, context):
+        """Execute wrapper timing a query."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += time.perf_counter() - start
+            self.queries += 1
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the block, less its queries, to name."""
+        start, db = self.mark()
+        try:
+            yield
+        finally:
+            now, now_db = self.mark()
+            self.durations[name] += now - start - (now_db - db)
+
+    def start_view(self):
+        self._view = self.mark()
+
+    def start_render(self):
+        self._render = self.mark()
+
+    def finish(self):
+        end = self.mark()
+        self.total = end[0] - self._started[0]
+        render = self._render or end
+        if self._view is not None:
+            self.durations['app'] = max(
+                _elapsed(self._view, render) - self.durations['auth'], 0.0
+            )
+        self.durations['render'] = _elapsed(render, end)
+
+    def server_timing(self):
+        """Return the Server-Timing header value of the profile."""
+        metrics = [
+            f'{name};dur={self.durations[name] * 1000:.1f}'
+            for name in PHASES
+        ]
+        metrics[0] += f';desc="{self.queries} queries"'
+        metrics.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        return {
+            **{
+                f'{name}_ms': round(self.durations[name] * 1000, 1)
+                for name in PHASES
+            },
+            'queries': self.queries,
+            'total_ms': round(self.total * 1000, 1),
+        }
+
+
+def _elapsed(start, end):
+    """Return the time between two marks, less their query time."""
+    return (end[0] - start[0]) - (end[1] - start[1])
+
+
+def get_profile(request):
+    """Return the profile of request, a Django or DRF request, or None."""
+    return getattr(request, '_profile', None)
+
+
+@contextmanager
+def phase(request, name):
+    """Time a block of a request as phase name if it is profiled."""
+    profile = get_profile(request)
+    if profile is None:
+        yield
+        return
+    with profile.phase(name):
+        yield
+
+
+class ProfilingMiddleware:
+    """Profile sampled requests; see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = settings.REQUEST_PROFILING_HEADER
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+
+    def is_sampled(self, request):
+        return bool(request.headers.get(self.header)) or (
+            self.sample_rate > 0 and random.random() < self.sample_rate
+        )
+
+    def __call__(self, request):
+        if not self.is_sampled(request):
+            return self.get_response(request)
+
+        profile = request._profile = Profile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(profile.record_query)
+                )
+            response = self.get_response(request)
+        profile.finish()
+
+        response['Server-Timing'] = profile.server_timing()
+        logger.info(json.dumps({
+            'event': 'request_profile',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **profile.as_dict(),
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = get_profile(request)
+        if profile is not None:
+            profile.start_view()
+
+    def process_template_response(self, request, response):
+        # Responses are rendered right after this hook.
+        profile = get_profile(request)
+        if profile is not None:
+            profile.start_render()
+        return response
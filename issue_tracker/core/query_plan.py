@@ -0,0 +1,200 @@
+"""
+Query plans derived from serializers.
+
+A plan lists the ``select_related``/``prefetch_related``/``only()`` work a
+queryset needs so that a serializer can render every row without issuing
+further queries.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from core.sparse_fields import get_sparse_kwargs
+
+
+class QueryPlan:
+    """The related rows and columns a serializer reads from one model."""
+
+    def __init__(self, model):
+        self.model = model
+        self.select_related = set()
+        self.prefetch = {}
+        self.only = set()
+        # Cleared when the serializer reads attributes we cannot map to
+        # columns (properties, method fields), so no column is deferred.
+        self.deferrable = True
+
+    def apply(self, queryset, defer=True):
+        """Return queryset with the plan applied."""
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        for lookup, plan in sorted(self.prefetch.items()):
+            # Prefetch objects are mutated while prefetching, so a fresh
+            # one is built for every queryset.
+            queryset = queryset.prefetch_related(Prefetch(
+                lookup,
+                queryset=plan.apply(plan.model._default_manager.all(), defer),
+            ))
+        if defer and self.deferrable and self.only:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+
+def _add_fields(plan, model, serializer, prefix, fields=None):
+    """Add the readable fields of serializer, rooted at prefix, to plan."""
+    for name, field in serializer.fields.items():
+        if fields is not None and name not in fields:
+            continue
+        if field.write_only:
+            continue
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                _add_fields(plan, model, field, prefix)
+            elif isinstance(field, serializers.HyperlinkedIdentityField):
+                if field.lookup_field != 'pk':
+                    _add_source(
+                        plan, model, field, [field.lookup_field], prefix
+                    )
+            elif not _is_pk_only(field):
+                plan.deferrable = False
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            plan.deferrable = False
+            continue
+        _add_source(plan, model, field, field.source_attrs, prefix)
+
+
+def _is_pk_only(field):
+    """Return True if a relational field only reads the related pk."""
+    if isinstance(field, serializers.ManyRelatedField):
+        field = field.child_relation
+    return isinstance(field, serializers.RelatedField) \
+        and field.use_pk_only_optimization()
+
+
+def _add_source(plan, model, field, attrs, prefix):
+    """Add the columns and relations behind a dotted field source."""
+    name, rest = attrs[0], attrs[1:]
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # Properties and methods may read any column. Names the model
+        # does not define are annotations (or are never rendered).
+        if hasattr(model, name):
+            plan.deferrable = False
+        return
+
+    path = prefix + name
+    if not model_field.is_relation:
+        plan.only.add(path)
+    elif model_field.many_to_many or model_field.one_to_many:
+        plan.prefetch[path] = _plan_many(model_field, field, rest)
+    elif model_field.concrete:
+        plan.only.add(path)
+        if rest:
+            plan.select_related.add(path)
+            _add_source(
+                plan, model_field.related_model, field, rest, path + '__'
+            )
+        elif isinstance(field, serializers.BaseSerializer):
+            plan.select_related.add(path)
+            _add_fields(plan, model_field.related_model, field, path + '__')
+        elif not _is_pk_only(field):
+            plan.select_related.add(path)
+            plan.deferrable = False
+    else:
+        # Reverse one-to-one: joinable, but its columns cannot be deferred.
+        plan.select_related.add(path)
+        plan.deferrable = False
+
+
+def _plan_many(model_field, field, rest):
+    """Return the plan of the queryset prefetched for a to-many field."""
+    related_model = model_field.related_model
+    plan = QueryPlan(related_model)
+    if model_field.one_to_many:
+        # The prefetch matches rows to their parent through this column.
+        plan.only.add(model_field.field.name)
+
+    if rest:
+        plan.deferrable = False
+    elif isinstance(field, serializers.ListSerializer):
+        _add_fields(plan, related_model, field.child, '')
+    elif _is_pk_only(field):
+        plan.only.add(related_model._meta.pk.name)
+    else:
+        plan.deferrable = False
+    return plan
+
+
+@lru_cache(maxsize=None)
+def get_query_plan(serializer_class, fields=None, expand=None):
+    """
+    Return the QueryPlan for serializer_class.
+
+    fields optionally restricts the plan to a frozenset of top-level
+    field names, and expand to the frozenset of nested objects expanded by
+    a sparse serializer (see ``core.sparse_fields``). Returns None when
+    the serializer is not a model serializer.
+    """
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if model is None:
+        return None
+    plan = QueryPlan(model)
+    serializer = serializer_class() if expand is None \
+        else serializer_class(expand=expand)
+    _add_fields(plan, model, serializer, '', fields)
+    return plan
+
+
+def plan_queryset(queryset, serializer_class, fields=None, expand=None,
+                  defer=True):
+    """
+    Apply the query plan of serializer_class to queryset.
+
+    Querysets of a different model than the serializer's are returned
+    untouched.
+    """
+    if fields is not None:
+        fields = frozenset(fields)
+    if expand is not None:
+        expand = frozenset(expand)
+    plan = get_query_plan(serializer_class, fields, expand)
+    if plan is None or plan.model is not queryset.model:
+        return queryset
+    return plan.apply(queryset, defer)
+
+
+class QueryPlanMixin:
+    """
+    Viewset mixin applying the query plan of the action's serializer.
+
+    Columns are only deferred for safe methods, so writes always work
+    on fully loaded instances. Reads render and plan the sparse fieldset
+    requested by their ``fields`` and ``expand`` params.
+    """
+
+    def get_sparse_kwargs(self):
+        """Return the fields and expand arguments of the request."""
+        if not hasattr(self, '_sparse_kwargs'):
+            self._sparse_kwargs = get_sparse_kwargs(
+                self.request, self.get_serializer_class()
+            )
+        return self._sparse_kwargs
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(
+            *args, **self.get_sparse_kwargs(), **kwargs
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return plan_queryset(
+            queryset,
+            self.get_serializer_class(),
+            **self.get_sparse_kwargs(),
+            defer=self.request.method in SAFE_METHODS,
+        )
@@ -0,0 +1,49 @@
+"""
+Fast JSON rendering of API responses.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    # Left to the encoder, which formats them differently.
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+# JSONRenderer escapes U+2028 and U+2029, keeping JSON a JavaScript subset.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding compact responses with orjson.
+
+    The output is that of JSONRenderer, except that NaN and infinities,
+    which it rejects, render as null. Indented responses and data orjson
+    cannot encode are rendered by JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or self.ensure_ascii or not self.compact \
+                or self.get_indent(
+                    accepted_media_type, renderer_context or {}
+                ) is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
@@ -0,0 +1,213 @@
+"""
+Full-text search over issues and their comments.
+
+Every issue has one document in the ``core_issuesearch`` table holding its
+title, description and comment texts. On PostgreSQL the document is a
+weighted ``tsvector`` column with a GIN index; on SQLite the table is an
+FTS5 virtual table keyed by the issue id. The table is created by the
+``0009_issue_search_index`` migration and kept up to date by the signal
+handlers in ``core.signals``.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection
+
+from core.models import Comment, Issue
+
+SEARCH_TABLE = 'core_issuesearch'
+
+# Relative weights of the title, description and comments of an issue.
+WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def _scope(user_id, project_id):
+    """Return SQL and params restricting issues ``i`` to a user's projects."""
+    sql = 'i.project_id IN (SELECT project_id FROM core_projectmembership ' \
+        'WHERE user_id = %s'
+    params = [user_id]
+    if project_id is not None:
+        sql += ' AND project_id = %s'
+        params.append(project_id)
+    return sql + ')', params
+
+
+class PostgresSearchBackend:
+    """Search documents stored as tsvectors."""
+
+    def upsert(self, cursor, rows):
+        cursor.executemany(
+            f'''
+            INSERT INTO {SEARCH_TABLE} (issue_id, document)
+            VALUES (
+                %s,
+                setweight(to_tsvector('english', %s), 'A') ||
+                setweight(to_tsvector('english', %s), 'B') ||
+                setweight(to_tsvector('english', %s), 'C')
+            )
+            ON CONFLICT (issue_id) DO UPDATE SET document = EXCLUDED.document
+            ''',
+            rows,
+        )
+
+    def delete(self, cursor, issue_ids):
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE issue_id = ANY(%s)',
+            [list(issue_ids)],
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search(self, cursor, query, user_id, project_id, limit):
+        # ts_rank takes the weights of the {D, C, B, A} labels in [0, 1].
+        weights = [0.0] + [weight / WEIGHTS[0] for weight in WEIGHTS[::-1]]
+        scope, params = _scope(user_id, project_id)
+        cursor.execute(
+            f'''
+            SELECT i.id, ts_rank(%s::float4[], s.document, q) AS score
+            FROM {SEARCH_TABLE} s
+            JOIN core_issue i ON i.id = s.issue_id,
+                websearch_to_tsquery('english', %s) q
+            WHERE s.document @@ q AND {scope}
+            ORDER BY score DESC, i.id DESC
+            LIMIT %s
+            ''',
+            [weights, query, *params, limit],
+        )
+        return cursor.fetchall()
+
+
+class SQLiteSearchBackend:
+    """Search documents stored in an FTS5 table."""
+
+    def upsert(self, cursor, rows):
+        self.delete(cursor, [row[0] for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} '
+            '(rowid, title, description, comments) VALUES (%s, %s, %s, %s)',
+            rows,
+        )
+
+    def delete(self, cursor, issue_ids):
+        issue_ids = list(issue_ids)
+        if issue_ids:
+            placeholders = ', '.join(['%s'] * len(issue_ids))
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+                issue_ids,
+            )
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, cursor, query, user_id, project_id, limit):
+        # Quote every term so user input cannot use FTS5 query syntax.
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"' for term in terms)
+        scope, params = _scope(user_id, project_id)
+        cursor.execute(
+            f'''
+            SELECT i.id, -bm25({SEARCH_TABLE}, %s, %s, %s) AS score
+            FROM {SEARCH_TABLE}
+            JOIN core_issue i ON i.id = {SEARCH_TABLE}.rowid
+            WHERE {SEARCH_TABLE} MATCH %s AND {scope}
+            ORDER BY score DESC, i.id DESC
+            LIMIT %s
+            ''',
+            [*WEIGHTS, match, *params, limit],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SQLiteSearchBackend(),
+}
+
+
+def get_backend():
+    """Return the search backend of the database, or None."""
+    return BACKENDS.get(connection.vendor)
+
+
+def _documents(issue_ids):
+    """Return (id, title, description, comments) rows for issue_ids."""
+    comments = defaultdict(list)
+    for issue_id, text in Comment.objects.filter(
+        issue_id__in=issue_ids
+    ).order_by('id').values_list('issue_id', 'text'):
+        comments[issue_id].append(text)
+
+    return [
+        (issue_id, title, description, '\n'.join(comments[issue_id]))
+        for issue_id, title, description in Issue.objects.filter(
+            id__in=issue_ids
+        ).values_list('id', 'title', 'description')
+    ]
+
+
+def index_issues(issue_ids):
+    """Rebuild the search documents of issue_ids."""
+    backend = get_backend()
+    issue_ids = list(issue_ids)
+    if backend is None or not issue_ids:
+        return
+    rows = _documents(issue_ids)
+    with connection.cursor() as cursor:
+        backend.upsert(cursor, rows)
+        backend.delete(cursor, set(issue_ids) - {row[0] for row in rows})
+
+
+def remove_issues(issue_ids):
+    """Drop the search documents of issue_ids."""
+    backend = get_backend()
+    issue_ids = list(issue_ids)
+    if backend is None or not issue_ids:
+        return
+    with connection.cursor() as cursor:
+        backend.delete(cursor, issue_ids)
+
+
+def rebuild(chunk_size=1000, progress=None):
+    """
+    Rebuild the whole search index in chunks of issues.
+
+    progress, if given, is called with the number of issues indexed so
+    far after every chunk. Return the number of issues indexed.
+    """
+    backend = get_backend()
+    if backend is None:
+        return 0
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+
+    indexed, last_id = 0, 0
+    while True:
+        issue_ids = list(Issue.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', flat=True)[:chunk_size])
+        if not issue_ids:
+            return indexed
+        index_issues(issue_ids)
+        indexed += len(issue_ids)
+        last_id = issue_ids[-1]
+        if progress:
+            progress(indexed)
+
+
+def search_issues(query, user, project_id=None, limit=50):
+    """
+    Return (issue_id, rank) pairs matching query, best match first.
+
+    Only issues of projects user is a member of are searched, optionally
+    narrowed to one project.
+    """
+    backend = get_backend()
+    if backend is None or not query.strip():
+        return []
+
+    with connection.cursor() as cursor:
+        return backend.search(cursor, query, user.id, project_id, limit)
@@ -0,0 +1,234 @@
+"""
+Generation of large synthetic datasets.
+
+Populations are drawn from a seeded random generator, so a seed always
+produces the same data. Project sizes, assignees and labels follow Zipf
+distributions, so a few projects hold most issues and a few members and
+labels most of a project's issues, as in real trackers. Issues, label links
+and comments are written with the bulk writers of ``core.importer`` and
+indexed for search per batch; the counters of the seeded projects are
+recounted once at the end.
+"""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import counters, search
+from core.importer import (
+    COMMENT_FIELDS,
+    ISSUE_FIELDS,
+    LABEL_FIELDS,
+    WRITERS,
+)
+from core.models import Comment, Issue, Project, ProjectMembership
+from issues.serializers import resolve_label_ids
+
+SEED_BATCH_SIZE = 10000
+SEED_PASSWORD = 'password'
+
+LABEL_NAMES = (
+    'bug', 'feature', 'enhancement', 'documentation', 'question',
+    'performance', 'security', 'ui', 'backend', 'frontend', 'api',
+    'database', 'tests', 'refactor', 'regression', 'good first issue',
+)
+
+STATUS_WEIGHTS = {'Open': 40, 'Closed': 60}
+PRIORITY_WEIGHTS = {'Low': 30, 'Medium': 50, 'High': 20}
+LABELS_PER_ISSUE_WEIGHTS = {0: 30, 1: 40, 2: 20, 3: 10}
+COMMENTS_PER_ISSUE_WEIGHTS = {0: 40, 1: 25, 2: 15, 3: 10, 5: 6, 10: 4}
+DUE_DATE_SHARE = 0.4
+HISTORY_DAYS = 365
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """Return cumulative Zipf weights of count ranked items."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Seeder:
+    """Writes users, projects, memberships, issues and comments."""
+
+    def __init__(self, seed=0, batch_size=SEED_BATCH_SIZE, progress=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.progress = progress or (lambda message: None)
+        self.now = timezone.now()
+
+    def email(self, number):
+        return f'seed{self.seed}-user{number}@example.com'
+
+    def create_users(self, count):
+        """Create count users sharing SEED_PASSWORD; return their ids."""
+        password = make_password(SEED_PASSWORD)
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            (
+                User(
+                    email=self.email(number),
+                    name=f'Seed User {number}',
+                    password=password,
+                )
+                for number in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        self.progress(f'Created {count} users.')
+        return [user.id for user in users]
+
+    def create_projects(self, count, user_ids, max_members=50):
+        """
+        Create count projects with their memberships.
+
+        Return (project_id, member_ids) pairs, largest projects first.
+        """
+        owners = [self.rng.choice(user_ids) for _ in range(count)]
+        projects = Project.objects.bulk_create(
+            (
+                Project(
+                    name=f'Seed Project {number}',
+                    description=f'Synthetic project {number}.',
+                    created_by_id=owner,
+                )
+                for number, owner in enumerate(owners)
+            ),
+            batch_size=self.batch_size,
+        )
+
+        teams, memberships = [], []
+        for project, owner in zip(projects, owners):
+            size = min(
+                len(user_ids),
+                max_members,
+                int(self.rng.paretovariate(1.2) * 2),
+            )
+            members = [owner] + [
+                user_id for user_id in self.rng.sample(user_ids, size)
+                if user_id != owner
+            ][:max(size - 1, 0)]
+            teams.append((project.id, members))
+            memberships.extend(
+                ProjectMembership(
+                    user_id=user_id,
+                    project_id=project.id,
+                    role='admin' if user_id == owner else 'developer',
+                )
+                for user_id in members
+            )
+        ProjectMembership.objects.bulk_create(
+            memberships, batch_size=self.batch_size
+        )
+        self.progress(
+            f'Created {count} projects with {len(memberships)} members.'
+        )
+        return teams
+
+    def create_issues(self, count, teams, label_count=len(LABEL_NAMES),
+                      index=True):
+        """
+        Create count issues with labels and comments, indexed for search
+        if index.
+
+        Return the numbers of issues and comments created.
+        """
+        rng = self.rng
+        writer = WRITERS[connection.vendor]
+        label_ids = list(resolve_label_ids(
+            LABEL_NAMES[number] if number < len(LABEL_NAMES)
+            else f'label {number}'
+            for number in range(label_count)
+        ).values())
+        project_weights = zipf_cum_weights(len(teams), exponent=1.0)
+        label_weights = zipf_cum_weights(len(label_ids))
+        team_weights = {}
+        statuses = (list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))
+        priorities = (list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values()))
+        labels_per_issue = (
+            list(LABELS_PER_ISSUE_WEIGHTS),
+            list(LABELS_PER_ISSUE_WEIGHTS.values()),
+        )
+        comments_per_issue = (
+            list(COMMENTS_PER_ISSUE_WEIGHTS),
+            list(COMMENTS_PER_ISSUE_WEIGHTS.values()),
+        )
+        today = timezone.localdate()
+
+        created = comments_created = 0
+        while created < count:
+            size = min(self.batch_size, count - created)
+            issues, pairs, comments = [], [], []
+            for _ in range(size):
+                project_id, members = rng.choices(
+                    teams, cum_weights=project_weights
+                )[0]
+                if project_id not in team_weights:
+                    team_weights[project_id] = zipf_cum_weights(len(members))
+                created_at = self.now - timedelta(
+                    seconds=rng.randrange(HISTORY_DAYS * 86400)
+                )
+                due_date = None
+                if rng.random() < DUE_DATE_SHARE:
+                    due_date = today + timedelta(days=rng.randint(-60, 90))
+                issues.append({
+                    'project_id': project_id,
+                    'title': f'Seed issue {created + len(issues)}',
+                    'description': 'Synthetic issue.',
+                    'status': rng.choices(*statuses)[0],
+                    'priority': rng.choices(*priorities)[0],
+                    'due_date': due_date,
+                    'created_by_id': rng.choice(members),
+                    'assigned_to_id': rng.choices(
+                        members, cum_weights=team_weights[project_id]
+                    )[0],
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                })
+                labels = set(rng.choices(
+                    label_ids, cum_weights=label_weights,
+                    k=rng.choices(*labels_per_issue)[0],
+                ))
+                pairs.append(labels)
+                comments.append([
+                    {
+                        'created_by_id': rng.choice(members),
+                        'text': 'Synthetic comment.',
+                        'created_at': created_at,
+                    }
+                    for _ in range(rng.choices(*comments_per_issue)[0])
+                ])
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                issue_ids = writer.allocate_ids(cursor, Issue, size)
+                for issue, issue_id in zip(issues, issue_ids):
+                    issue['id'] = issue_id
+                writer.insert(cursor, Issue, ISSUE_FIELDS, issues)
+                writer.insert(cursor, Issue.labels.through, LABEL_FIELDS, [
+                    {'issue_id': issue_id, 'label_id': label_id}
+                    for issue_id, labels in zip(issue_ids, pairs)
+                    for label_id in labels
+                ])
+                writer.insert(cursor, Comment, COMMENT_FIELDS, [
+                    {**comment, 'issue_id': issue_id}
+                    for issue_id, rows in zip(issue_ids, comments)
+                    for comment in rows
+                ])
+                if index:
+                    search.index_issues(issue_ids)
+            created += size
+            comments_created += sum(map(len, comments))
+            self.progress(f'Created {created} issues...')
+        return created, comments_created
+
+    def recount(self, teams, chunk_size=1000):
+        """Recount the issue counters of the seeded projects."""
+        project_ids = [project_id for project_id, _ in teams]
+        for start in range(0, len(project_ids), chunk_size):
+            counters.recount(project_ids[start:start + chunk_size])
+        self.progress(f'Recounted {len(project_ids)} projects.')
@@ -0,0 +1,330 @@
+"""
+Signal handlers keeping derived data in step with model writes.
+"""
+from collections import defaultdict
+
+from django.db.models import F, Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import changes, counters, search, sync
+from core.membership import membership_cache
+from core.models import (
+    Comment,
+    Issue,
+    Label,
+    Project,
+    ProjectMembership,
+    ProjectStat,
+    User,
+)
+
+# The fields of users rendered in the issues and comments they embed in.
+USER_RENDERED_FIELDS = ('email', 'name')
+
+
+@receiver(post_save, sender=Issue)
+def index_saved_issue(sender, instance, **kwargs):
+    """Refresh the search document of a saved issue."""
+    search.index_issues([instance.id])
+
+
+@receiver(post_delete, sender=Issue)
+def unindex_deleted_issue(sender, instance, **kwargs):
+    """Drop the search document of a deleted issue."""
+    search.remove_issues([instance.id])
+
+
+def _deleted_with_issue(origin):
+    """Return True if a deletion started from an issue or a project."""
+    return getattr(origin, 'model', type(origin)) in (Issue, Project)
+
+
+@receiver(post_save, sender=Comment)
+def index_commented_issue(sender, instance, **kwargs):
+    """Refresh the search document of the issue of a saved comment."""
+    search.index_issues([instance.issue_id])
+
+
+@receiver(post_delete, sender=Comment)
+def index_uncommented_issue(sender, instance, origin=None, **kwargs):
+    """Refresh the search document of the issue of a deleted comment."""
+    # Comments deleted along with their issue need no reindexing.
+    if not _deleted_with_issue(origin):
+        search.index_issues([instance.issue_id])
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def bump_membership_version(sender, instance, **kwargs):
+    """Invalidate the cached memberships of the member."""
+    User.objects.filter(id=instance.user_id).update(
+        membership_version=F('membership_version') + 1
+    )
+    membership_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def reset_memberships(sender, instance, created, **kwargs):
+    """Forget memberships cached for a previous user with the same id."""
+    if created:
+        membership_cache.invalidate(instance.id)
+
+
+@receiver(post_save, sender=Project)
+def bump_saved_project(sender, instance, **kwargs):
+    """Mark the cached data of a saved project as stale."""
+    Project.objects.filter(id=instance.id).bump_data_version()
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+def bump_issue_project(sender, instance, origin=None, **kwargs):
+    """Mark the cached data of the project of an issue as stale."""
+    if getattr(origin, 'model', type(origin)) is not Project:
+        Project.objects.filter(id=instance.project_id).bump_data_version()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_project(sender, instance, origin=None, **kwargs):
+    """Mark the cached data of the project of a comment as stale."""
+    if not _deleted_with_issue(origin):
+        Project.objects.filter(
+            issues=instance.issue_id
+        ).bump_data_version()
+
+
+@receiver(post_save, sender=Label)
+@receiver(pre_delete, sender=Label)
+def bump_label_projects(sender, instance, **kwargs):
+    """Mark the cached data of the projects using a label as stale."""
+    # Deletion is handled before the label is detached from its issues.
+    Project.objects.filter(
+        id__in=Issue.objects.filter(labels=instance).values('project_id')
+    ).bump_data_version()
+
+
+@receiver(m2m_changed, sender=Issue.labels.through)
+def bump_labelled_projects(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Mark the cached data of projects whose issue labels changed."""
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        issues = Issue.objects.filter(id=instance.id)
+    elif reverse and action in ('post_add', 'post_remove'):
+        issues = Issue.objects.filter(id__in=pk_set)
+    elif reverse and action == 'pre_clear':
+        issues = Issue.objects.filter(labels=instance)
+    else:
+        return
+    Project.objects.filter(
+        id__in=issues.values('project_id')
+    ).bump_data_version()
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def bump_membership_project(sender, instance, **kwargs):
+    """Mark the cached data of the project of a membership as stale."""
+    Project.objects.filter(id=instance.project_id).bump_data_version()
+
+
+@receiver(pre_save, sender=Issue)
+def remember_counted_state(sender, instance, update_fields=None, **kwargs):
+    """Remember the counted fields of an issue as stored before saving."""
+    instance._counted_state = None
+    counted = {field.removesuffix('_id') for field in counters.COUNTED_FIELDS}
+    if instance._state.adding or update_fields is not None and not (
+        {field.removesuffix('_id') for field in update_fields} & counted
+    ):
+        return
+    instance._counted_state = Issue.objects.filter(
+        id=instance.id
+    ).values(*counters.COUNTED_FIELDS).first()
+
+
+@receiver(post_save, sender=Issue)
+def count_saved_issue(sender, instance, created, **kwargs):
+    """Move the project counters by the change of a saved issue."""
+    old = getattr(instance, '_counted_state', None)
+    if created or old is not None:
+        counters.adjust(
+            added=[counters.counted_state(instance)],
+            removed=[old] if old else [],
+        )
+
+
+@receiver(pre_delete, sender=Issue)
+def remember_issue_labels(sender, instance, **kwargs):
+    """Remember the labels of an issue before they are deleted with it."""
+    instance._label_ids = list(
+        instance.labels.values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Issue)
+def uncount_deleted_issue(sender, instance, origin=None, **kwargs):
+    """Remove a deleted issue from the project counters."""
+    if getattr(origin, 'model', type(origin)) is not Project:
+        counters.adjust(removed=[counters.counted_state(instance)])
+        counters.adjust_labels({
+            (instance.project_id, label_id): -1
+            for label_id in getattr(instance, '_label_ids', [])
+        })
+
+
+@receiver(m2m_changed, sender=Issue.labels.through)
+def count_issue_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    """Move the label stats of projects whose issue labels changed."""
+    sign = 1 if action == 'post_add' else -1
+    if action in ('post_add', 'post_remove'):
+        if not reverse:
+            pairs = [(instance.project_id, label_id) for label_id in pk_set]
+        else:
+            pairs = [
+                (project_id, instance.id)
+                for project_id in Issue.objects.filter(
+                    id__in=pk_set
+                ).values_list('project_id', flat=True)
+            ]
+    elif action == 'pre_clear':
+        if not reverse:
+            pairs = [
+                (instance.project_id, label_id)
+                for label_id in instance.labels.values_list('id', flat=True)
+            ]
+        else:
+            pairs = [
+                (project_id, instance.id)
+                for project_id in Issue.objects.filter(
+                    labels=instance
+                ).values_list('project_id', flat=True)
+            ]
+    else:
+        return
+
+    deltas = defaultdict(int)
+    for pair in pairs:
+        deltas[pair] += sign
+    counters.adjust_labels(deltas)
+
+
+@receiver(post_delete, sender=Label)
+def uncount_deleted_label(sender, instance, **kwargs):
+    """Drop the stats of a deleted label."""
+    ProjectStat.objects.filter(
+        dimension=ProjectStat.LABEL, key=str(instance.id)
+    ).delete()
+
+
+@receiver(post_save, sender=Issue)
+def record_saved_issue(sender, instance, created, **kwargs):
+    """Publish a saved issue to the change feed of its project."""
+    changes.record([(
+        instance.project_id,
+        'issue.created' if created else 'issue.updated',
+        changes.issue_data(instance),
+    )])
+
+
+@receiver(post_delete, sender=Issue)
+def record_deleted_issue(sender, instance, origin=None, **kwargs):
+    """Publish a deleted issue to the change feed of its project."""
+    # Deleting a project deletes its feed.
+    if getattr(origin, 'model', type(origin)) is not Project:
+        changes.record([
+            (instance.project_id, 'issue.deleted', {'id': instance.id})
+        ])
+
+
+@receiver(post_save, sender=Comment)
+def record_added_comment(sender, instance, created, **kwargs):
+    """Publish a new comment to the change feed of its project."""
+    if created:
+        changes.record([(
+            instance.issue.project_id,
+            'comment.added',
+            changes.comment_data(instance),
+        )])
+
+
+@receiver(post_delete, sender=Issue)
+def leave_issue_tombstone(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone for clients syncing the issues of the project."""
+    if getattr(origin, 'model', type(origin)) is not Project:
+        sync.record_deletion(instance)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_commented_issue(sender, instance, origin=None, **kwargs):
+    """Mark the issue of an added, edited or deleted comment as updated."""
+    if not _deleted_with_issue(origin):
+        Issue.objects.filter(id=instance.issue_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(pre_save, sender=User)
+def remember_rendered_user(sender, instance, update_fields=None, **kwargs):
+    """Remember the rendered fields of a user as stored before saving."""
+    instance._rendered_state = None
+    if instance._state.adding or update_fields is not None and not (
+        set(update_fields) & set(USER_RENDERED_FIELDS)
+    ):
+        return
+    instance._rendered_state = User.objects.filter(
+        id=instance.id
+    ).values_list(*USER_RENDERED_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def touch_user_issues(sender, instance, **kwargs):
+    """Mark the issues embedding a renamed user as updated."""
+    old = getattr(instance, '_rendered_state', None)
+    if old is None or old == tuple(
+        getattr(instance, field) for field in USER_RENDERED_FIELDS
+    ):
+        return
+    Issue.objects.filter(
+        Q(created_by=instance) | Q(assigned_to=instance)
+        | Q(comments__created_by=instance)
+    ).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+def bump_user_projects(sender, instance, **kwargs):
+    """Mark the cached data of the projects showing a renamed user stale."""
+    old = getattr(instance, '_rendered_state', None)
+    if old is None or old == tuple(
+        getattr(instance, field) for field in USER_RENDERED_FIELDS
+    ):
+        return
+    issues = Issue.objects.filter(
+        Q(created_by=instance) | Q(assigned_to=instance)
+        | Q(comments__created_by=instance)
+    )
+    Project.objects.filter(
+        Q(id__in=issues.values('project_id'))
+        | Q(id__in=ProjectMembership.objects.filter(
+            user=instance
+        ).values('project_id'))
+        | Q(created_by=instance)
+    ).bump_data_version()
+
+
+@receiver(post_save, sender=Label)
+@receiver(pre_delete, sender=Label)
+def touch_labelled_issues(sender, instance, created=False, **kwargs):
+    """Mark the issues embedding a renamed or deleted label as updated."""
+    if not created:
+        Issue.objects.filter(labels=instance).update(
+            updated_at=timezone.now()
+        )
@@ -0,0 +1,179 @@
+"""
+Slow query log.
+
+An execute wrapper installed on every database connection times each
+query. Queries slower than ``SLOW_QUERY_THRESHOLD_MS`` are recorded with
+their parameters, the innermost frames of project code that ran them and
+the plan of SELECT queries: ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN``
+on PostgreSQL, or ``EXPLAIN (ANALYZE, BUFFERS)`` with
+``SLOW_QUERY_EXPLAIN_ANALYZE``, which runs the query again.
+
+Every process keeps the last ``SLOW_QUERY_LOG_SIZE`` records in a ring
+buffer mirrored to its own file in ``SLOW_QUERY_DIR``, so the admin
+endpoint and the ``dump_slow_queries`` command see the records of all
+worker processes.
+"""
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import traceback
+from collections import deque
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 5
+MAX_PARAMS_LENGTH = 1000
+
+_local = threading.local()
+
+
+class SlowQueryLog:
+    """Ring buffer of the slow queries of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._name = f'{self._pid}-{secrets.token_hex(4)}.json'
+        self._records = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def add(self, record):
+        with self._lock:
+            # A forked worker starts its own buffer and file.
+            if os.getpid() != self._pid:
+                self._reset()
+            self._records.append(record)
+            records = list(self._records)
+        os.makedirs(settings.SLOW_QUERY_DIR, exist_ok=True)
+        path = os.path.join(settings.SLOW_QUERY_DIR, self._name)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(records, f)
+        os.replace(f'{path}.tmp', path)
+
+    def records(self, limit=None):
+        """Return the records of every process, newest first."""
+        records = []
+        if os.path.isdir(settings.SLOW_QUERY_DIR):
+            for entry in os.scandir(settings.SLOW_QUERY_DIR):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    with open(entry.path) as f:
+                        records.extend(json.load(f))
+                except (OSError, ValueError):
+                    # Removed or replaced while reading.
+                    continue
+        records.sort(key=lambda record: record['time'], reverse=True)
+        return records[:limit]
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _project_frames():
+    """Return the innermost frames of project code, innermost first."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and frame.filename != __file__
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} '
+        f'in {frame.name}'
+        for frame in reversed(frames[-STACK_DEPTH:])
+    ]
+
+
+def explain(connection, sql, params):
+    """Return the plan of a SELECT query as a list of lines."""
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN'
+    elif settings.SLOW_QUERY_EXPLAIN_ANALYZE:
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS)'
+    else:
+        prefix = 'EXPLAIN'
+    # A failed EXPLAIN must not break the transaction of the query.
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def _record(connection, sql, params, many, duration):
+    plan = None
+    if not many and sql.lstrip().upper().startswith('SELECT'):
+        try:
+            plan = explain(connection, sql, params)
+        except DatabaseError as e:
+            plan = [f'EXPLAIN failed: {e}']
+    record = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration * 1000, 1),
+        'sql': sql,
+        'params': repr(params)[:MAX_PARAMS_LENGTH],
+        'database': connection.alias,
+        'stack': _project_frames(),
+        'plan': plan,
+        'pid': os.getpid(),
+    }
+    slow_query_log.add(record)
+    logger.warning(
+        'Slow query (%.1f ms) from %s: %s', record['duration_ms'],
+        record['stack'][0] if record['stack'] else 'unknown', sql[:200],
+    )
+
+
+class SlowQueryRecorder:
+    """Execute wrapper recording slow queries of a connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is None or getattr(_local, 'recording', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration * 1000 >= threshold:
+            # Queries run while recording, like EXPLAIN, are not recorded.
+            _local.recording = True
+            try:
+                _record(self.connection, sql, params, many, duration)
+            finally:
+                _local.recording = False
+        return result
+
+
+def install(connection, **kwargs):
+    """Add the slow query recorder to a connection."""
+    if not any(
+        isinstance(wrapper, SlowQueryRecorder)
+        for wrapper in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(SlowQueryRecorder(connection))
+
+
+def install_all():
+    """Record the slow queries of current and future connections."""
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(install)
+    for connection in connections.all(initialized_only=True):
+        install(connection)
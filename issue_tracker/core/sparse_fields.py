@@ -0,0 +1,112 @@
+"""
+Sparse fieldsets and opt-in expansion of nested objects.
+
+``?fields=id,title,assigned_to`` renders only the named top-level fields
+and ``?expand=created_by,labels`` embeds the named nested objects, dotted
+paths reaching into expanded ones. Passing either parameter opts a read
+into the sparse representation, in which the ``expandable_fields`` of a
+serializer render as the primary keys of their objects unless expanded;
+reads passing neither get every field, fully expanded, as before.
+
+Unrequested fields are dropped from the serializer before it renders, so
+the query plans of ``core.query_plan`` only join, prefetch and load what
+is rendered.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin taking the fields to render and the paths of the
+    nested objects to expand.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = fields
+        self.sparse_expand = expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.sparse_fields is not None:
+            fields = {
+                name: field for name, field in fields.items()
+                if name in self.sparse_fields
+            }
+        if self.sparse_expand is None:
+            return fields
+
+        for name in self.expandable_fields:
+            if name not in fields:
+                continue
+            if name not in self.sparse_expand:
+                fields[name] = _primary_keys(fields[name])
+                continue
+            nested = getattr(fields[name], 'child', fields[name])
+            if isinstance(nested, SparseFieldsMixin):
+                nested.sparse_expand = frozenset(
+                    path.removeprefix(f'{name}.')
+                    for path in self.sparse_expand
+                    if path.startswith(f'{name}.')
+                )
+        return fields
+
+
+def _primary_keys(field):
+    """Return a field rendering the primary keys of a nested field."""
+    kwargs = {'read_only': True}
+    if field.source is not None:
+        kwargs['source'] = field.source
+    return serializers.PrimaryKeyRelatedField(
+        many=isinstance(field, serializers.ListSerializer), **kwargs
+    )
+
+
+def _expandable_paths(serializer, prefix=''):
+    for name in serializer.expandable_fields:
+        yield prefix + name
+        nested = serializer.fields[name]
+        nested = getattr(nested, 'child', nested)
+        if isinstance(nested, SparseFieldsMixin):
+            yield from _expandable_paths(nested, f'{prefix}{name}.')
+
+
+def _split(value):
+    return frozenset(filter(None, (name.strip() for name in value.split(','))))
+
+
+def get_sparse_kwargs(request, serializer_class):
+    """
+    Return the fields and expand arguments of serializer_class requested
+    by the query params of request, or {} for the full representation.
+    """
+    if request.method not in SAFE_METHODS \
+            or not issubclass(serializer_class, SparseFieldsMixin):
+        return {}
+    fields = request.query_params.get('fields') or None
+    expand = request.query_params.get('expand')
+    if fields is None and expand is None:
+        return {}
+
+    serializer = serializer_class()
+    errors = {}
+    if fields is not None:
+        fields = _split(fields)
+        readable = {
+            name for name, field in serializer.fields.items()
+            if not field.write_only
+        }
+        if unknown := fields - readable:
+            errors['fields'] = [
+                f'Unknown fields: {", ".join(sorted(unknown))}.'
+            ]
+    expand = _split(expand or '')
+    if unknown := expand - set(_expandable_paths(serializer)):
+        errors['expand'] = [
+            f'Not expandable: {", ".join(sorted(unknown))}.'
+        ]
+    if errors:
+        raise serializers.ValidationError(errors)
+    return {'fields': fields, 'expand': expand}
@@ -0,0 +1,130 @@
+"""
+Issue statistics of project dashboards.
+
+Small projects are counted live with grouped queries over their issues.
+Larger projects are read from the ``ProjectStat`` and
+``ProjectDueDateCount`` rollups kept by ``core.counters``, which cost the
+same however many issues a project has.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.utils import timezone
+
+from core.models import Issue, Label, ProjectDueDateCount, ProjectStat
+
+# Projects with more counted issues are read from the rollups.
+ROLLUP_THRESHOLD = 5000
+
+DUE_DATE_BUCKETS = ('overdue', 'today', 'this_week', 'later')
+
+
+def _due_date_bucket(due_date, today):
+    if due_date < today:
+        return 'overdue'
+    if due_date == today:
+        return 'today'
+    if due_date < today + timedelta(days=7):
+        return 'this_week'
+    return 'later'
+
+
+def _live_counts(project):
+    """Return stat counts and open due date counts of project's issues."""
+    stats = defaultdict(int)
+    due_dates = defaultdict(int)
+    for row in Issue.objects.filter(project=project).order_by().values(
+        'status', 'priority', 'assigned_to_id', 'due_date'
+    ).annotate(count=Count('id')):
+        count = row['count']
+        stats[ProjectStat.STATUS_PRIORITY,
+              f"{row['status']}:{row['priority']}"] += count
+        stats[ProjectStat.ASSIGNEE, str(row['assigned_to_id'])] += count
+        if row['status'] == 'Open' and row['due_date'] is not None:
+            due_dates[row['due_date']] += count
+
+    for row in Issue.labels.through.objects.filter(
+        issue__project=project
+    ).order_by().values('label_id').annotate(count=Count('id')):
+        stats[ProjectStat.LABEL, str(row['label_id'])] += row['count']
+    return stats, due_dates
+
+
+def _rollup_counts(project):
+    """Return stat counts and open due date counts from the rollups."""
+    stats = {
+        (dimension, key): count
+        for dimension, key, count in ProjectStat.objects.filter(
+            project=project, issue_count__gt=0
+        ).values_list('dimension', 'key', 'issue_count')
+    }
+    due_dates = dict(ProjectDueDateCount.objects.filter(
+        project=project, open_issue_count__gt=0
+    ).values_list('due_date', 'open_issue_count'))
+    return stats, due_dates
+
+
+def project_stats(project):
+    """Return the issue statistics of project."""
+    counted = project.open_issue_count + project.closed_issue_count
+    if counted > ROLLUP_THRESHOLD:
+        stats, due_dates = _rollup_counts(project)
+    else:
+        stats, due_dates = _live_counts(project)
+
+    by_dimension = defaultdict(dict)
+    for (dimension, key), count in stats.items():
+        if count:
+            by_dimension[dimension][key] = count
+
+    by_status_priority = by_dimension[ProjectStat.STATUS_PRIORITY]
+    assignees = by_dimension[ProjectStat.ASSIGNEE]
+    labels = by_dimension[ProjectStat.LABEL]
+    users = get_user_model().objects.only('email', 'name').in_bulk(
+        [int(user_id) for user_id in assignees]
+    )
+    label_names = dict(Label.objects.filter(
+        id__in=[int(label_id) for label_id in labels]
+    ).values_list('id', 'name'))
+
+    today = timezone.localdate()
+    by_due_date = dict.fromkeys(DUE_DATE_BUCKETS, 0)
+    for due_date, count in due_dates.items():
+        by_due_date[_due_date_bucket(due_date, today)] += count
+
+    return {
+        'total': sum(by_status_priority.values()),
+        'by_status_priority': [
+            {'status': status, 'priority': priority, 'count': count}
+            for (status, priority), count in sorted(
+                (tuple(key.split(':', 1)), count)
+                for key, count in by_status_priority.items()
+            )
+        ],
+        'by_assignee': [
+            {
+                'assigned_to_id': int(user_id),
+                'email': users[int(user_id)].email,
+                'name': users[int(user_id)].name,
+                'count': count,
+            }
+            for user_id, count in sorted(
+                assignees.items(), key=lambda item: -item[1]
+            )
+            if int(user_id) in users
+        ],
+        'by_label': [
+            {
+                'label_id': int(label_id),
+                'name': label_names[int(label_id)],
+                'count': count,
+            }
+            for label_id, count in sorted(
+                labels.items(), key=lambda item: -item[1]
+            )
+            if int(label_id) in label_names
+        ],
+        'by_due_date': by_due_date,
+    }
@@ -0,0 +1,169 @@
+"""
+Delta sync of the issues of a project.
+
+A client keeping a local copy of a project's issues asks for the changes
+after its cursor and gets the issues created or updated since, the ids of
+the issues deleted since and a new cursor. Without a cursor the sync starts
+from scratch, with every issue of the project.
+
+A cursor holds two positions, one in the issues ordered by
+``(updated_at, id)`` and one in the ``DeletedIssue`` tombstones ordered by
+``(deleted_at, id)``. Timestamps are taken when a write runs, not when it
+commits, so a cursor never moves past ``ISSUE_SYNC_SETTLE_SECONDS`` ago:
+writes committing up to that late are still returned by the next sync, and
+clients may see a change twice. Tombstones expire after
+``ISSUE_SYNC_RETENTION_DAYS``, and so do cursors.
+"""
+import base64
+import binascii
+import json
+import math
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import DeletedIssue
+
+# Tombstones are pruned once every PRUNE_EVERY deletions.
+PRUNE_EVERY = 100
+
+
+class CursorExpired(Exception):
+    """The changes after a cursor are no longer all known."""
+
+
+def record_deletion(issue):
+    """Leave the tombstone of a deleted issue."""
+    record_deletions(issue.project_id, [issue.id])
+
+
+def record_deletions(project_id, issue_ids):
+    """Leave the tombstones of deleted issues of a project."""
+    tombstones = DeletedIssue.objects.bulk_create(
+        DeletedIssue(project_id=project_id, issue_id=issue_id)
+        for issue_id in issue_ids
+    )
+    # Ids of bulk inserts are only known on some databases.
+    if any(
+        tombstone.id is not None and tombstone.id % PRUNE_EVERY == 0
+        for tombstone in tombstones
+    ):
+        prune()
+
+
+def prune():
+    """Delete the tombstones older than ISSUE_SYNC_RETENTION_DAYS."""
+    DeletedIssue.objects.filter(deleted_at__lt=_expiry()).delete()
+
+
+def _expiry():
+    return timezone.now() - timedelta(days=settings.ISSUE_SYNC_RETENTION_DAYS)
+
+
+def encode_cursor(issues_position, deleted_position):
+    """Return the opaque cursor of two (timestamp, id) positions."""
+    positions = [
+        position and [position[0].isoformat(), position[1]]
+        for position in (issues_position, deleted_position)
+    ]
+    return base64.urlsafe_b64encode(
+        json.dumps(positions).encode()
+    ).decode()
+
+
+def _decode_position(position):
+    if position is None:
+        return None
+    timestamp, row_id = position
+    timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None or not (
+        row_id is None or type(row_id) is int
+    ):
+        raise ValueError
+    return timestamp, row_id
+
+
+def decode_cursor(cursor):
+    """Return the positions of cursor, raising ValueError if malformed."""
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        issues_position, deleted_position = map(_decode_position, positions)
+    except (binascii.Error, TypeError, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor.')
+    if deleted_position is None:
+        raise ValueError('Invalid cursor.')
+    return issues_position, deleted_position
+
+
+def _after(position, field):
+    """Return the filter of the rows after a (timestamp, id) position."""
+    if position is None:
+        return Q()
+    timestamp, row_id = position
+    if row_id is None:
+        # After every row of the timestamp.
+        return Q(**{f'{field}__gt': timestamp})
+    return Q(**{f'{field}__gt': timestamp}) | Q(**{
+        field: timestamp, 'id__gt': row_id,
+    })
+
+
+def _key(position):
+    timestamp, row_id = position
+    return timestamp, math.inf if row_id is None else row_id
+
+
+def _page(queryset, field, position, horizon, limit):
+    """
+    Return up to limit rows after position, the position to resume from
+    and whether more rows follow.
+    """
+    rows = list(queryset.filter(
+        _after(position, field)
+    ).order_by(field, 'id')[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (getattr(rows[-1], field), rows[-1].id), True
+    # Every row up to now was read, but only rows up to the horizon are
+    # settled; the rest is read again next time.
+    settled = (horizon, None)
+    if position is not None and _key(position) > _key(settled):
+        settled = position
+    return rows, settled, False
+
+
+def issue_changes(issues, project_id, cursor=None, limit=500):
+    """
+    Return the issues changed and the ids of issues deleted after cursor,
+    the next cursor and whether more changes follow.
+
+    issues is the queryset of the project's issues to read. Raise
+    CursorExpired if tombstones after cursor may have been pruned.
+    """
+    now = timezone.now()
+    horizon = now - timedelta(seconds=settings.ISSUE_SYNC_SETTLE_SECONDS)
+    if cursor is None:
+        # A full copy needs no tombstones of earlier deletions.
+        issues_position, deleted_position = None, (horizon, None)
+    else:
+        issues_position, deleted_position = cursor
+        if deleted_position[0] < _expiry():
+            raise CursorExpired
+
+    changed, issues_position, more_issues = _page(
+        issues, 'updated_at', issues_position, horizon, limit
+    )
+    deleted, deleted_position, more_deleted = _page(
+        DeletedIssue.objects.filter(project_id=project_id).only(
+            'id', 'issue_id', 'deleted_at'
+        ),
+        'deleted_at', deleted_position, horizon, limit,
+    )
+    return (
+        changed,
+        [tombstone.issue_id for tombstone in deleted],
+        (issues_position, deleted_position),
+        more_issues or more_deleted,
+    )
@@ -0,0 +1,123 @@
+"""
+Tests for the async viewsets served under ASGI.
+"""
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import TestCase
+from django.urls import resolve, reverse
+
+from rest_framework import status
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate,
+)
+
+from core.models import Comment
+from core.tests.utils import create_issue, create_project, create_user
+from issues.views import AsyncIssueViewSet
+from projects.views import AsyncProjectViewSet
+
+ISSUES_URL = reverse('issues:issue-list')
+PROJECTS_URL = reverse('projects:project-list')
+
+
+def detail_url(issue_id):
+    return reverse('issues:issue-detail', args=[issue_id])
+
+
+def comments_url(issue_id):
+    return reverse('issues:issue-comments', args=[issue_id])
+
+
+class AsyncViewSetTests(TestCase):
+    """Test the async reads match their sync views."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.project = create_project(user=self.user)
+        self.issue = create_issue(user=self.user, project=self.project)
+        create_issue(user=self.user, project=self.project, title='Second')
+        Comment.objects.create(
+            issue=self.issue, created_by=self.user, text='First comment'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.factory = APIRequestFactory()
+
+    def _request(self, view, method, url, data=None, headers=None,
+                 **kwargs):
+        request = getattr(self.factory, method)(
+            url, data, format='json', headers=headers
+        )
+        force_authenticate(request, self.user)
+        request.resolver_match = resolve(url)
+        self.assertTrue(iscoroutinefunction(view))
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_issue_list(self):
+        """Test the issue list and its conditional GETs."""
+        view = AsyncIssueViewSet.as_view({'get': 'list'})
+
+        res = self._request(view, 'get', ISSUES_URL, {'page_size': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = self.client.get(ISSUES_URL, {'page_size': 1})
+        self.assertEqual(res.data, expected.data)
+        self.assertEqual(res['ETag'], expected['ETag'])
+
+        res = self._request(
+            view, 'get', ISSUES_URL, {'page_size': 1},
+            headers={'If-None-Match': res['ETag']},
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_issue_detail(self):
+        """Test retrieving an issue, and a missing one."""
+        view = AsyncIssueViewSet.as_view({'get': 'retrieve'})
+        url = detail_url(self.issue.id)
+
+        res = self._request(view, 'get', url, pk=self.issue.id)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, self.client.get(url).data)
+
+        res = self._request(view, 'get', detail_url(0), pk=0)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_issue_comments(self):
+        """Test listing comments and creating one through the sync path."""
+        view = AsyncIssueViewSet.as_view({'get': 'comments',
+                                          'post': 'comments'})
+        url = comments_url(self.issue.id)
+
+        res = self._request(view, 'get', url, pk=self.issue.id)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, self.client.get(url).data)
+
+        res = self._request(
+            view, 'post', url, {'text': 'Second comment'}, pk=self.issue.id
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.issue.comments.count(), 2)
+
+    def test_project_list(self):
+        """Test the project list, then served from the response cache."""
+        view = AsyncProjectViewSet.as_view({'get': 'list'})
+
+        res = self._request(view, 'get', PROJECTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, self.client.get(PROJECTS_URL).data)
+        with self.assertNumQueries(1):
+            cached = self._request(view, 'get', PROJECTS_URL)
+        self.assertEqual(cached.data, res.data)
+
+    def test_auth_required(self):
+        """Test anonymous requests are rejected."""
+        view = AsyncIssueViewSet.as_view({'get': 'list'})
+        request = self.factory.get(ISSUES_URL)
+
+        res = async_to_sync(view)(request)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
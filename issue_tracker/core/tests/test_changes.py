@@ -0,0 +1,188 @@
+"""
+Tests for the live change feeds.
+"""
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core import changes
+from core.models import ChangeEvent, Comment
+from core.tests.utils import create_issue, create_project, create_user
+from projects.views import ProjectEventsViewSet
+from user.serializers import TokenObtainPairSerializer
+
+
+def events_url(project_id):
+    return reverse('projects:project-events', args=[project_id])
+
+
+def bulk_url(project_id):
+    return reverse('projects:project-issues-bulk', args=[project_id])
+
+
+class ChangeLogTests(TestCase):
+    """Test recording changes to the log."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.project = create_project(user=self.user)
+
+    def _kinds(self):
+        return list(ChangeEvent.objects.filter(
+            project=self.project
+        ).order_by('id').values_list('kind', flat=True))
+
+    def test_signals_record_changes(self):
+        """Test saving issues and comments records their changes."""
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = create_issue(user=self.user, project=self.project)
+        issue_id = issue.id
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.status = 'Closed'
+            issue.save()
+            Comment.objects.create(
+                issue=issue, created_by=self.user, text='Comment'
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.delete()
+
+        self.assertEqual(self._kinds(), [
+            'issue.created', 'issue.updated', 'comment.added',
+            'issue.deleted',
+        ])
+        event = ChangeEvent.objects.get(kind='issue.updated')
+        self.assertEqual(event.data['id'], issue_id)
+        self.assertEqual(event.data['status'], 'Closed')
+
+    def test_bulk_create_records_changes(self):
+        """Test issues created in bulk are recorded too."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = [{'title': f'Issue {n}', 'assigned_to_id': self.user.id}
+                   for n in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = client.post(bulk_url(self.project.id), payload,
+                              format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._kinds(), ['issue.created'] * 3)
+
+    def test_changes_not_recorded_on_rollback(self):
+        """Test writes rolled back record nothing."""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                create_issue(user=self.user, project=self.project)
+                raise ValueError
+
+        self.assertEqual(self._kinds(), [])
+
+    @override_settings(CHANGE_FEED_BUFFER_SIZE=10)
+    def test_log_bounded(self):
+        """Test old events are pruned and cannot be resumed from."""
+        for _ in range(changes.PRUNE_EVERY + 10):
+            with self.captureOnCommitCallbacks(execute=True):
+                changes.record([(self.project.id, 'issue.deleted', {})])
+
+        self.assertLess(
+            ChangeEvent.objects.count(), changes.PRUNE_EVERY
+        )
+        last_id = ChangeEvent.objects.latest('id').id
+        self.assertIsNone(changes.backlog(self.project.id, 0))
+        self.assertEqual(
+            [event['id'] for event in changes.backlog(
+                self.project.id, last_id - 1
+            )],
+            [last_id],
+        )
+
+
+@override_settings(CHANGE_FEED_POLL_INTERVAL=0.01, ASYNC_VIEWS=True)
+class ProjectEventsTests(TestCase):
+    """Test streaming the change feed of a project."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.project = create_project(user=self.user)
+        self.first = ChangeEvent.objects.create(
+            project=self.project, kind='issue.created', data={'id': 1}
+        )
+        self.second = ChangeEvent.objects.create(
+            project=self.project, kind='issue.updated', data={'id': 1}
+        )
+        self.token = TokenObtainPairSerializer.get_token(
+            self.user
+        ).access_token
+        self.view = ProjectEventsViewSet.as_view({'get': 'stream'})
+        self.factory = APIRequestFactory()
+
+    def _get(self, project_id=None, **headers):
+        project_id = project_id or self.project.id
+        request = self.factory.get(
+            events_url(project_id), {'token': str(self.token)},
+            headers=headers,
+        )
+        return async_to_sync(self.view)(request, project_id=project_id)
+
+    def test_stream_resumes_and_follows(self):
+        """Test streams resume after Last-Event-ID, then push new events."""
+        async def read():
+            response = await self.view(self.factory.get(
+                events_url(self.project.id), {'token': str(self.token)},
+                headers={'Last-Event-ID': str(self.first.id)},
+            ), project_id=self.project.id)
+            chunks = response.streaming_content.__aiter__()
+            received = [await chunks.__anext__() for _ in range(2)]
+            await ChangeEvent.objects.acreate(
+                project=self.project, kind='comment.added', data={'id': 2}
+            )
+            received.append(await chunks.__anext__())
+            await chunks.aclose()
+            return response, received
+
+        response, received = async_to_sync(read)()
+
+        self.assertEqual(response['Content-Type'],
+                         'text/event-stream; charset=utf-8')
+        self.assertTrue(received[0].startswith(b'retry: '))
+        self.assertEqual(
+            received[1],
+            f'id: {self.second.id}\nevent: issue.updated\n'
+            f'data: {{"id": 1}}\n\n'.encode(),
+        )
+        self.assertIn(b'event: comment.added\ndata: {"id": 2}', received[2])
+
+    def test_members_only(self):
+        """Test only members of the project can stream its changes."""
+        other = create_project(user=create_user(email='other@example.com'))
+
+        res = self._get(other.id)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_required(self):
+        """Test streams need a valid token."""
+        self.token = 'invalid'
+
+        res = self._get()
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ASYNC_VIEWS=False)
+    def test_unavailable_under_wsgi(self):
+        """Test sync deployments do not hold workers on streams."""
+        res = self._get()
+
+        self.assertEqual(
+            res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    def test_invalid_last_event_id(self):
+        """Test a malformed Last-Event-ID is rejected."""
+        res = self._get(**{'Last-Event-ID': 'latest'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,13 +1,24 @@
 """
 Test custom Django management commands.
 """
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
-from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.models import Comment, Issue, Project, ProjectStat
+from core.search import search_issues
+from core.tests.utils import create_issue, create_project, create_user
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -32,3 +43,267 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class RebuildSearchIndexTests(TestCase):
+    """Test the rebuild_search_index command."""
+
+    def test_rebuild_search_index(self):
+        """Test the index is rebuilt from scratch in chunks."""
+        user = create_user()
+        project = create_project(user=user)
+        issues = [
+            create_issue(user, project, title=f'Flaky test {i}')
+            for i in range(3)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM core_issuesearch')
+        self.assertEqual(search_issues('flaky', user), [])
+
+        out = StringIO()
+        call_command('rebuild_search_index', chunk_size=2, stdout=out)
+
+        self.assertEqual(
+            {issue_id for issue_id, _ in search_issues('flaky', user)},
+            {issue.id for issue in issues},
+        )
+        self.assertIn('Indexed 2 issues...', out.getvalue())
+        self.assertIn('Indexed 3 issues.', out.getvalue())
+
+
+class RecountProjectStatsTests(TestCase):
+    """Test the recount_project_stats command."""
+
+    def test_recount_project_stats(self):
+        """Test drifted counters are recomputed in chunks."""
+        user = create_user()
+        projects = [create_project(user=user) for _ in range(3)]
+        for project in projects:
+            create_issue(user, project, status='Open', priority='High')
+            create_issue(user, project, status='Closed')
+        Project.objects.update(open_issue_count=7, closed_issue_count=0)
+
+        out = StringIO()
+        call_command('recount_project_stats', chunk_size=2, stdout=out)
+
+        self.assertEqual(
+            list(Project.objects.values_list(
+                'open_issue_count', 'closed_issue_count',
+                'high_priority_issue_count',
+            )),
+            [(1, 1, 1)] * 3,
+        )
+        self.assertIn('Recounted 2 projects...', out.getvalue())
+        self.assertIn('Recounted 3 projects.', out.getvalue())
+
+
+class ImportIssuesTests(TestCase):
+    """Test the import_issues command."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.other = create_user(email='other@example.com')
+        self.project = create_project(user=self.user)
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tempdir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def _jsonl(self, records):
+        return ''.join(json.dumps(record) + '\n' for record in records)
+
+    def test_import_jsonl(self):
+        """Test importing issues with labels and comments from JSONL."""
+        path = self._write('issues.jsonl', self._jsonl([
+            {
+                'project': self.project.id,
+                'title': 'Crash on login',
+                'status': 'Open',
+                'priority': 'High',
+                'created_by': 'USER@example.com',
+                'assigned_to': 'other@example.com',
+                'labels': ['bug', 'auth'],
+                'created_at': '2020-01-02T03:04:05Z',
+                'comments': [
+                    {'created_by': 'other@example.com', 'text': 'Flaky'},
+                ],
+            },
+            {
+                'project': self.project.name,
+                'title': 'Write docs',
+                'status': 'Closed',
+                'created_by': 'user@example.com',
+                'labels': ['bug'],
+            },
+        ]))
+
+        out = StringIO()
+        started = timezone.now()
+        call_command('import_issues', path, stdout=out)
+
+        crash = Issue.objects.get(title='Crash on login')
+        self.assertEqual(crash.assigned_to, self.other)
+        self.assertEqual(crash.created_at.year, 2020)
+        self.assertGreaterEqual(crash.updated_at, started)
+        self.assertEqual(
+            sorted(crash.labels.values_list('name', flat=True)),
+            ['auth', 'bug'],
+        )
+        self.assertEqual(
+            Comment.objects.get().issue, crash
+        )
+        docs = Issue.objects.get(title='Write docs')
+        self.assertEqual(docs.assigned_to, self.user)
+        self.assertEqual(docs.priority, 'Medium')
+        self.assertEqual(
+            {issue_id for issue_id, _ in search_issues('flaky', self.user)},
+            {crash.id},
+        )
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.open_issue_count, 1)
+        self.assertEqual(self.project.closed_issue_count, 1)
+        self.assertEqual(self.project.high_priority_issue_count, 1)
+        self.assertEqual(ProjectStat.objects.get(
+            project=self.project, dimension=ProjectStat.LABEL,
+            key=str(crash.labels.get(name='bug').id),
+        ).issue_count, 2)
+        self.assertIn(
+            'Imported 2 issues and 1 comments', out.getvalue()
+        )
+        self.assertIn('rows/s', out.getvalue())
+
+    def test_import_csv_from_stdin(self):
+        """Test importing CSV read from stdin."""
+        content = (
+            'project,title,created_by,labels,due_date\n'
+            f'{self.project.id},First,user@example.com,"ui,bug",2030-01-01\n'
+            f'{self.project.id},Second,user@example.com,,\n'
+        )
+
+        with patch('sys.stdin', StringIO(content)):
+            call_command(
+                'import_issues', '-', format='csv', stdout=StringIO()
+            )
+
+        first = Issue.objects.get(title='First')
+        self.assertEqual(str(first.due_date), '2030-01-01')
+        self.assertEqual(first.labels.count(), 2)
+        self.assertIsNone(Issue.objects.get(title='Second').due_date)
+        # Issues created afterwards get fresh ids.
+        create_issue(self.user, self.project)
+        self.assertEqual(Issue.objects.count(), 3)
+
+    def test_invalid_records_skipped(self):
+        """Test records that cannot be imported are reported and skipped."""
+        path = self._write('issues.jsonl', self._jsonl([
+            {'project': self.project.id, 'title': 'Good',
+             'created_by': 'user@example.com'},
+            {'project': self.project.id, 'title': 'Unknown user',
+             'created_by': 'nobody@example.com'},
+            {'project': 'Missing', 'title': 'Unknown project',
+             'created_by': 'user@example.com'},
+        ]) + 'not json\n')
+
+        out, err = StringIO(), StringIO()
+        call_command('import_issues', path, stdout=out, stderr=err)
+
+        self.assertEqual(
+            list(Issue.objects.values_list('title', flat=True)), ['Good']
+        )
+        self.assertIn('Record 2: Unknown user', err.getvalue())
+        self.assertIn('Record 3: Unknown project', err.getvalue())
+        self.assertIn('Record 4: Invalid JSON', err.getvalue())
+        self.assertIn('skipped 3 records', out.getvalue())
+
+    def test_resume_from_checkpoint(self):
+        """Test an import resumes after the records of its checkpoint."""
+        path = self._write('issues.jsonl', self._jsonl([
+            {'project': self.project.id, 'title': f'Issue {i}',
+             'created_by': 'user@example.com'}
+            for i in range(5)
+        ]))
+        checkpoint = os.path.join(self.tempdir.name, 'checkpoint.json')
+        with open(checkpoint, 'w') as f:
+            json.dump({'source': path, 'records': 3}, f)
+
+        out = StringIO()
+        call_command(
+            'import_issues', path, batch_size=1, checkpoint=checkpoint,
+            stdout=out,
+        )
+
+        self.assertEqual(
+            list(Issue.objects.order_by('id').values_list(
+                'title', flat=True
+            )),
+            ['Issue 3', 'Issue 4'],
+        )
+        self.assertIn('Resuming after 3 records', out.getvalue())
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f)['records'], 5)
+
+        call_command(
+            'import_issues', path, checkpoint=checkpoint, stdout=StringIO()
+        )
+        self.assertEqual(Issue.objects.count(), 2)
+
+
+class SeedDataTests(TestCase):
+    """Test the seed_data command."""
+
+    def _seed(self, seed=0):
+        out = StringIO()
+        call_command(
+            'seed_data', seed=seed, users=20, projects=5, issues=300,
+            batch_size=100, stdout=out,
+        )
+        return out.getvalue()
+
+    def _snapshot(self):
+        return list(Issue.objects.order_by('id').values_list(
+            'project__name', 'status', 'priority', 'assigned_to__email',
+            'due_date',
+        ))
+
+    def test_seed_data(self):
+        """Test seeding generates the requested populations."""
+        out = self._seed()
+
+        self.assertEqual(get_user_model().objects.count(), 20)
+        self.assertEqual(Project.objects.count(), 5)
+        self.assertEqual(Issue.objects.count(), 300)
+        self.assertIn('Seeded 20 users, 5 projects, 300 issues', out)
+        counts = Project.objects.values_list(
+            'open_issue_count', 'closed_issue_count'
+        )
+        self.assertEqual(sum(map(sum, counts)), 300)
+        # The first project is the largest one.
+        project = Project.objects.order_by('id').first()
+        self.assertTrue(search_issues('seed', project.created_by))
+
+    def test_seed_data_deterministic(self):
+        """Test a seed always generates the same data."""
+        self._seed(seed=1)
+        first = self._snapshot()
+        Issue.objects.all().delete()
+        Project.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+        self._seed(seed=1)
+
+        self.assertEqual(
+            [row[1:4] for row in self._snapshot()],
+            [row[1:4] for row in first],
+        )
+
+    def test_seed_reused(self):
+        """Test seeding twice with a seed is refused."""
+        self._seed()
+
+        with self.assertRaises(CommandError):
+            self._seed()
@@ -0,0 +1,132 @@
+"""
+Tests for the compiled list serializers and the fast JSON renderer.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from rest_framework.renderers import JSONRenderer
+
+from core.compiled_serializers import compile_serializer
+from core.models import Comment, Issue, Label, Project
+from core.query_plan import plan_queryset
+from core.renderers import FastJSONRenderer
+from core.tests.utils import create_issue, create_project, create_user
+from issues.serializers import (
+    CommentSerializer,
+    IssueDetailSerializer,
+    IssueSerializer,
+)
+from projects.serializers import (
+    ProjectDetailSerializer,
+    ProjectMembershipSerializer,
+    ProjectSerializer,
+)
+
+
+class CompiledSerializerTests(TestCase):
+    """Test compiled serializers render what their serializers do."""
+
+    def setUp(self):
+        self.user = create_user()
+        other = create_user(email='other@example.com', name='Ünïcode')
+        self.project = create_project(user=self.user)
+        bug, ui = Label.objects.create(name='bug'), Label.objects.create(
+            name='ui'
+        )
+        create_issue(user=self.user, project=self.project).labels.add(bug)
+        issue = create_issue(
+            user=other, project=self.project, title='Line break',
+            priority='High', due_date=date(2030, 1, 2),
+        )
+        issue.labels.add(bug, ui)
+        create_issue(user=self.user, project=self.project, description='')
+        Comment.objects.create(issue=issue, created_by=other, text='Hi')
+
+    def assertParity(self, serializer_class, queryset, **kwargs):
+        """Assert both paths render the same JSON, returning the data."""
+        compiled = compile_serializer(serializer_class, **kwargs)
+        self.assertIsNotNone(compiled)
+        expected = serializer_class(
+            plan_queryset(queryset, serializer_class, **kwargs),
+            many=True, **kwargs,
+        ).data
+
+        data = compiled.render(list(compiled.values(queryset)))
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(expected)
+        )
+        return data
+
+    def test_issue_parity(self):
+        """Test issues, with nested users and labels."""
+        issues = Issue.objects.order_by('-id')
+
+        data = self.assertParity(IssueSerializer, issues)
+        self.assertParity(IssueDetailSerializer, issues)
+
+        self.assertEqual(len(data[1]['labels']), 2)
+
+    def test_sparse_parity(self):
+        """Test sparse fieldsets compile too."""
+        issues = Issue.objects.order_by('id')
+
+        self.assertParity(IssueSerializer, issues, expand=frozenset())
+        self.assertParity(
+            IssueDetailSerializer, issues,
+            fields=frozenset(['id', 'due_date', 'labels', 'created_by']),
+            expand=frozenset(['labels']),
+        )
+
+    def test_other_serializers_parity(self):
+        """Test comments, and projects with their annotated counts."""
+        self.assertParity(CommentSerializer, Comment.objects.all())
+        self.assertParity(
+            ProjectSerializer, Project.objects.with_counts().order_by('id')
+        )
+
+    def test_constant_queries(self):
+        """Test users are joined and labels read with one query."""
+        compiled = compile_serializer(IssueSerializer)
+
+        with self.assertNumQueries(2):
+            compiled.render(list(compiled.values(Issue.objects.all())))
+
+    def test_not_compilable(self):
+        """Test serializers reading non-columns are not compiled."""
+        self.assertIsNone(compile_serializer(ProjectDetailSerializer))
+        self.assertIsNone(compile_serializer(ProjectMembershipSerializer))
+
+
+class FastJSONRendererTests(TestCase):
+    """Test the orjson renderer matches JSONRenderer."""
+
+    def test_matches_json_renderer(self):
+        """Test the types the encoder formats render the same."""
+        data = {
+            'at': timezone.now(),
+            'on': date(2030, 1, 2),
+            'price': Decimal('1.50'),
+            'message': gettext_lazy('Not found.'),
+            'text': 'Ünïcode    ',
+            'ids': (1, 2),
+            1: None,
+        }
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indented(self):
+        """Test indented responses are rendered by JSONRenderer."""
+        data = {'id': 1}
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
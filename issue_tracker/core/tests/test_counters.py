@@ -0,0 +1,139 @@
+"""
+Tests for the denormalized project issue counters.
+"""
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.counters import recount
+from core.models import Label, Project, ProjectStat
+from core.stats import _live_counts, _rollup_counts
+from core.tests.utils import create_issue, create_project, create_user
+
+
+class ProjectCounterTests(TestCase):
+    """Test maintaining the issue counters of projects."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.project = create_project(user=self.user)
+
+    def _counts(self):
+        project = Project.objects.with_counts().get(id=self.project.id)
+        return {
+            'open': project.open_issue_count,
+            'closed': project.closed_issue_count,
+            'high': project.high_priority_issue_count,
+            'overdue': project.overdue_issue_count,
+        }
+
+    def test_counts_follow_issue_writes(self):
+        """Test creating, changing and deleting issues moves counters."""
+        yesterday = timezone.localdate() - timedelta(days=1)
+        issue = create_issue(
+            self.user, self.project, status='Open', priority='High',
+            due_date=yesterday,
+        )
+        create_issue(self.user, self.project, status='Closed')
+        self.assertEqual(
+            self._counts(), {'open': 1, 'closed': 1, 'high': 1, 'overdue': 1}
+        )
+
+        issue.priority = 'Low'
+        issue.save()
+        self.assertEqual(self._counts()['high'], 0)
+
+        issue.status = 'Closed'
+        issue.save()
+        self.assertEqual(
+            self._counts(), {'open': 0, 'closed': 2, 'high': 0, 'overdue': 0}
+        )
+
+        issue.delete()
+        self.assertEqual(self._counts()['closed'], 1)
+
+    def test_overdue_counts_due_dates_before_today(self):
+        """Test only open issues due before today are overdue."""
+        today = timezone.localdate()
+        for days in (-2, -1, 0, 1):
+            create_issue(
+                self.user, self.project, status='Open',
+                due_date=today + timedelta(days=days),
+            )
+
+        self.assertEqual(self._counts()['overdue'], 2)
+
+    def test_project_save_keeps_counters(self):
+        """Test saving a stale project instance does not reset counters."""
+        create_issue(self.user, self.project, status='Open')
+
+        self.project.name = 'Renamed'
+        self.project.save()
+
+        self.assertEqual(self._counts()['open'], 1)
+
+    def test_recount(self):
+        """Test recounting matches the incrementally kept counters."""
+        create_issue(
+            self.user, self.project, status='Open', priority='High',
+            due_date=timezone.localdate() - timedelta(days=3),
+        )
+        create_issue(self.user, self.project, status='Closed')
+        counts = self._counts()
+
+        recount([self.project.id])
+
+        self.assertEqual(self._counts(), counts)
+
+
+class ProjectStatRollupTests(TestCase):
+    """Test the stat rollups match live counts."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.other = create_user(email='other@example.com')
+        self.project = create_project(user=self.user)
+
+    def assertRollupMatches(self):
+        live_stats, live_due_dates = _live_counts(self.project)
+        stats, due_dates = _rollup_counts(self.project)
+        self.assertEqual(
+            {key: count for key, count in live_stats.items() if count},
+            stats,
+        )
+        self.assertEqual(dict(live_due_dates), due_dates)
+
+    def test_rollup_follows_writes(self):
+        """Test issue, label and assignee writes keep rollups exact."""
+        bug = Label.objects.create(name='bug')
+        ui = Label.objects.create(name='ui')
+        issue = create_issue(
+            self.user, self.project, status='Open', priority='High',
+            due_date=timezone.localdate(),
+        )
+        issue.labels.add(bug, ui)
+        other = create_issue(self.user, self.project, status='Closed')
+        bug.issues.add(other)
+        self.assertRollupMatches()
+
+        issue.assigned_to = self.other
+        issue.status = 'Closed'
+        issue.save()
+        issue.labels.remove(ui)
+        self.assertRollupMatches()
+
+        bug.issues.clear()
+        other.delete()
+        ui.delete()
+        self.assertRollupMatches()
+
+    def test_recount_rebuilds_rollup(self):
+        """Test recounting rebuilds drifted rollups."""
+        issue = create_issue(self.user, self.project, status='Open')
+        issue.labels.add(Label.objects.create(name='bug'))
+        ProjectStat.objects.all().delete()
+
+        recount([self.project.id])
+
+        self.assertRollupMatches()
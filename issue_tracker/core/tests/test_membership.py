@@ -0,0 +1,62 @@
+"""
+Tests for the cached membership resolver.
+"""
+from django.test import TestCase
+
+from core.membership import get_project_role, get_project_roles
+from core.models import ProjectMembership
+from core.tests.utils import create_project, create_user
+
+
+class MembershipCacheTests(TestCase):
+    """Test resolving and invalidating cached project roles."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.other = create_user(email='other@example.com')
+        self.project = create_project(user=self.other)
+
+    def test_roles_cached(self):
+        """Test roles are loaded once and then served from the cache."""
+        ProjectMembership.objects.create(
+            user=self.user, project=self.project, role='developer'
+        )
+        self.user.refresh_from_db()
+
+        with self.assertNumQueries(1):
+            get_project_roles(self.user)
+        with self.assertNumQueries(0):
+            role = get_project_role(self.user, self.project.id)
+
+        self.assertEqual(role, 'developer')
+
+    def test_membership_changes_bump_version(self):
+        """Test saving or deleting a membership bumps the user version."""
+        version = self.user.membership_version
+        membership = ProjectMembership.objects.create(
+            user=self.user, project=self.project, role='developer'
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.membership_version, version + 1)
+
+        membership.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.membership_version, version + 2)
+
+    def test_membership_changes_invalidate(self):
+        """Test cached roles reflect added, changed and removed members."""
+        self.assertIsNone(get_project_role(self.user, self.project.id))
+
+        membership = ProjectMembership.objects.create(
+            user=self.user, project=self.project, role='developer'
+        )
+        self.assertEqual(
+            get_project_role(self.user, self.project.id), 'developer'
+        )
+
+        membership.role = 'admin'
+        membership.save()
+        self.assertEqual(get_project_role(self.user, self.project.id), 'admin')
+
+        membership.delete()
+        self.assertIsNone(get_project_role(self.user, self.project.id))
@@ -0,0 +1,123 @@
+"""
+Tests for the request metrics.
+"""
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.metrics import render, store
+from core.tests.utils import create_issue, create_project, create_user
+
+ISSUES_URL = reverse('issues:issue-list')
+METRICS_URL = reverse('metrics')
+
+
+class MetricsTests(TestCase):
+    """Test recording and serving request metrics."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        settings = override_settings(METRICS_DIR=self.tempdir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        store.reset()
+
+        self.user = create_user()
+        create_issue(user=self.user, project=create_project(user=self.user))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.staff_client = APIClient()
+        self.staff_client.force_login(get_user_model().objects.create_user(
+            email='staff@example.com', is_staff=True
+        ))
+
+    def _metrics(self):
+        res = self.staff_client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        return res.content.decode()
+
+    def test_request_metrics(self):
+        """Test requests are counted per view, method and status."""
+        for _ in range(2):
+            self.client.get(ISSUES_URL)
+        self.client.get('/api/missing/')
+
+        text = self._metrics()
+
+        labels = 'method="GET",view="issues:issue-list"'
+        self.assertIn(
+            'http_requests_total{method="GET",status="200",'
+            'view="issues:issue-list"} 2',
+            text,
+        )
+        self.assertIn(
+            'http_requests_total{method="GET",status="404",'
+            'view="<unresolved>"} 1',
+            text,
+        )
+        self.assertIn(
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+            text,
+        )
+        # Every bucket is reported, empty or not.
+        self.assertEqual(text.count(
+            f'http_request_duration_seconds_bucket{{{labels},'
+        ), 12)
+        self.assertIn(
+            f'http_request_duration_seconds_count{{{labels}}} 2', text
+        )
+        self.assertIn(f'http_request_db_queries_total{{{labels}}}', text)
+        self.assertIn(f'http_response_size_bytes_total{{{labels}}}', text)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('cache_requests_total{cache="default",result="hit"}',
+                      text)
+
+    def test_merges_processes(self):
+        """Test the counters of other worker processes are added up."""
+        self.client.get(ISSUES_URL)
+        labels = [['method', 'GET'], ['status', '200'],
+                  ['view', 'issues:issue-list']]
+        with open(os.path.join(self.tempdir.name, '1-worker.json'), 'w') as f:
+            json.dump([['http_requests_total', labels, 5]], f)
+
+        text = self._metrics()
+
+        self.assertIn(
+            'http_requests_total{method="GET",status="200",'
+            'view="issues:issue-list"} 6',
+            text,
+        )
+
+    def test_staff_required(self):
+        """Test the metrics are not served to other users by default."""
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+        self.assertEqual(APIClient().get(METRICS_URL).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        """Test the metrics are served to clients with the token."""
+        client = APIClient()
+        res = client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(res.status_code, 403)
+
+        res = client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_render_escapes_labels(self):
+        """Test label values are escaped."""
+        text = render({
+            ('http_requests_total', (('view', 'a"b\\c'),)): 1.0,
+        })
+
+        self.assertIn('http_requests_total{view="a\\"b\\\\c"} 1', text)
@@ -0,0 +1,71 @@
+"""
+Tests for the request profiling middleware.
+"""
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.tests.utils import create_issue, create_project, create_user
+from user.authentication import user_cache
+from user.serializers import TokenObtainPairSerializer
+
+ISSUES_URL = reverse('issues:issue-list')
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", auth;dur=[\d.]+, '
+    r'app;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+'
+)
+
+
+@override_settings(
+    MIDDLEWARE=['core.profiling.ProfilingMiddleware', *settings.MIDDLEWARE]
+)
+class ProfilingMiddlewareTests(TestCase):
+    """Test profiled requests report their phases."""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = create_user()
+        project = create_project(user=self.user)
+        create_issue(user=self.user, project=project)
+        self.client = APIClient()
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_unprofiled_request(self):
+        """Test requests without the header are not profiled."""
+        res = self.client.get(ISSUES_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('Server-Timing', res)
+
+    def test_profiled_request(self):
+        """Test requests with the header report their phases."""
+        with self.assertLogs('core.profiling', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ISSUES_URL, HTTP_X_PROFILE='1')
+
+        self.assertEqual(res.status_code, 200)
+        match = SERVER_TIMING.fullmatch(res['Server-Timing'])
+        self.assertIsNotNone(match, res['Server-Timing'])
+        self.assertEqual(int(match.group(1)), len(queries.captured_queries))
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['event'], 'request_profile')
+        self.assertEqual(entry['path'], ISSUES_URL)
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['queries'], len(queries.captured_queries))
+        self.assertGreater(entry['auth_ms'] + entry['app_ms'], 0)
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request(self):
+        """Test sampled requests are profiled without the header."""
+        with self.assertLogs('core.profiling', 'INFO'):
+            res = self.client.get(ISSUES_URL)
+
+        self.assertIn('Server-Timing', res)
@@ -0,0 +1,100 @@
+"""
+Tests for serializer-derived query plans.
+"""
+from django.test import TestCase
+
+from core.models import Comment, Issue, Label
+from core.query_plan import get_query_plan, plan_queryset
+from core.tests.utils import create_issue, create_project, create_user
+from issues.serializers import (
+    CommentSerializer,
+    IssueSerializer,
+)
+from projects.serializers import ProjectDetailSerializer
+from user.serializers import AuthTokenSerializer
+
+
+class QueryPlanTests(TestCase):
+    """Test deriving query plans from serializers."""
+
+    def test_nested_serializers_are_joined(self):
+        """Test nested forward relations use select_related."""
+        plan = get_query_plan(IssueSerializer)
+
+        self.assertEqual(plan.select_related, {'created_by', 'assigned_to'})
+        self.assertIn('created_by__email', plan.only)
+        self.assertNotIn('created_by__password', plan.only)
+        self.assertNotIn('description', plan.only)
+
+    def test_to_many_serializers_are_prefetched(self):
+        """Test many-to-many and reverse relations are prefetched."""
+        plan = get_query_plan(IssueSerializer)
+
+        self.assertEqual(set(plan.prefetch), {'labels'})
+        self.assertEqual(plan.prefetch['labels'].only, {'id', 'name'})
+
+    def test_reverse_prefetch_keeps_parent_column(self):
+        """Test reverse foreign key prefetches load the join column."""
+        plan = get_query_plan(ProjectDetailSerializer)
+
+        members = plan.prefetch['project_members']
+        self.assertIn('project', members.only)
+        self.assertEqual(members.select_related, {'user', 'project'})
+
+    def test_field_subset(self):
+        """Test restricting the plan to a subset of fields."""
+        plan = get_query_plan(
+            IssueSerializer, frozenset(['id', 'title', 'labels'])
+        )
+
+        self.assertEqual(plan.select_related, set())
+        self.assertEqual(plan.only, {'id', 'title'})
+        self.assertEqual(set(plan.prefetch), {'labels'})
+
+    def test_unexpanded_relations_read_keys(self):
+        """Test relations not expanded only read their keys."""
+        plan = get_query_plan(
+            IssueSerializer, expand=frozenset(['created_by'])
+        )
+
+        self.assertEqual(plan.select_related, {'created_by'})
+        self.assertIn('assigned_to', plan.only)
+        self.assertEqual(plan.prefetch['labels'].only, {'id'})
+
+    def test_other_model_untouched(self):
+        """Test querysets of another model are returned unchanged."""
+        queryset = Label.objects.all()
+
+        self.assertIs(plan_queryset(queryset, IssueSerializer), queryset)
+        self.assertIsNone(get_query_plan(AuthTokenSerializer))
+
+    def test_comments_with_authors_constant_queries(self):
+        """Test listing comments costs one query for any number."""
+        user = create_user()
+        issue = create_issue(user, create_project(user))
+        for i in range(5):
+            Comment.objects.create(
+                issue=issue, created_by=user, text=f'Comment {i}'
+            )
+
+        queryset = plan_queryset(Comment.objects.all(), CommentSerializer)
+        with self.assertNumQueries(1):
+            data = CommentSerializer(queryset, many=True).data
+
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['created_by']['email'], user.email)
+
+    def test_issues_constant_queries(self):
+        """Test serializing issues costs two queries for any number."""
+        user = create_user()
+        project = create_project(user)
+        label = Label.objects.create(name='bug')
+        for _ in range(5):
+            create_issue(user, project).labels.add(label)
+
+        queryset = plan_queryset(Issue.objects.all(), IssueSerializer)
+        with self.assertNumQueries(2):
+            data = IssueSerializer(queryset, many=True).data
+
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['labels'], [{'id': label.id, 'name': 'bug'}])
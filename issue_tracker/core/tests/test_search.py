@@ -0,0 +1,95 @@
+"""
+Tests for the full-text search index.
+"""
+from django.test import TestCase
+
+from core.models import Comment
+from core.search import search_issues
+from core.tests.utils import create_issue, create_project, create_user
+
+
+class SearchIndexTests(TestCase):
+    """Test maintaining and querying the search index."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.project = create_project(user=self.user)
+
+    def _search(self, query, **kwargs):
+        matches = search_issues(query, self.user, **kwargs)
+        return [issue_id for issue_id, _ in matches]
+
+    def test_issue_indexed_on_save(self):
+        """Test saving an issue makes its title and description searchable."""
+        issue = create_issue(
+            self.user, self.project, title='Login button broken',
+            description='Nothing happens on click',
+        )
+
+        self.assertEqual(self._search('login'), [issue.id])
+        self.assertEqual(self._search('click'), [issue.id])
+
+        issue.title = 'Signup form broken'
+        issue.save()
+
+        self.assertEqual(self._search('login'), [])
+        self.assertEqual(self._search('signup'), [issue.id])
+
+    def test_comments_indexed(self):
+        """Test comment texts are searchable until deleted."""
+        issue = create_issue(self.user, self.project)
+        comment = Comment.objects.create(
+            issue=issue, created_by=self.user, text='Reproduced on Safari'
+        )
+
+        self.assertEqual(self._search('safari'), [issue.id])
+
+        comment.delete()
+
+        self.assertEqual(self._search('safari'), [])
+
+    def test_deleted_issue_removed(self):
+        """Test deleted issues no longer match."""
+        issue = create_issue(self.user, self.project, title='Crash on save')
+        Comment.objects.create(issue=issue, created_by=self.user, text='x')
+
+        issue.delete()
+
+        self.assertEqual(self._search('crash'), [])
+
+    def test_ranked_by_field_weight(self):
+        """Test title matches rank above description and comment matches."""
+        in_comment = create_issue(self.user, self.project, title='First')
+        Comment.objects.create(
+            issue=in_comment, created_by=self.user, text='timeout seen'
+        )
+        in_description = create_issue(
+            self.user, self.project, title='Second',
+            description='timeout on upload',
+        )
+        in_title = create_issue(self.user, self.project, title='Timeout')
+
+        self.assertEqual(
+            self._search('timeout'),
+            [in_title.id, in_description.id, in_comment.id],
+        )
+
+    def test_scoped_to_member_projects(self):
+        """Test only issues of the user's projects are searched."""
+        other_user = create_user(email='other@example.com')
+        other_project = create_project(user=other_user)
+        create_issue(other_user, other_project, title='Secret roadmap')
+        second_project = create_project(user=self.user)
+        issue = create_issue(self.user, second_project, title='Roadmap')
+
+        self.assertEqual(self._search('roadmap'), [issue.id])
+        self.assertEqual(
+            self._search('roadmap', project_id=self.project.id), []
+        )
+
+    def test_query_syntax_is_quoted(self):
+        """Test search operators in user input are treated as text."""
+        issue = create_issue(self.user, self.project, title='Slow NEAR query')
+
+        self.assertEqual(self._search('slow" OR "x'), [])
+        self.assertEqual(self._search('near*'), [issue.id])
@@ -0,0 +1,85 @@
+"""
+Tests for the slow query log.
+"""
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Issue
+from core.slow_queries import slow_query_log
+from core.tests.utils import create_issue, create_project, create_user
+
+SLOW_QUERIES_URL = reverse('slow-queries')
+
+
+class SlowQueryLogTests(TestCase):
+    """Test recording and reading slow queries."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        settings = override_settings(SLOW_QUERY_DIR=self.tempdir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        slow_query_log.clear()
+
+        self.user = create_user()
+        self.project = create_project(user=self.user)
+        create_issue(user=self.user, project=self.project)
+
+    def _slow_select(self):
+        """Run a SELECT of issues recorded as slow."""
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=0), \
+                self.assertLogs('core.slow_queries', 'WARNING'):
+            list(Issue.objects.filter(project=self.project, status='Open'))
+
+    def test_records_slow_queries(self):
+        """Test slow queries are recorded with their origin and plan."""
+        self._slow_select()
+
+        record = slow_query_log.records()[0]
+        self.assertIn('FROM "core_issue"', record['sql'])
+        self.assertIn(str(self.project.id), record['params'])
+        self.assertTrue(record['stack'][0].startswith(
+            'core/tests/test_slow_queries.py:'
+        ))
+        self.assertTrue(any('core_issue' in line for line in record['plan']))
+
+    def test_fast_queries_not_recorded(self):
+        """Test queries under the threshold are not recorded."""
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=10000):
+            list(Issue.objects.all())
+
+        self.assertEqual(slow_query_log.records(), [])
+
+    def test_endpoint_admin_only(self):
+        """Test only admins can read the slow queries."""
+        self._slow_select()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(SLOW_QUERIES_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        res = client.get(SLOW_QUERIES_URL, {'limit': 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertIn('core_issue', res.data[0]['sql'])
+
+    def test_dump_slow_queries(self):
+        """Test the command prints the slow queries."""
+        self._slow_select()
+
+        out = StringIO()
+        call_command('dump_slow_queries', stdout=out)
+
+        self.assertIn('FROM "core_issue"', out.getvalue())
+        self.assertIn('plan: ', out.getvalue())
+        self.assertIn('1 slow queries.', out.getvalue())
@@ -1,3 +1,20 @@
-from django.shortcuts import render # noqa
+"""
+Views for the core API.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from core.slow_queries import slow_query_log
+
+
+class SlowQueryListView(APIView):
+    """List the slow queries of every worker process, newest first."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        limit = request.query_params.get('limit', '50')
+        if not limit.isdigit():
+            raise ValidationError({'limit': ['Expected a number.']})
+        return Response(slow_query_log.records(int(limit)))
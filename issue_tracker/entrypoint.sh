@@ -5,6 +5,17 @@ python manage.py makemigrations
 echo "Applying database migrations..."
 python manage.py migrate
 
-# Start Gunicorn server
+# Start from empty request metrics and slow query logs, shared by the
+# workers through files
+rm -rf "${METRICS_DIR:-/tmp/issue-tracker-metrics}"
+rm -rf "${SLOW_QUERY_DIR:-/tmp/issue-tracker-slow-queries}"
+
+# Start Gunicorn server, with uvicorn workers serving the async views
+# when SERVER_MODE=asgi
 echo "Starting server..."
+if [ "$SERVER_MODE" = "asgi" ]; then
+    exec gunicorn --bind 0.0.0.0:$PORT \
+        --worker-class uvicorn_worker.UvicornWorker \
+        issue_tracker.asgi:application
+fi
 exec gunicorn --bind 0.0.0.0:$PORT issue_tracker.wsgi:application
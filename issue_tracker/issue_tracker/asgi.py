@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'issue_tracker.settings')
+# Serve the hot reads with async views (see core.async_views).
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
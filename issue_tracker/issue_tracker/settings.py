@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -177,9 +178,94 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     # 'DEFAULT_PAGINATION_CLASS':
     #     'rest_framework.pagination.LimitOffsetPagination',
     # 'PAGE_SIZE': 100,
 }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.CountingLocMemCache',
+        'LOCATION': 'issue-tracker',
+        'TIMEOUT': 600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'user.serializers.TokenObtainPairSerializer',
+}
+
+# Request profiling (core.profiling) is opt-in. Once enabled, requests
+# carrying the header and a sampled share of all others report their
+# phases in a Server-Timing header and a log line.
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING') == '1'
+REQUEST_PROFILING_HEADER = 'X-Profile'
+REQUEST_PROFILING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_PROFILING_SAMPLE_RATE', 0)
+)
+if REQUEST_PROFILING:
+    MIDDLEWARE.insert(0, 'core.profiling.ProfilingMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': os.getenv('CORE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+# Serve the hot reads with the async viewsets of core.async_views;
+# issue_tracker.asgi turns this on by default.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS') == '1'
+
+# Request metrics (core.metrics). Worker processes share their counters
+# through files in METRICS_DIR; /metrics is served to staff users, and to
+# clients sending METRICS_TOKEN as a bearer token when it is set.
+METRICS_DIR = os.getenv(
+    'METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'issue-tracker-metrics'),
+)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+MIDDLEWARE.insert(0, 'core.metrics.MetricsMiddleware')
+
+# Slow query log (core.slow_queries). An empty threshold disables it.
+SLOW_QUERY_THRESHOLD_MS = os.getenv('SLOW_QUERY_THRESHOLD_MS', '200')
+SLOW_QUERY_THRESHOLD_MS = (
+    float(SLOW_QUERY_THRESHOLD_MS) if SLOW_QUERY_THRESHOLD_MS else None
+)
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv('SLOW_QUERY_EXPLAIN_ANALYZE') == '1'
+SLOW_QUERY_LOG_SIZE = 200
+SLOW_QUERY_DIR = os.getenv(
+    'SLOW_QUERY_DIR',
+    os.path.join(tempfile.gettempdir(), 'issue-tracker-slow-queries'),
+)
+
+# Live change feeds (core.changes). The log keeps about the last
+# CHANGE_FEED_BUFFER_SIZE events, how far back streams can resume.
+CHANGE_FEED_BUFFER_SIZE = 10000
+CHANGE_FEED_POLL_INTERVAL = float(
+    os.getenv('CHANGE_FEED_POLL_INTERVAL', 1.0)
+)
+CHANGE_FEED_HEARTBEAT = 15
+CHANGE_FEED_RETRY_MS = 3000
+
+# Delta sync of project issues (core.sync). Cursors stay this far behind
+# the newest writes, so transactions committing late are still picked up,
+# and expire with the tombstones of deleted issues.
+ISSUE_SYNC_SETTLE_SECONDS = 5
+ISSUE_SYNC_RETENTION_DAYS = 30
@@ -23,6 +23,9 @@ from drf_spectacular.views import (
 from django.contrib import admin
 from django.urls import path, include
 
+from core.metrics import metrics_view
+from core.views import SlowQueryListView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
@@ -34,4 +37,10 @@ urlpatterns = [
     path('api/user/', include('user.urls')),
     path('api/issues/', include('issues.urls')),
     path('api/projects/', include('projects.urls')),
+    path(
+        'api/slow-queries/',
+        SlowQueryListView.as_view(),
+        name='slow-queries',
+    ),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from core.membership import get_project_role
+
 
 class IsReporterOrReadOnly(permissions.BasePermission):
     """
@@ -11,5 +13,5 @@ class IsReporterOrReadOnly(permissions.BasePermission):
             if request.method in permissions.SAFE_METHODS:
                 return True
             return obj.created_by == request.user \
-                or request.user.role == 'Admin'
+                or get_project_role(request.user, obj.project_id) == 'admin'
         return True
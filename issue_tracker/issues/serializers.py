@@ -5,6 +5,8 @@ from django.contrib.auth import get_user_model
 from user.serializers import UserSerializer
 from rest_framework import serializers
 from core.models import Label, Issue, Comment
+from core.sparse_fields import SparseFieldsMixin
+from core.sync import decode_cursor
 
 
 class LabelSerializer(serializers.ModelSerializer):
@@ -12,10 +14,13 @@ class LabelSerializer(serializers.ModelSerializer):
         model = Label
         fields = ['id', 'name']
         read_only_fields = ['id']
+        # Issues reference existing labels by name.
+        extra_kwargs = {'name': {'validators': []}}
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     created_by = UserSerializer(required=False, read_only=True)
+    expandable_fields = ('created_by',)
 
     class Meta:
         model = Comment
@@ -23,7 +28,33 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_by', 'created_at']
 
 
-class IssueSerializer(serializers.ModelSerializer):
+def resolve_label_ids(names):
+    """
+    Return a {name: id} mapping for label names.
+
+    Missing labels are created in one batch. Labels created concurrently
+    are picked up by re-reading the missing names.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+
+    label_ids = dict(
+        Label.objects.filter(name__in=names).values_list('name', 'id')
+    )
+    missing = [name for name in names if name not in label_ids]
+    if missing:
+        Label.objects.bulk_create(
+            [Label(name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        label_ids.update(
+            Label.objects.filter(name__in=missing).values_list('name', 'id')
+        )
+    return label_ids
+
+
+class IssueSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     created_by = UserSerializer(required=False, read_only=True)
     assigned_to = UserSerializer(required=False, read_only=True)
     labels = LabelSerializer(many=True, required=False)
@@ -36,6 +67,7 @@ class IssueSerializer(serializers.ModelSerializer):
         write_only=True,
         source='assigned_to'
     )
+    expandable_fields = ('created_by', 'assigned_to', 'labels')
 
     class Meta:
         model = Issue
@@ -47,13 +79,10 @@ class IssueSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
 
     def _get_or_create_labels(self, labels, issue):
-        """Handle getting or creating labels as needed."""
-        for label in labels:
-
-            label_obj, _ = Label.objects.get_or_create(
-                **label,
-            )
-            issue.labels.add(label_obj)
+        """Resolve labels by name, creating missing ones, and add them."""
+        label_ids = resolve_label_ids(label['name'] for label in labels)
+        if label_ids:
+            issue.labels.add(*label_ids.values())
 
     def create(self, validated_data):
         """Create an issue."""
@@ -64,7 +93,7 @@ class IssueSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         """Update a recipe."""
-        labels = validated_data.pop('labels', [])
+        labels = validated_data.pop('labels', None)
 
         if labels is not None:
             instance.labels.clear()
@@ -84,3 +113,73 @@ class IssueDetailSerializer(IssueSerializer):
         fields = IssueSerializer.Meta.fields + [
             'description', 'priority', 'updated_at', 'due_date', 'created_at'
         ]
+
+
+class IssueBulkCreateSerializer(serializers.ModelSerializer):
+    """Serializer for one issue of a bulk create request."""
+    labels = LabelSerializer(many=True, required=False)
+    assigned_to_id = serializers.IntegerField()
+
+    class Meta:
+        model = Issue
+        fields = [
+            'title', 'description', 'status', 'priority', 'due_date',
+            'assigned_to_id', 'labels',
+        ]
+
+
+class IssueBulkUpdateSerializer(IssueBulkCreateSerializer):
+    """Serializer for one issue of a bulk update request."""
+    id = serializers.IntegerField()
+
+    class Meta(IssueBulkCreateSerializer.Meta):
+        fields = ['id'] + IssueBulkCreateSerializer.Meta.fields
+
+    def validate(self, attrs):
+        # Updates are partial, which would make the id optional too.
+        if 'id' not in attrs:
+            raise serializers.ValidationError(
+                {'id': ['This field is required.']}
+            )
+        return attrs
+
+
+class IssueMassUpdateSerializer(serializers.ModelSerializer):
+    """Serializer for the values set on every issue matching a filter."""
+    assigned_to_id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Issue
+        fields = ['status', 'priority', 'due_date', 'assigned_to_id']
+        extra_kwargs = {
+            'status': {'required': False},
+            'priority': {'required': False},
+        }
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('No fields to update.')
+        return attrs
+
+
+class IssueChangesSerializer(serializers.Serializer):
+    """Serializer for the query params of an issue delta sync."""
+    since = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        required=False, default=500, min_value=1, max_value=1000
+    )
+
+    def validate_since(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+
+class IssueSearchSerializer(serializers.Serializer):
+    """Serializer for the query params of an issue search."""
+    q = serializers.CharField()
+    project = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(
+        required=False, default=50, min_value=1, max_value=200
+    )
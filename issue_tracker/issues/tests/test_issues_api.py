@@ -1,6 +1,10 @@
 """
 Tests for the issues API.
 """
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APITestCase
@@ -10,6 +14,7 @@ from core.models import (
     Label,
     Comment,
 )
+from core.search import search_issues
 from core.tests.utils import (
     create_project, create_user, create_issue
 )
@@ -64,9 +69,9 @@ class PrivateIssueApiTests(APITestCase):
         s3 = IssueSerializer(issue3)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_get_issue_detail(self):
         """Test get issue detail."""
@@ -125,6 +130,53 @@ class PrivateIssueApiTests(APITestCase):
         self.assertIn(label_processed, issue.labels.all())
         self.assertNotIn(label_duesoon, issue.labels.all())
 
+    def test_update_without_labels_keeps_labels(self):
+        """Test updating other fields leaves the labels alone."""
+        label = Label.objects.create(name='bug')
+        issue = create_issue(user=self.user, project=self.project)
+        issue.labels.add(label)
+
+        payload = {'status': 'Closed'}
+        res = self.client.patch(detail_url(issue.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(label, issue.labels.all())
+
+    def test_update_labels_constant_queries(self):
+        """Test resolving labels costs the same for 2 or 20 labels."""
+        issue = create_issue(user=self.user, project=self.project)
+        Label.objects.create(name='existing')
+
+        def count_queries(names):
+            payload = {'labels': [{'name': name} for name in names]}
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.patch(
+                    detail_url(issue.id), payload, format='json'
+                )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        # Start both measured requests from an issue with labels.
+        count_queries(['existing'])
+        few = count_queries(['existing', 'new0'])
+        many = count_queries(
+            ['existing'] + [f'label{i}' for i in range(19)]
+        )
+
+        self.assertEqual(many, few)
+        self.assertEqual(issue.labels.count(), 20)
+
+    def test_update_duplicate_label_names(self):
+        """Test repeated names in a payload resolve to one label."""
+        issue = create_issue(user=self.user, project=self.project)
+
+        payload = {'labels': [{'name': 'bug'}, {'name': 'bug'}]}
+        res = self.client.patch(detail_url(issue.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Label.objects.filter(name='bug').count(), 1)
+        self.assertEqual(issue.labels.count(), 1)
+
     def test_clear_issue_labels(self):
         """Test clearing a issues labels."""
         label = Label.objects.create(name='bug')
@@ -191,6 +243,377 @@ class IssueAssignedAPITest(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertEqual(response.data[0]['title'], self.issue1.title)
-        self.assertEqual(response.data[1]['title'], self.issue2.title)
+        results = response.data['results']
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['title'], self.issue2.title)
+        self.assertEqual(results[1]['title'], self.issue1.title)
+
+
+class IssuePaginationAPITest(APITestCase):
+    """Test cursor pagination of the issue list endpoints."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.issues = [
+            create_issue(
+                user=self.user, project=self.project, title=f'Issue {i}'
+            )
+            for i in range(5)
+        ]
+
+    def test_list_pages_newest_first(self):
+        """Test issues are paged by descending id with a next cursor."""
+        url = reverse('issues:issue-list')
+
+        res = self.client.get(url, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [issue['id'] for issue in res.data['results']],
+            [self.issues[4].id, self.issues[3].id],
+        )
+        self.assertIsNotNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [issue['id'] for issue in res.data['results']],
+            [self.issues[2].id, self.issues[1].id],
+        )
+
+    def test_pages_stable_while_inserting(self):
+        """Test new issues do not shift the pages a client is walking."""
+        url = reverse('issues:issue-assigned')
+        res = self.client.get(url, {'page_size': 2})
+
+        create_issue(user=self.user, project=self.project, title='New')
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [issue['id'] for issue in res.data['results']],
+            [self.issues[2].id, self.issues[1].id],
+        )
+
+    def test_pagination_does_not_scan_offset(self):
+        """Test following a cursor seeks on id instead of using OFFSET."""
+        url = reverse('issues:issue-list')
+        res = self.client.get(url, {'page_size': 2})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(res.data['next'])
+
+        self.assertTrue(ctx.captured_queries)
+        for query in ctx.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+
+class IssueQueryCountAPITest(APITestCase):
+    """Test the issue endpoints issue a constant number of queries."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.label = Label.objects.create(name='bug')
+
+    def _create_issues(self, count):
+        for _ in range(count):
+            issue = create_issue(user=self.user, project=self.project)
+            issue.labels.add(self.label)
+            Comment.objects.create(
+                issue=issue, created_by=self.user, text='Comment'
+            )
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_independent_of_size(self):
+        """Test listing issues does not issue a query per issue."""
+        url = reverse('issues:issue-list')
+        self._create_issues(2)
+        small = self._count_queries(url)
+
+        self._create_issues(8)
+
+        self.assertEqual(self._count_queries(url), small)
+
+    def test_assigned_query_count_independent_of_size(self):
+        """Test listing assigned issues does not query per issue."""
+        url = reverse('issues:issue-assigned')
+        self._create_issues(2)
+        small = self._count_queries(url)
+
+        self._create_issues(8)
+
+        self.assertEqual(self._count_queries(url), small)
+
+    def test_comments_query_count_independent_of_size(self):
+        """Test listing comments does not issue a query per comment."""
+        issue = create_issue(user=self.user, project=self.project)
+        url = issue_comment_url(issue.id)
+        Comment.objects.create(issue=issue, created_by=self.user, text='a')
+        small = self._count_queries(url)
+
+        for i in range(8):
+            author = create_user(email=f'user{i}@example.com')
+            Comment.objects.create(issue=issue, created_by=author, text='b')
+
+        self.assertEqual(self._count_queries(url), small)
+
+
+class IssueConditionalGetAPITest(APITestCase):
+    """Test ETags and conditional GETs of issues."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.issue = create_issue(user=self.user, project=self.project)
+
+    def _get(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_detail_not_modified(self):
+        """Test an unchanged issue is answered with a single query."""
+        url = detail_url(self.issue.id)
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            res = self._get(url, etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertFalse(res.content)
+
+    def test_detail_etag_changes(self):
+        """Test updating an issue or commenting on it changes its ETag."""
+        url = detail_url(self.issue.id)
+        etag = self.client.get(url)['ETag']
+
+        Comment.objects.create(
+            issue=self.issue, created_by=self.user, text='Comment'
+        )
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        etag = res['ETag']
+
+        self.client.patch(url, {'title': 'New title'})
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'New title')
+
+    def test_detail_etag_covers_comments_and_users(self):
+        """Test editing a comment or renaming a user changes the ETag."""
+        url = detail_url(self.issue.id)
+        comment = Comment.objects.create(
+            issue=self.issue, created_by=self.user, text='Comment'
+        )
+        etag = self.client.get(url)['ETag']
+
+        comment.text = 'Edited'
+        comment.save()
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        self.user.name = 'Renamed'
+        self.user.save()
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created_by']['name'], 'Renamed')
+
+    def test_list_etag_covers_comments_and_users(self):
+        """Test comment writes and user renames change list ETags."""
+        url = reverse('issues:issue-list')
+        etag = self.client.get(url)['ETag']
+
+        comment = Comment.objects.create(
+            issue=self.issue, created_by=self.user, text='Comment'
+        )
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        comment.text = 'Edited'
+        comment.save()
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        comment.delete()
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        self.user.email = 'renamed@example.com'
+        self.user.save(update_fields=['email'])
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'][0]['created_by']['email'],
+            'renamed@example.com',
+        )
+
+    def test_list_not_modified(self):
+        """Test an unchanged issue list is not serialized again."""
+        url = reverse('issues:issue-list')
+        etag = self.client.get(url)['ETag']
+
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        create_issue(user=self.user, project=self.project)
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_list_etag_covers_params(self):
+        """Test each page and filter of a list has its own ETag."""
+        url = reverse('issues:issue-list')
+        etag = self.client.get(url)['ETag']
+
+        res = self._get(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        res = self.client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class IssueSearchAPITest(APITestCase):
+    """Test the issue search endpoint."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.url = reverse('issues:issue-search')
+
+    def test_search_issues(self):
+        """Test searching returns ranked, serialized issues."""
+        issue1 = create_issue(
+            user=self.user, project=self.project, title='Export fails'
+        )
+        issue2 = create_issue(
+            user=self.user, project=self.project, title='Dark mode',
+            description='Export button unreadable',
+        )
+        create_issue(user=self.user, project=self.project, title='Other')
+
+        res = self.client.get(self.url, {'q': 'export'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [IssueSerializer(issue1).data, IssueSerializer(issue2).data],
+        )
+
+    def test_search_skips_deleted_matches(self):
+        """Test issues deleted after the search ran are left out."""
+        kept = create_issue(
+            user=self.user, project=self.project, title='Export fails'
+        )
+        deleted = create_issue(
+            user=self.user, project=self.project, title='Export slow'
+        )
+
+        def search_then_delete(*args, **kwargs):
+            matches = search_issues(*args, **kwargs)
+            deleted.delete()
+            return matches
+
+        with patch('issues.views.search_issues', search_then_delete):
+            res = self.client.get(self.url, {'q': 'export'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [issue['id'] for issue in res.data['results']], [kept.id]
+        )
+
+    def test_search_requires_query(self):
+        """Test searching without a query is rejected."""
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IssueSparseFieldsAPITest(APITestCase):
+    """Test sparse fieldsets and expansion of issues and comments."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.label = Label.objects.create(name='bug')
+        self.issue = create_issue(user=self.user, project=self.project)
+        self.issue.labels.add(self.label)
+        self.url = reverse('issues:issue-list')
+
+    def test_fields(self):
+        """Test only the requested fields are rendered and read."""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(
+                self.url, {'fields': 'id,title,status,assigned_to'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{
+            'id': self.issue.id, 'title': self.issue.title,
+            'assigned_to': self.user.id, 'status': self.issue.status,
+        }])
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('core_user', sql)
+        self.assertNotIn('core_label', sql)
+        self.assertNotIn('description', sql)
+
+    def test_expand(self):
+        """Test nested objects are embedded only when expanded."""
+        res = self.client.get(detail_url(self.issue.id), {'expand': 'labels'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created_by'], self.user.id)
+        self.assertEqual(
+            res.data['labels'], [{'id': self.label.id, 'name': 'bug'}]
+        )
+        self.assertEqual(res.data['description'], self.issue.description)
+
+        res = self.client.get(self.url, {'fields': 'id,labels', 'expand': ''})
+        self.assertEqual(res.data['results'], [
+            {'id': self.issue.id, 'labels': [self.label.id]},
+        ])
+
+    def test_comment_fields(self):
+        """Test sparse fieldsets of comments."""
+        Comment.objects.create(
+            issue=self.issue, created_by=self.user, text='Comment'
+        )
+
+        res = self.client.get(
+            issue_comment_url(self.issue.id),
+            {'fields': 'text,created_by', 'expand': 'created_by'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{
+            'created_by': {
+                'id': self.user.id,
+                'email': self.user.email,
+                'name': self.user.name,
+            },
+            'text': 'Comment',
+        }])
+
+    def test_invalid_fields(self):
+        """Test unknown fields and paths are rejected."""
+        res = self.client.get(
+            self.url, {'fields': 'id,assigned_to_id', 'expand': 'comments'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+        self.assertIn('expand', res.data)
@@ -1,6 +1,7 @@
 """
 URL mappings for the issues API.
 """
+from django.conf import settings
 from django.urls import (
     path,
     include,
@@ -9,6 +10,7 @@ from django.urls import (
 from rest_framework.routers import DefaultRouter
 
 from issues.views import (
+    AsyncIssueViewSet,
     IssueViewSet,
     CommentViewSet,
 )
@@ -16,7 +18,9 @@ from issues.views import (
 app_name = 'issues'
 
 router = DefaultRouter()
-router.register('', IssueViewSet)
+router.register(
+    '', AsyncIssueViewSet if settings.ASYNC_VIEWS else IssueViewSet
+)
 router.register('comments', CommentViewSet)
 
 
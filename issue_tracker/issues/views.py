@@ -1,6 +1,9 @@
 """
 Views for the issues API.
 """
+from functools import partial
+
+from asgiref.sync import sync_to_async
 from rest_framework import (
     viewsets, mixins, status
 )
@@ -12,13 +15,23 @@ from core.models import Issue, Comment
 from .serializers import (
     IssueSerializer,
     IssueDetailSerializer,
+    IssueSearchSerializer,
     CommentSerializer,
 )
 from issues.permissions import IsReporterOrReadOnly
+from core.async_views import AsyncViewSetMixin
+from core.compiled_serializers import CompiledListMixin
+from core.conditional import IssueConditionalGetMixin
 from core.filters import IssueFilter
+from core.pagination import IssueCursorPagination
+from core.query_plan import QueryPlanMixin, plan_queryset
+from core.search import search_issues
 
 
-class IssueViewSet(mixins.DestroyModelMixin,
+class IssueViewSet(IssueConditionalGetMixin,
+                   QueryPlanMixin,
+                   CompiledListMixin,
+                   mixins.DestroyModelMixin,
                    mixins.ListModelMixin,
                    mixins.UpdateModelMixin,
                    mixins.RetrieveModelMixin,
@@ -28,6 +41,8 @@ class IssueViewSet(mixins.DestroyModelMixin,
     queryset = Issue.objects.all()
     permission_classes = [IsAuthenticated, IsReporterOrReadOnly]
     filter_class = IssueFilter
+    pagination_class = IssueCursorPagination
+    compiled_actions = ('list', 'assigned')
 
     def _params_to_ints(self, qs):
         """Convert a list of strings to integers."""
@@ -39,7 +54,7 @@ class IssueViewSet(mixins.DestroyModelMixin,
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
-        if self.action == 'list':
+        if self.action in ('list', 'search'):
             return IssueSerializer
         elif self.action == 'comments':
             return CommentSerializer
@@ -61,8 +76,11 @@ class IssueViewSet(mixins.DestroyModelMixin,
         """Fetch and create comments for an issue"""
         issue = self.get_object()
         if request.method == 'GET':
-            comments = Comment.objects.filter(issue=issue)
-            serializer = CommentSerializer(comments, many=True)
+            comments = plan_queryset(
+                Comment.objects.filter(issue=issue), CommentSerializer,
+                **self.get_sparse_kwargs(),
+            )
+            serializer = self.get_serializer(comments, many=True)
             return Response(serializer.data)
         elif request.method == 'POST':
             serializer = CommentSerializer(data=request.data)
@@ -84,12 +102,76 @@ class IssueViewSet(mixins.DestroyModelMixin,
     def assigned(self, request):
         """Fetch issues assigned to the authenticated user"""
         user = self.request.user
-        assigned_issues = self.queryset.filter(assigned_to=user)
-        serializer = self.get_serializer(assigned_issues, many=True)
+        assigned_issues = self.filter_queryset(
+            self.get_queryset().filter(assigned_to=user)
+        )
+        return self.conditional_response(
+            self.get_list_etag(assigned_issues),
+            partial(self.list_response, assigned_issues),
+        )
+
+    @action(detail=False, methods=['GET'], url_path='search')
+    def search(self, request):
+        """Search issues and their comments, best match first"""
+        params = IssueSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        matches = search_issues(
+            params.validated_data['q'],
+            request.user,
+            project_id=params.validated_data.get('project'),
+            limit=params.validated_data['limit'],
+        )
+        issues = self.filter_queryset(self.queryset).in_bulk(
+            [issue_id for issue_id, _ in matches]
+        )
+        # Matches deleted since the search ran are skipped.
+        serializer = self.get_serializer(
+            [issues[issue_id] for issue_id, _ in matches
+             if issue_id in issues],
+            many=True,
+        )
+        return Response({'results': serializer.data})
+
+
+class AsyncIssueViewSet(AsyncViewSetMixin, IssueViewSet):
+    """IssueViewSet serving its hot reads on the event loop."""
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return await self.aconditional_response(
+            await self.aget_list_etag(queryset),
+            partial(self.alist_response, queryset),
+        )
+
+    async def alist_response(self, queryset):
+        if self.get_compiled_serializer() is None:
+            return await super().alist_response(queryset)
+        # The page and its related rows are read in one thread hop.
+        return await sync_to_async(self.list_response)(queryset)
+
+    async def retrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            await self.aget_object_etag(), self.aretrieve_response
+        )
+
+    @action(methods=['GET', 'POST'], detail=True, url_path='comments')
+    async def comments(self, request, pk=None):
+        """Fetch and create comments for an issue"""
+        if request.method != 'GET':
+            return await sync_to_async(super().comments)(request, pk)
+        issue = await self.aget_object()
+        comments = plan_queryset(
+            Comment.objects.filter(issue=issue), CommentSerializer,
+            **self.get_sparse_kwargs(),
+        )
+        serializer = self.get_serializer(
+            [comment async for comment in comments], many=True
+        )
         return Response(serializer.data)
 
 
-class CommentViewSet(mixins.DestroyModelMixin,
+class CommentViewSet(QueryPlanMixin,
+                     mixins.DestroyModelMixin,
                      mixins.UpdateModelMixin,
                      mixins.RetrieveModelMixin,
                      viewsets.GenericViewSet,):
@@ -0,0 +1,15 @@
+from rest_framework import permissions
+
+from core.membership import get_project_role
+
+
+class IsProjectMember(permissions.BasePermission):
+    """
+    Allow access only to members of the project in the URL.
+    """
+
+    def has_permission(self, request, view):
+        project_id = view.kwargs.get('project_id')
+        if project_id is None:
+            return True
+        return get_project_role(request.user, project_id) is not None
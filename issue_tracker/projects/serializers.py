@@ -5,13 +5,14 @@ from rest_framework.serializers import (
     ModelSerializer,
     EmailField,
     CharField,
+    IntegerField,
+    HyperlinkedIdentityField,
 )
 from core.models import (
     Project,
     ProjectMembership
 )
-
-from issues.serializers import IssueSerializer
+from core.sparse_fields import SparseFieldsMixin
 
 
 class ProjectMembershipSerializer(ModelSerializer):
@@ -25,19 +26,41 @@ class ProjectMembershipSerializer(ModelSerializer):
         ]
 
 
-class ProjectSerializer(ModelSerializer):
-    issues = IssueSerializer(many=True, required=False, read_only=True)
-    members = ProjectMembershipSerializer(
-        many=True, required=False, source='project_members', read_only=True
-    )
+class ProjectSerializer(SparseFieldsMixin, ModelSerializer):
+    """
+    Summary of a project.
+
+    The issue counts are counter columns, except the overdue count which,
+    like the member count, is read from the annotations added by
+    ``Project.objects.with_counts()``.
+    """
+    overdue_issue_count = IntegerField(read_only=True)
+    member_count = IntegerField(read_only=True)
 
     class Meta:
         model = Project
-        fields = ['id', 'name', 'issues', 'members']
+        fields = [
+            'id', 'name', 'description',
+            'open_issue_count', 'closed_issue_count',
+            'high_priority_issue_count', 'overdue_issue_count',
+            'member_count',
+        ]
+        read_only_fields = [
+            'open_issue_count', 'closed_issue_count',
+            'high_priority_issue_count',
+        ]
 
 
 class ProjectDetailSerializer(ProjectSerializer):
     """ Serializer for the project detail. """
+    issues_url = HyperlinkedIdentityField(
+        view_name='projects:project-issues',
+        lookup_url_kwarg='project_id',
+    )
+    members = ProjectMembershipSerializer(
+        many=True, required=False, source='project_members', read_only=True
+    )
+    expandable_fields = ('members',)
 
     class Meta(ProjectSerializer.Meta):
-        fields = ProjectSerializer.Meta.fields + ['description']
+        fields = ProjectSerializer.Meta.fields + ['issues_url', 'members']
@@ -1,16 +1,33 @@
 """
 Tests for the projects API.
 """
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APITestCase
 from rest_framework import status
 
+from core import sync
+from core.membership import get_project_roles
 from core.models import (
+    ChangeEvent,
+    Comment,
+    DeletedIssue,
     Project,
     Issue,
     Label,
-    ProjectMembership
+    ProjectMembership,
+    ProjectStat,
 )
 from core.tests.utils import (
     create_issue, create_user, create_project
@@ -67,9 +84,10 @@ class PrivateProjectApiTests(APITestCase):
 
         res = self.client.get(PROJECTS_URL)
 
-        s1 = ProjectSerializer(project1)
-        s2 = ProjectSerializer(project2)
-        s3 = ProjectSerializer(project3)
+        projects = Project.objects.with_counts()
+        s1 = ProjectSerializer(projects.get(id=project1.id))
+        s2 = ProjectSerializer(projects.get(id=project2.id))
+        s3 = ProjectSerializer(projects.get(id=project3.id))
         self.assertIn(s1.data, res.data)
         self.assertIn(s2.data, res.data)
         self.assertNotIn(s3.data, res.data)
@@ -82,10 +100,52 @@ class PrivateProjectApiTests(APITestCase):
         url = detail_url(project.id)
         res = self.client.get(url)
 
-        serializer = ProjectDetailSerializer(project)
+        serializer = ProjectDetailSerializer(
+            Project.objects.with_counts().get(id=project.id),
+            context={'request': res.wsgi_request},
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
+        self.assertNotIn('issues', res.data)
+        self.assertTrue(
+            res.data['issues_url'].endswith(project_issue_url(project.id))
+        )
+
+    def test_list_projects_counts(self):
+        """Test the project list returns issue and member counts."""
+        user1 = create_user(email='user1@example.com')
+        project = create_project(user=self.user)
+        ProjectMembership.objects.create(
+            user=user1, project=project, role='developer'
+        )
+        create_issue(user=self.user, project=project, status='Open')
+        create_issue(user=self.user, project=project, status='Open')
+        create_issue(user=self.user, project=project, status='Closed')
+
+        res = self.client.get(PROJECTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['open_issue_count'], 2)
+        self.assertEqual(res.data[0]['closed_issue_count'], 1)
+        self.assertEqual(res.data[0]['high_priority_issue_count'], 0)
+        self.assertEqual(res.data[0]['overdue_issue_count'], 0)
+        self.assertEqual(res.data[0]['member_count'], 2)
+        self.assertNotIn('issues', res.data[0])
+
+    def test_list_projects_single_query(self):
+        """Test the project list costs one query however many issues."""
+        for _ in range(3):
+            project = create_project(user=self.user)
+            for _ in range(5):
+                create_issue(user=self.user, project=project)
+        get_project_roles(self.user)
+
+        # One more query reads the data version keying the response cache.
+        with self.assertNumQueries(2):
+            res = self.client.get(PROJECTS_URL)
+
+        self.assertEqual(len(res.data), 3)
 
     def test_create_project(self):
         """Test creating a project."""
@@ -100,6 +160,28 @@ class PrivateProjectApiTests(APITestCase):
         for k, v in payload.items():
             self.assertEqual(getattr(project, k), v)
         self.assertEqual(project.created_by, self.user)
+        self.assertEqual(res.data['member_count'], 1)
+
+    def test_update_project_constant_queries(self):
+        """Test updating a project costs the same queries however many
+        members it has."""
+        project = create_project(user=self.user)
+        url = detail_url(project.id)
+        payload = {'description': 'Updated'}
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch(url, payload, format='json')
+        for number in range(3):
+            ProjectMembership.objects.create(
+                user=create_user(email=f'user{number}@example.com'),
+                project=project, role='developer',
+            )
+
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['members']), 4)
+        self.assertEqual(res.data['member_count'], 4)
 
 
 class ProjectMembersAPITest(APITestCase):
@@ -183,12 +265,49 @@ class ProjectIssuesAPITest(APITestCase):
         self.user = create_user()
         self.client.force_authenticate(self.user)
         self.project = create_project(user=self.user)
+        # Warm the membership cache so query counts only cover the view.
+        get_project_roles(self.user)
 
     def test_list_issues(self):
         url = project_issue_url(self.project.id)
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_list_issues_not_modified(self):
+        """Test an unchanged project issue list is answered with a 304."""
+        issue = create_issue(user=self.user, project=self.project)
+        create_issue(user=self.user, project=self.project)
+        url = project_issue_url(self.project.id)
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        issue.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_issues_etag_covers_comments(self):
+        """Test commenting on an issue changes the project list ETag."""
+        issue = create_issue(user=self.user, project=self.project)
+        url = project_issue_url(self.project.id)
+        etag = self.client.get(url)['ETag']
+
+        Comment.objects.create(issue=issue, created_by=self.user, text='Hi')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_issues_requires_membership(self):
+        """Test non-members cannot access the issues of a project."""
+        other = create_user(email='other@example.com')
+        project = create_project(user=other)
+        create_issue(user=other, project=project)
+
+        response = self.client.get(project_issue_url(project.id))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_create_issue(self):
         """Test creating a new issue."""
         url = project_issue_url(self.project.id)
@@ -288,9 +407,9 @@ class ProjectIssuesAPITest(APITestCase):
         s1 = IssueDetailSerializer(issue1)
         s2 = IssueDetailSerializer(issue2)
         s3 = IssueDetailSerializer(issue3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_assigned_to(self):
         """Test filtering issues by assigned user."""
@@ -313,6 +432,699 @@ class ProjectIssuesAPITest(APITestCase):
         s1 = IssueDetailSerializer(issue1)
         s2 = IssueDetailSerializer(issue2)
         s3 = IssueDetailSerializer(issue3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
+
+    def test_list_issues_query_count_independent_of_size(self):
+        """Test listing project issues does not issue a query per issue."""
+        url = project_issue_url(self.project.id)
+        label = Label.objects.create(name='bug')
+        create_issue(user=self.user, project=self.project).labels.add(label)
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        for _ in range(8):
+            issue = create_issue(user=self.user, project=self.project)
+            issue.labels.add(label)
+        with CaptureQueriesContext(connection) as large:
+            res = self.client.get(url)
+
+        self.assertEqual(len(res.data['results']), 9)
+        self.assertEqual(
+            len(large.captured_queries), len(small.captured_queries)
+        )
+
+
+class ProjectIssuesExportAPITest(APITestCase):
+    """Test streaming exports of project issues."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.url = reverse(
+            'projects:project-issues-export', args=[self.project.id]
+        )
+
+    def test_export_csv(self):
+        """Test exporting the issues of a project as CSV."""
+        issue = create_issue(
+            user=self.user, project=self.project, title='Fix, "now"'
+        )
+        issue.labels.add(
+            Label.objects.create(name='ui'), Label.objects.create(name='bug')
+        )
+
+        res = self.client.get(self.url, {'format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(
+            io.StringIO(b''.join(res.streaming_content).decode())
+        ))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(issue.id))
+        self.assertEqual(rows[0]['title'], 'Fix, "now"')
+        self.assertEqual(rows[0]['due_date'], '')
+        self.assertEqual(rows[0]['labels'], 'bug,ui')
+
+    def test_export_ndjson_filtered(self):
+        """Test exporting the issues matching filters as NDJSON."""
+        other = create_user(email='other@example.com')
+        issues = [
+            create_issue(user=other, project=self.project) for _ in range(3)
+        ]
+        create_issue(user=self.user, project=self.project)
+
+        res = self.client.get(
+            self.url, {'format': 'ndjson', 'assigned_to': other.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(
+            res['Content-Type'].startswith('application/x-ndjson')
+        )
+        rows = [
+            json.loads(line)
+            for line in b''.join(res.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row['id'] for row in rows], [issue.id for issue in issues]
+        )
+        self.assertEqual(rows[0]['assigned_to_id'], other.id)
+        self.assertEqual(rows[0]['labels'], [])
+
+    @patch('core.export.EXPORT_CHUNK_SIZE', 2)
+    def test_export_queries_per_chunk(self):
+        """Test labels are read with one query per chunk of issues."""
+        label = Label.objects.create(name='bug')
+        for _ in range(5):
+            issue = create_issue(user=self.user, project=self.project)
+            issue.labels.add(label)
+        get_project_roles(self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.url, {'format': 'ndjson'})
+            content = b''.join(res.streaming_content)
+
+        self.assertEqual(len(content.splitlines()), 5)
+        # One query reads the issues and one the labels of each chunk.
+        self.assertEqual(len(ctx.captured_queries), 1 + 3)
+
+    def test_export_requires_membership(self):
+        """Test non-members cannot export the issues of a project."""
+        other = create_user(email='other@example.com')
+        project = create_project(user=other)
+
+        res = self.client.get(
+            reverse('projects:project-issues-export', args=[project.id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProjectIssuesBulkAPITest(APITestCase):
+    """Test the bulk issue endpoints of the projects API."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        # Warm the membership cache so query counts only cover the view.
+        get_project_roles(self.user)
+        self.url = reverse(
+            'projects:project-issues-bulk', args=[self.project.id]
+        )
+
+    def _issue_payload(self, **params):
+        payload = {'title': 'Bulk issue', 'assigned_to_id': self.user.id}
+        payload.update(params)
+        return payload
+
+    def test_bulk_create(self):
+        """Test creating several issues with labels in one request."""
+        payload = [
+            self._issue_payload(title='Issue 1', labels=[{'name': 'bug'}]),
+            self._issue_payload(title='Issue 2', status='Closed'),
+        ]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [result['status'] for result in res.data['results']],
+            [201, 201],
+        )
+        issue1 = Issue.objects.get(id=res.data['results'][0]['id'])
+        self.assertEqual(issue1.title, 'Issue 1')
+        self.assertEqual(issue1.project, self.project)
+        self.assertEqual(issue1.created_by, self.user)
+        self.assertEqual(list(issue1.labels.values_list('name', flat=True)),
+                         ['bug'])
+        issue2 = Issue.objects.get(id=res.data['results'][1]['id'])
+        self.assertEqual(issue2.status, 'Closed')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.closed_issue_count, 1)
+
+    def test_bulk_create_invalid_item_writes_nothing(self):
+        """Test one invalid item fails the whole batch."""
+        payload = [
+            self._issue_payload(),
+            self._issue_payload(assigned_to_id=9999),
+            {'assigned_to_id': self.user.id},
+        ]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        results = res.data['results']
+        self.assertEqual(results[0]['status'], 424)
+        self.assertIn('assigned_to_id', results[1]['errors'])
+        self.assertIn('title', results[2]['errors'])
+        self.assertFalse(Issue.objects.exists())
+
+    def test_bulk_create_constant_queries(self):
+        """Test the query count does not grow with the batch size."""
+        def count_queries(size):
+            payload = [
+                self._issue_payload(labels=[{'name': f'label{size}-{i}'}])
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(self.url, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(20), count_queries(2))
+        self.assertEqual(Issue.objects.count(), 22)
+
+    def test_bulk_update(self):
+        """Test partially updating several issues by id."""
+        issue1 = create_issue(user=self.user, project=self.project)
+        issue2 = create_issue(user=self.user, project=self.project)
+        payload = [
+            {'id': issue1.id, 'status': 'Closed'},
+            {'id': issue2.id, 'title': 'Renamed', 'labels': [{'name': 'x'}]},
+        ]
+
+        res = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        issue1.refresh_from_db()
+        issue2.refresh_from_db()
+        self.assertEqual(issue1.status, 'Closed')
+        self.assertEqual(issue1.title, 'Sample issue title')
+        self.assertEqual(issue2.title, 'Renamed')
+        self.assertEqual(list(issue2.labels.values_list('name', flat=True)),
+                         ['x'])
+
+    def test_bulk_update_unknown_issue(self):
+        """Test updating an issue of another project is reported."""
+        other_project = create_project(user=self.user)
+        issue = create_issue(user=self.user, project=self.project)
+        other_issue = create_issue(user=self.user, project=other_project)
+        payload = [
+            {'id': issue.id, 'status': 'Closed'},
+            {'id': other_issue.id, 'status': 'Closed'},
+        ]
+
+        res = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['results'][1]['status'], 404)
+        issue.refresh_from_db()
+        self.assertEqual(issue.status, 'New')
+
+    def test_update_matching(self):
+        """Test closing all issues matching filter params."""
+        bug = Label.objects.create(name='bug')
+        issue1 = create_issue(user=self.user, project=self.project)
+        issue1.labels.add(bug)
+        issue2 = create_issue(user=self.user, project=self.project)
+        url = reverse(
+            'projects:project-issues-bulk-matching', args=[self.project.id]
+        )
+
+        # The counted fields of the matching issues are read, then the
+        # issues, the counters, the stat rollups and the data version are
+        # updated inside a savepoint.
+        with self.assertNumQueries(9):
+            res = self.client.patch(
+                f'{url}?labels=bug', {'status': 'Closed'}, format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['updated'], 1)
+        issue1.refresh_from_db()
+        issue2.refresh_from_db()
+        self.assertEqual(issue1.status, 'Closed')
+        self.assertEqual(issue2.status, 'New')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.closed_issue_count, 1)
+
+    def test_update_matching_requires_filter(self):
+        """Test updating matching issues without filters is rejected."""
+        url = reverse(
+            'projects:project-issues-bulk-matching', args=[self.project.id]
+        )
+
+        res = self.client.patch(url, {'status': 'Closed'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete(self):
+        """Test deleting several issues by id."""
+        issue1 = create_issue(user=self.user, project=self.project)
+        issue2 = create_issue(user=self.user, project=self.project)
+
+        res = self.client.delete(
+            self.url, {'ids': [issue1.id, 9999]}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': issue1.id, 'status': 204}, {'id': 9999, 'status': 404}],
+        )
+        self.assertEqual(list(Issue.objects.all()), [issue2])
+
+    def test_bulk_delete_keeps_derived_data(self):
+        """Test bulk deletes update counters, stats, tombstones and feeds."""
+        label = Label.objects.create(name='bug')
+        issue = create_issue(user=self.user, project=self.project)
+        issue.labels.add(label)
+        Comment.objects.create(issue=issue, created_by=self.user, text='Hi')
+        version = Project.objects.get(id=self.project.id).data_version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.delete(
+                self.url, {'ids': [issue.id]}, format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(Comment.objects.exists())
+        project = Project.objects.get(id=self.project.id)
+        self.assertEqual(project.open_issue_count, 0)
+        self.assertNotEqual(project.data_version, version)
+        self.assertFalse(ProjectStat.objects.filter(
+            project=self.project, issue_count__gt=0
+        ).exists())
+        self.assertEqual(list(DeletedIssue.objects.values_list(
+            'issue_id', flat=True
+        )), [issue.id])
+        self.assertEqual(ChangeEvent.objects.filter(
+            kind='issue.deleted'
+        ).get().data, {'id': issue.id})
+
+    def test_bulk_delete_constant_queries(self):
+        """Test the query count does not grow with the batch size."""
+        label = Label.objects.create(name='bug')
+
+        def count_queries(size):
+            ids = []
+            for _ in range(size):
+                issue = create_issue(user=self.user, project=self.project)
+                issue.labels.add(label)
+                Comment.objects.create(
+                    issue=issue, created_by=self.user, text='Hi'
+                )
+                ids.append(issue.id)
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.delete(
+                    self.url, {'ids': ids}, format='json'
+                )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(20), count_queries(2))
+        self.assertFalse(Issue.objects.exists())
+
+
+class ProjectSparseFieldsAPITest(APITestCase):
+    """Test sparse fieldsets of projects."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+
+    def test_counts_only_when_requested(self):
+        """Test counts not requested are not computed."""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(PROJECTS_URL, {'fields': 'id,member_count'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, [{'id': self.project.id, 'member_count': 1}]
+        )
+        self.assertNotIn(
+            'core_projectduedatecount',
+            ' '.join(query['sql'] for query in ctx.captured_queries),
+        )
+
+    def test_members_expanded(self):
+        """Test members render as ids unless expanded."""
+        membership = ProjectMembership.objects.get(project=self.project)
+
+        res = self.client.get(
+            detail_url(self.project.id), {'fields': 'members', 'expand': ''}
+        )
+
+        self.assertEqual(res.data, {'members': [membership.id]})
+
+        res = self.client.get(
+            detail_url(self.project.id), {'expand': 'members'}
+        )
+        self.assertEqual(res.data['members'][0]['user'], self.user.id)
+
+
+class ProjectIssuesSyncAPITest(APITestCase):
+    """Test the delta sync of project issues."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.url = reverse(
+            'projects:project-issues-changes', args=[self.project.id]
+        )
+
+    def _ids(self, res):
+        return [issue['id'] for issue in res.data['issues']]
+
+    @override_settings(ISSUE_SYNC_SETTLE_SECONDS=0)
+    def test_sync_changes(self):
+        """Test a full sync, then only the changes after its cursor."""
+        issue1 = create_issue(user=self.user, project=self.project)
+        issue2 = create_issue(user=self.user, project=self.project)
+        issue3 = create_issue(user=self.user, project=self.project)
+        label = Label.objects.create(name='bug')
+        issue3.labels.add(label)
+        create_issue(user=self.user, project=create_project(user=self.user))
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(res), [issue1.id, issue2.id, issue3.id])
+        self.assertEqual(res.data['issues'][0], IssueDetailSerializer(
+            Issue.objects.get(id=issue1.id)
+        ).data)
+        self.assertEqual(res.data['deleted'], [])
+        self.assertFalse(res.data['has_more'])
+
+        issue1.status = 'Closed'
+        issue1.save()
+        issue2_id = issue2.id
+        issue2.delete()
+        label.name = 'defect'
+        label.save()
+        issue4 = create_issue(user=self.user, project=self.project)
+
+        res = self.client.get(self.url, {'since': res.data['cursor']})
+
+        self.assertEqual(self._ids(res), [issue1.id, issue3.id, issue4.id])
+        self.assertEqual(res.data['issues'][0]['status'], 'Closed')
+        self.assertEqual(res.data['issues'][1]['labels'][0]['name'], 'defect')
+        self.assertEqual(res.data['deleted'], [issue2_id])
+
+        res = self.client.get(self.url, {'since': res.data['cursor']})
+
+        self.assertEqual(res.data['issues'], [])
+        self.assertEqual(res.data['deleted'], [])
+
+    @override_settings(ISSUE_SYNC_SETTLE_SECONDS=0)
+    def test_sync_comments(self):
+        """Test issues are synced again when their comments change."""
+        issue = create_issue(user=self.user, project=self.project)
+        res = self.client.get(self.url)
+
+        comment = Comment.objects.create(
+            issue=issue, created_by=self.user, text='First'
+        )
+        res = self.client.get(self.url, {'since': res.data['cursor']})
+        self.assertEqual(self._ids(res), [issue.id])
+
+        comment.delete()
+        res = self.client.get(self.url, {'since': res.data['cursor']})
+        self.assertEqual(self._ids(res), [issue.id])
+
+    def test_sync_pages(self):
+        """Test paging through changes, recent ones being repeated."""
+        issues = [
+            create_issue(user=self.user, project=self.project)
+            for _ in range(3)
+        ]
+
+        synced, params = [], {'limit': 2}
+        while True:
+            res = self.client.get(self.url, params)
+            synced.extend(self._ids(res))
+            params['since'] = res.data['cursor']
+            if not res.data['has_more']:
+                break
+
+        self.assertEqual(synced, [issue.id for issue in issues])
+        # Changes within the settle window are read again.
+        res = self.client.get(self.url, params)
+        self.assertEqual(self._ids(res), [issues[2].id])
+
+    def test_sync_query_count_independent_of_size(self):
+        """Test changes are read with a constant number of queries."""
+        label = Label.objects.create(name='bug')
+        for _ in range(5):
+            issue = create_issue(user=self.user, project=self.project)
+            issue.labels.add(label)
+        get_project_roles(self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.url)
+
+        self.assertEqual(len(res.data['issues']), 5)
+        # Issues with their users, their labels and the tombstones.
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    @override_settings(ISSUE_SYNC_RETENTION_DAYS=1)
+    def test_expired_cursor(self):
+        """Test cursors older than the tombstones are rejected."""
+        old = timezone.now() - timedelta(days=2)
+        tombstone = DeletedIssue.objects.create(
+            project=self.project, issue_id=1
+        )
+        DeletedIssue.objects.filter(id=tombstone.id).update(deleted_at=old)
+
+        res = self.client.get(
+            self.url, {'since': sync.encode_cursor(None, (old, None))}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        sync.prune()
+        self.assertFalse(DeletedIssue.objects.exists())
+
+        res = self.client.get(self.url, {'since': 'invalid'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_requires_membership(self):
+        """Test non-members cannot sync the issues of a project."""
+        project = create_project(user=create_user(email='other@example.com'))
+
+        res = self.client.get(reverse(
+            'projects:project-issues-changes', args=[project.id]
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProjectResponseCacheAPITest(APITestCase):
+    """Test caching the project and project issue lists."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.issue = create_issue(user=self.user, project=self.project)
+        get_project_roles(self.user)
+
+    def _assertCached(self, url, queries=1):
+        """Assert GET url is served from the cache."""
+        res = self.client.get(url)
+        with self.assertNumQueries(queries):
+            cached = self.client.get(url)
+        self.assertEqual(cached.data, res.data)
+        return cached
+
+    def test_project_list_cached(self):
+        """Test the project list is cached until an issue changes."""
+        self._assertCached(PROJECTS_URL)
+
+        self.issue.status = 'Open'
+        self.issue.save()
+
+        res = self._assertCached(PROJECTS_URL)
+        self.assertEqual(res.data[0]['open_issue_count'], 1)
+
+    def test_project_issues_cached(self):
+        """Test the project issue list is cached until an issue changes."""
+        url = project_issue_url(self.project.id)
+        # The ETag and the data version are read before the cache.
+        self._assertCached(url, queries=2)
+
+        res = self.client.patch(
+            reverse('projects:project-issues-bulk', args=[self.project.id]),
+            [{'id': self.issue.id, 'title': 'Renamed'}],
+            format='json',
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self._assertCached(url, queries=2)
+        self.assertEqual(res.data['results'][0]['title'], 'Renamed')
+
+    def test_filter_params_normalized(self):
+        """Test the order of query params does not split the cache."""
+        url = project_issue_url(self.project.id)
+        self.client.get(url, {'status': 'New', 'page_size': 10})
+        stats = caches['default'].stats()
+
+        self.client.get(f'{url}?page_size=10&status=New')
+
+        self.assertEqual(caches['default'].stats()['hits'], stats['hits'] + 1)
+
+    def test_writes_invalidate(self):
+        """Test label and membership writes change the cached lists."""
+        url = project_issue_url(self.project.id)
+        label = Label.objects.create(name='bug')
+        self._assertCached(url, queries=2)
+
+        self.issue.labels.add(label)
+        res = self._assertCached(url, queries=2)
+        self.assertEqual(res.data['results'][0]['labels'], [
+            {'id': label.id, 'name': 'bug'}
+        ])
+
+        label.name = 'defect'
+        label.save()
+        res = self._assertCached(url, queries=2)
+        self.assertEqual(res.data['results'][0]['labels'][0]['name'], 'defect')
+
+        self._assertCached(PROJECTS_URL)
+        ProjectMembership.objects.create(
+            user=create_user(email='other@example.com'),
+            project=self.project,
+            role='developer',
+        )
+        res = self._assertCached(PROJECTS_URL)
+        self.assertEqual(res.data[0]['member_count'], 2)
+
+    def test_user_rename_invalidates(self):
+        """Test renaming a user changes the cached lists embedding it."""
+        url = project_issue_url(self.project.id)
+        self._assertCached(url, queries=2)
+
+        self.user.name = 'Renamed'
+        self.user.save()
+
+        res = self._assertCached(url, queries=2)
+        self.assertEqual(res.data['results'][0]['created_by']['name'],
+                         'Renamed')
+
+    def test_cache_keyed_by_date(self):
+        """Test date-dependent counts are not served from yesterday."""
+        self._assertCached(PROJECTS_URL)
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        with patch('core.cache.timezone.localdate', return_value=tomorrow):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(PROJECTS_URL)
+
+        self.assertGreater(len(ctx.captured_queries), 1)
+
+    def test_cache_counts_hits(self):
+        """Test the cache backend counts hits and misses."""
+        stats = caches['default'].stats()
+
+        self.client.get(PROJECTS_URL)
+        self.client.get(PROJECTS_URL)
+
+        new_stats = caches['default'].stats()
+        self.assertEqual(new_stats['misses'], stats['misses'] + 1)
+        self.assertEqual(new_stats['hits'], stats['hits'] + 1)
+
+
+class ProjectStatsAPITest(APITestCase):
+    """Test the project statistics endpoint."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(user=self.user)
+        self.url = reverse('projects:project-stats', args=[self.project.id])
+
+    def _create_issues(self):
+        bug = Label.objects.create(name='bug')
+        today = timezone.localdate()
+        issue = create_issue(
+            user=self.user, project=self.project, status='Open',
+            priority='High', due_date=today - timedelta(days=1),
+        )
+        issue.labels.add(bug)
+        create_issue(
+            user=self.user, project=self.project, status='Open',
+            priority='High', due_date=today + timedelta(days=2),
+        )
+        create_issue(user=self.user, project=self.project, status='Closed')
+        return bug
+
+    def _assert_stats(self, stats, bug):
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['by_status_priority'], [
+            {'status': 'Closed', 'priority': 'Medium', 'count': 1},
+            {'status': 'Open', 'priority': 'High', 'count': 2},
+        ])
+        self.assertEqual(stats['by_assignee'], [{
+            'assigned_to_id': self.user.id,
+            'email': self.user.email,
+            'name': self.user.name,
+            'count': 3,
+        }])
+        self.assertEqual(
+            stats['by_label'],
+            [{'label_id': bug.id, 'name': 'bug', 'count': 1}],
+        )
+        self.assertEqual(stats['by_due_date'], {
+            'overdue': 1, 'today': 0, 'this_week': 1, 'later': 0,
+        })
+
+    def test_stats(self):
+        """Test counting the issues of a small project live."""
+        bug = self._create_issues()
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self._assert_stats(res.data, bug)
+
+    @patch('core.stats.ROLLUP_THRESHOLD', 0)
+    def test_stats_from_rollups(self):
+        """Test large projects are read from the rollups."""
+        bug = self._create_issues()
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self._assert_stats(res.data, bug)
+        self.assertFalse(any(
+            'core_issue' in query['sql'] for query in ctx.captured_queries
+        ))
+
+    def test_stats_requires_membership(self):
+        """Test non-members cannot read the stats of a project."""
+        other = create_user(email='other@example.com')
+        project = create_project(user=other)
+
+        res = self.client.get(
+            reverse('projects:project-stats', args=[project.id])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
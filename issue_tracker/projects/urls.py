@@ -1,20 +1,50 @@
 """
 URL mappings for the projects API.
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from projects.views import ProjectViewSet, ProjectIssuesViewSet
+from projects.views import (
+    AsyncProjectViewSet,
+    ProjectEventsViewSet,
+    ProjectViewSet,
+    ProjectIssuesViewSet,
+)
 
 app_name = 'projects'
 
 router = DefaultRouter()
-router.register('', ProjectViewSet)
+router.register(
+    '', AsyncProjectViewSet if settings.ASYNC_VIEWS else ProjectViewSet
+)
 
 project_issues_list = ProjectIssuesViewSet.as_view({
     'get': 'list',
     'post': 'create',
 })
 
+project_issues_export = ProjectIssuesViewSet.as_view({
+    'get': 'export',
+})
+
+project_issues_changes = ProjectIssuesViewSet.as_view({
+    'get': 'changes',
+})
+
+project_issues_bulk = ProjectIssuesViewSet.as_view({
+    'post': 'create_many',
+    'patch': 'update_many',
+    'delete': 'destroy_many',
+})
+
+project_issues_matching = ProjectIssuesViewSet.as_view({
+    'patch': 'update_matching',
+})
+
+project_events = ProjectEventsViewSet.as_view({
+    'get': 'stream',
+})
+
 urlpatterns = [
     path('', include(router.urls)),
     path(
@@ -22,4 +52,29 @@ urlpatterns = [
         project_issues_list,
         name='project-issues'
     ),
+    path(
+        '<int:project_id>/issues/export/',
+        project_issues_export,
+        name='project-issues-export'
+    ),
+    path(
+        '<int:project_id>/issues/changes/',
+        project_issues_changes,
+        name='project-issues-changes'
+    ),
+    path(
+        '<int:project_id>/issues/bulk/',
+        project_issues_bulk,
+        name='project-issues-bulk'
+    ),
+    path(
+        '<int:project_id>/issues/bulk/matching/',
+        project_issues_matching,
+        name='project-issues-bulk-matching'
+    ),
+    path(
+        '<int:project_id>/events/',
+        project_events,
+        name='project-events'
+    ),
 ]
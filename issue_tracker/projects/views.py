@@ -1,7 +1,14 @@
 """
 Views for the projects API.
 """
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
@@ -10,7 +17,9 @@ from rest_framework import (
     viewsets,
     status,
 )
+from rest_framework.exceptions import ValidationError
 from core.models import (
+    Comment,
     Project,
     Issue,
     ProjectMembership,
@@ -20,12 +29,43 @@ from projects.serializers import (
     ProjectDetailSerializer,
     ProjectMembershipSerializer,
 )
-from issues.serializers import IssueDetailSerializer
+from issues.serializers import (
+    IssueDetailSerializer,
+    IssueChangesSerializer,
+    IssueBulkCreateSerializer,
+    IssueBulkUpdateSerializer,
+    IssueMassUpdateSerializer,
+    resolve_label_ids,
+)
+from core import changes, counters, sync
+from core.async_views import AsyncViewSetMixin
+from core.cache import ResponseCacheMixin
+from core.changes import EventStreamRenderer, StreamsUnavailable
+from core.compiled_serializers import CompiledListMixin
+from core.conditional import IssueConditionalGetMixin
+from core.export import (
+    EXPORTERS,
+    CSVExportRenderer,
+    NDJSONExportRenderer,
+    export_rows,
+)
 from core.filters import IssueFilter
+from core.membership import get_project_role, get_project_roles
+from core.pagination import IssueCursorPagination
+from core.query_plan import QueryPlanMixin, plan_queryset
+from core.search import index_issues, remove_issues
+from core.stats import project_stats
+from projects.permissions import IsProjectMember
+from user.authentication import QueryParamJWTAuthentication
 from user.serializers import UserSerializer
 
+# Largest number of issues accepted by one bulk request.
+BULK_MAX_ITEMS = 500
 
-class ProjectViewSet(viewsets.ModelViewSet):
+
+class ProjectViewSet(ResponseCacheMixin,
+                     QueryPlanMixin,
+                     viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectDetailSerializer
     permission_classes = [IsAuthenticated]
@@ -35,14 +75,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return [int(str_id) for str_id in qs.split(',')]
 
     def _is_admin_user(self, user, project):
-        try:
-
-            request_user_membership = ProjectMembership.objects.get(
-                user=user, project=project
-            )
-            return request_user_membership.role == 'admin'
-        except ProjectMembership.DoesNotExist:
-            return False
+        return get_project_role(user, project.id) == 'admin'
 
     def perform_create(self, serializer):
         """Create the project object"""
@@ -52,18 +85,33 @@ class ProjectViewSet(viewsets.ModelViewSet):
             project=project,
             role='admin'
         )
+        serializer.instance = self.filter_queryset(
+            self.get_queryset()
+        ).get(id=project.id)
+
+    def perform_update(self, serializer):
+        """Update the project, reading it back with its query plan."""
+        # DRF drops the prefetched members of the updated instance.
+        project = serializer.save()
+        serializer.instance = self.filter_queryset(
+            self.get_queryset()
+        ).get(id=project.id)
 
     def get_queryset(self):
         """Retrieve projects for authenticated user."""
         queryset = self.queryset
-        user = self.request.user
 
+        # The membership join uses its index; a literal list of the cached
+        # project ids would scan the projects.
         queryset = queryset.filter(
-            project_members__user__id=user.id
-        )
+            project_members__user=self.request.user
+        ).with_counts(self.get_sparse_kwargs().get('fields'))
 
         return queryset.order_by('-id')
 
+    def get_versioned_projects(self):
+        return Project.objects.filter(project_members__user=self.request.user)
+
     def get_serializer_class(self):
         """Return the serializer class for request."""
         if self.action == 'list':
@@ -71,6 +119,19 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         return self.serializer_class
 
+    @action(detail=True,
+            methods=['get'],
+            url_path='stats',
+            url_name='stats')
+    def stats(self, request, pk=None):
+        """Issue counts of the project for its dashboard."""
+        project = get_object_or_404(
+            Project.objects.only('open_issue_count', 'closed_issue_count'),
+            id=pk,
+            id__in=list(get_project_roles(request.user)),
+        )
+        return Response(project_stats(project))
+
     @action(detail=True,
             methods=['get'],
             url_path='members',
@@ -90,7 +151,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
             url_name='memberships')
     def list_memberships(self, request, pk=None):
         project = Project.objects.get(id=pk)
-        memberships = ProjectMembership.objects.filter(project=project)
+        memberships = ProjectMembership.objects.filter(
+            project=project
+        ).select_related('user', 'project')
         serializer = ProjectMembershipSerializer(memberships, many=True)
         return Response(serializer.data)
 
@@ -159,17 +222,390 @@ class ProjectViewSet(viewsets.ModelViewSet):
         )
 
 
-class ProjectIssuesViewSet(viewsets.ModelViewSet):
-    permission_classes = [IsAuthenticated]
+class AsyncProjectViewSet(AsyncViewSetMixin, ProjectViewSet):
+    """ProjectViewSet serving its list on the event loop."""
+
+    async def list(self, request, *args, **kwargs):
+        return await self.acached_list(self._alist)
+
+    async def _alist(self):
+        return await self.alist_response(
+            self.filter_queryset(self.get_queryset())
+        )
+
+
+class ProjectIssuesViewSet(IssueConditionalGetMixin,
+                           ResponseCacheMixin,
+                           QueryPlanMixin,
+                           CompiledListMixin,
+                           viewsets.ModelViewSet):
+    permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = IssueDetailSerializer
     filterset_class = IssueFilter
+    pagination_class = IssueCursorPagination
 
     def get_queryset(self):
         project_id = self.kwargs['project_id']
         return Issue.objects.filter(project_id=project_id)
 
+    def get_renderers(self):
+        if self.action == 'export':
+            return [CSVExportRenderer(), NDJSONExportRenderer()]
+        return super().get_renderers()
+
     def perform_create(self, serializer):
         """Create the issue object"""
         project_id = self.kwargs['project_id']
         project = Project.objects.get(id=project_id)
         serializer.save(project=project, created_by=self.request.user)
+
+    def export(self, request, project_id=None):
+        """Stream the issues matching the filter params as CSV or NDJSON."""
+        matching = Issue.objects.filter(
+            id__in=self.filter_queryset(self.get_queryset()).values('id')
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            EXPORTERS[renderer.format](export_rows(matching)),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="project-{project_id}-issues.'
+            f'{renderer.format}"'
+        )
+        return response
+
+    def changes(self, request, project_id=None):
+        """Return the issues changed and deleted after the since cursor."""
+        params = IssueChangesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        issues = plan_queryset(
+            self.get_queryset(), self.get_serializer_class(),
+            **self.get_sparse_kwargs(),
+        )
+        try:
+            changed, deleted, cursor, has_more = sync.issue_changes(
+                issues,
+                project_id,
+                params.validated_data.get('since'),
+                params.validated_data['limit'],
+            )
+        except sync.CursorExpired:
+            return Response(
+                {'detail': 'The cursor has expired; sync from scratch.'},
+                status=status.HTTP_410_GONE,
+            )
+        return Response({
+            'issues': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+            'cursor': sync.encode_cursor(*cursor),
+            'has_more': has_more,
+        })
+
+    def _validate_items(self, serializer_class, partial=False):
+        """
+        Validate the items of a bulk request.
+
+        Return the validated items and the per-item results. The request
+        fails as a whole if any item carries errors.
+        """
+        data = self.request.data
+        if not isinstance(data, list) or not data:
+            raise ValidationError('Expected a non-empty list of issues.')
+        if len(data) > BULK_MAX_ITEMS:
+            raise ValidationError(
+                f'At most {BULK_MAX_ITEMS} issues can be sent at once.'
+            )
+
+        items, results = [], []
+        for index, item in enumerate(data):
+            serializer = serializer_class(data=item, partial=partial)
+            if serializer.is_valid():
+                items.append(serializer.validated_data)
+                results.append({'index': index})
+            else:
+                items.append(None)
+                results.append({
+                    'index': index,
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': serializer.errors,
+                })
+
+        user_ids = {
+            item['assigned_to_id'] for item in items
+            if item and 'assigned_to_id' in item
+        }
+        existing_user_ids = set(get_user_model().objects.filter(
+            id__in=user_ids
+        ).values_list('id', flat=True))
+        for index, item in enumerate(items):
+            if item and 'assigned_to_id' in item \
+                    and item['assigned_to_id'] not in existing_user_ids:
+                items[index] = None
+                results[index].update({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'assigned_to_id': ['User does not exist.']},
+                })
+        return items, results
+
+    def _failed_response(self, results):
+        """Report a bulk request that was not applied."""
+        for result in results:
+            result.setdefault('status', status.HTTP_424_FAILED_DEPENDENCY)
+        return Response(
+            {'results': results}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    def _set_labels(self, labels_by_issue, replace=True):
+        """Set the labels of issues with one delete and one insert."""
+        if not labels_by_issue:
+            return
+        label_ids = resolve_label_ids(
+            label['name']
+            for labels in labels_by_issue.values()
+            for label in labels
+        )
+        IssueLabel = Issue.labels.through
+        old_pairs = set()
+        if replace:
+            rows = IssueLabel.objects.filter(issue_id__in=labels_by_issue)
+            old_pairs = set(rows.values_list('issue_id', 'label_id'))
+            rows.delete()
+        new_pairs = {
+            (issue_id, label_ids[label['name']])
+            for issue_id, labels in labels_by_issue.items()
+            for label in labels
+        }
+        IssueLabel.objects.bulk_create(
+            [
+                IssueLabel(issue_id=issue_id, label_id=label_id)
+                for issue_id, label_id in new_pairs
+            ],
+            ignore_conflicts=True,
+        )
+
+        # The through rows bypass the signals maintaining the label stats.
+        project_id = int(self.kwargs['project_id'])
+        deltas = defaultdict(int)
+        for pairs, sign in ((new_pairs, 1), (old_pairs, -1)):
+            for _, label_id in pairs:
+                deltas[project_id, label_id] += sign
+        counters.adjust_labels(deltas)
+
+    def create_many(self, request, project_id=None):
+        """Create a list of issues in one transaction."""
+        project = get_object_or_404(Project, id=project_id)
+        items, results = self._validate_items(IssueBulkCreateSerializer)
+        if None in items:
+            return self._failed_response(results)
+
+        with transaction.atomic():
+            labels = [item.pop('labels', []) for item in items]
+            issues = Issue.objects.bulk_create(
+                Issue(project=project, created_by=request.user, **item)
+                for item in items
+            )
+            self._set_labels({
+                issue.id: issue_labels
+                for issue, issue_labels in zip(issues, labels)
+                if issue_labels
+            }, replace=False)
+            index_issues(issue.id for issue in issues)
+            # Bulk writes bypass the signals maintaining derived data.
+            counters.adjust(added=map(counters.counted_state, issues))
+            Project.objects.filter(id=project.id).bump_data_version()
+            changes.record(
+                (project.id, 'issue.created', changes.issue_data(issue))
+                for issue in issues
+            )
+
+        for result, issue in zip(results, issues):
+            result.update({'status': status.HTTP_201_CREATED, 'id': issue.id})
+        return Response(
+            {'results': results}, status=status.HTTP_201_CREATED
+        )
+
+    def update_many(self, request, project_id=None):
+        """Apply per-issue partial updates in one transaction."""
+        items, results = self._validate_items(
+            IssueBulkUpdateSerializer, partial=True
+        )
+        issues = self.get_queryset().in_bulk(
+            [item['id'] for item in items if item]
+        )
+        for index, item in enumerate(items):
+            if item and item['id'] not in issues:
+                items[index] = None
+                results[index].update({
+                    'status': status.HTTP_404_NOT_FOUND,
+                    'errors': {'id': ['Issue does not exist.']},
+                })
+        if None in items:
+            return self._failed_response(results)
+
+        old_states = list(map(counters.counted_state, issues.values()))
+        now = timezone.now()
+        fields = {'updated_at'}
+        labels_by_issue = {}
+        for item in items:
+            issue = issues[item.pop('id')]
+            if 'labels' in item:
+                labels_by_issue[issue.id] = item.pop('labels')
+            for attr, value in item.items():
+                setattr(issue, attr, value)
+            issue.updated_at = now
+            fields.update(item)
+
+        with transaction.atomic():
+            Issue.objects.bulk_update(issues.values(), sorted(fields))
+            self._set_labels(labels_by_issue)
+            if fields & {'title', 'description'}:
+                index_issues(issues.keys())
+            counters.adjust(
+                added=map(counters.counted_state, issues.values()),
+                removed=old_states,
+            )
+            Project.objects.filter(id=project_id).bump_data_version()
+            changes.record(
+                (project_id, 'issue.updated', changes.issue_data(issue))
+                for issue in issues.values()
+            )
+
+        for result in results:
+            result['status'] = status.HTTP_200_OK
+        return Response({'results': results})
+
+    def update_matching(self, request, project_id=None):
+        """Update every issue matching the filter params in one UPDATE."""
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.get_queryset(),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        if not set(request.query_params) & set(filterset.filters):
+            raise ValidationError(
+                'At least one filter is required to update matching issues.'
+            )
+
+        serializer = IssueMassUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        values = serializer.validated_data
+        if 'assigned_to_id' in values and not get_user_model().objects.filter(
+            id=values['assigned_to_id']
+        ).exists():
+            raise ValidationError(
+                {'assigned_to_id': ['User does not exist.']}
+            )
+
+        matching = Issue.objects.filter(id__in=filterset.qs.values('id'))
+        old_states = []
+        if set(values) & set(counters.COUNTED_FIELDS):
+            old_states = list(matching.order_by().values(
+                *counters.COUNTED_FIELDS
+            ).annotate(count=Count('id')))
+        with transaction.atomic():
+            updated = matching.update(updated_at=timezone.now(), **values)
+            if old_states:
+                counters.adjust(
+                    added=[{**state, **values} for state in old_states],
+                    removed=old_states,
+                )
+            if updated:
+                Project.objects.filter(id=project_id).bump_data_version()
+                # The matching issues are not read; clients refetch them.
+                changes.record([(
+                    project_id, 'issues.updated',
+                    {'count': updated, 'values': values},
+                )])
+        return Response({'updated': updated})
+
+    def destroy_many(self, request, project_id=None):
+        """Delete a list of issues by id in one transaction."""
+        ids = request.data.get('ids') if isinstance(request.data, dict) \
+            else None
+        if not isinstance(ids, list) or not ids or not all(
+            isinstance(issue_id, int) for issue_id in ids
+        ):
+            raise ValidationError({'ids': ['Expected a list of issue ids.']})
+        if len(ids) > BULK_MAX_ITEMS:
+            raise ValidationError(
+                f'At most {BULK_MAX_ITEMS} issues can be sent at once.'
+            )
+
+        IssueLabel = Issue.labels.through
+        with transaction.atomic():
+            states = list(self.get_queryset().filter(id__in=ids).values(
+                'id', *counters.COUNTED_FIELDS
+            ))
+            deleted = [state.pop('id') for state in states]
+            label_counts = list(IssueLabel.objects.filter(
+                issue_id__in=deleted
+            ).values_list('label_id').annotate(count=Count('id')))
+            # Bulk deletes bypass the signals maintaining derived data, so
+            # the rows are deleted without collecting them first.
+            for model, lookup in (
+                (Comment, 'issue_id__in'),
+                (IssueLabel, 'issue_id__in'),
+                (Issue, 'id__in'),
+            ):
+                rows = model.objects.filter(**{lookup: deleted})
+                rows._raw_delete(rows.db)
+            remove_issues(deleted)
+            counters.adjust(removed=states)
+            counters.adjust_labels({
+                (project_id, label_id): -count
+                for label_id, count in label_counts
+            })
+            sync.record_deletions(project_id, deleted)
+            if deleted:
+                Project.objects.filter(id=project_id).bump_data_version()
+            changes.record(
+                (project_id, 'issue.deleted', {'id': issue_id})
+                for issue_id in deleted
+            )
+
+        return Response({'results': [
+            {
+                'id': issue_id,
+                'status': status.HTTP_204_NO_CONTENT if issue_id in deleted
+                else status.HTTP_404_NOT_FOUND,
+            }
+            for issue_id in ids
+        ]})
+
+
+class ProjectEventsViewSet(AsyncViewSetMixin, viewsets.GenericViewSet):
+    """
+    Live changes of the issues and comments of a project, as Server-Sent
+    Events. Streams wait on the event loop, so they are only served under
+    ASGI (ASYNC_VIEWS): under WSGI every open stream would hold a worker.
+    """
+    authentication_classes = [QueryParamJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsProjectMember]
+    renderer_classes = [EventStreamRenderer]
+
+    def initial(self, request, *args, **kwargs):
+        if not settings.ASYNC_VIEWS:
+            raise StreamsUnavailable()
+        super().initial(request, *args, **kwargs)
+
+    async def stream(self, request, project_id=None):
+        """Stream the changes of the project from the Last-Event-ID on."""
+        last_event_id = request.headers.get('Last-Event-ID') \
+            or request.query_params.get('last_event_id')
+        if last_event_id is not None:
+            try:
+                last_event_id = int(last_event_id)
+            except ValueError:
+                raise ValidationError(
+                    {'last_event_id': ['Expected an event id.']}
+                )
+        response = StreamingHttpResponse(
+            changes.stream(project_id, last_event_id),
+            content_type='text/event-stream; charset=utf-8',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Proxies must pass events on as they come.
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,132 @@
+"""
+JWT authentication serving users from a short-lived in-process cache.
+
+Tokens carry the ``auth_version`` of their user in a ``user_version``
+claim. A cached user is only used while its version matches the token's,
+so a token issued after a change always reloads the user, and the row is
+reloaded at least every ``USER_CACHE_TTL`` seconds. Changes made in this
+process evict the user at once; a token revoked by another process stays
+usable for at most the TTL.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.profiling import phase
+
+USER_VERSION_CLAIM = 'user_version'
+USER_CACHE_TTL = 30
+CACHE_SIZE = 10000
+
+
+class UserCache:
+    """Bounded LRU of users expiring after a TTL."""
+
+    def __init__(self, ttl=USER_CACHE_TTL, maxsize=CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the cached user with user_id, or None."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Views may modify request.user, so each request gets its own copy.
+        user = copy.copy(user)
+        user.from_cache = True
+        return user
+
+    def set(self, user):
+        with self._lock:
+            self._entries[user.id] = (
+                copy.copy(user), time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication resolving users without a query when cached."""
+
+    def authenticate(self, request):
+        with phase(request, 'auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            # The claim holds the id as a string.
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            ) from e
+        # Tokens issued before the claim existed match the initial version.
+        version = validated_token.get(USER_VERSION_CLAIM, 0)
+
+        user = user_cache.get(user_id)
+        if user is not None and user.auth_version == version:
+            return user
+
+        try:
+            user = get_user_model().objects.get(id=user_id)
+        except get_user_model().DoesNotExist as e:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            ) from e
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        if user.auth_version != version:
+            raise AuthenticationFailed(
+                _('Token has been revoked'), code='token_revoked'
+            )
+
+        user_cache.set(user)
+        return user
+
+
+class QueryParamJWTAuthentication(CachedJWTAuthentication):
+    """
+    CachedJWTAuthentication also accepting the access token as the
+    ``token`` query param, for clients like EventSource that cannot set
+    headers.
+    """
+
+    def authenticate(self, request):
+        if self.get_header(request) is not None:
+            return super().authenticate(request)
+        raw_token = request.query_params.get('token')
+        if not raw_token:
+            return None
+        with phase(request, 'auth'):
+            validated_token = self.get_validated_token(raw_token.encode())
+            return self.get_user(validated_token), validated_token
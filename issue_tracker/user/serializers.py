@@ -8,6 +8,9 @@ from django.contrib.auth import (
 from django.utils.translation import gettext as _
 
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from user.authentication import USER_VERSION_CLAIM
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -59,3 +62,13 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Serializer issuing tokens that carry the user's auth version."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[USER_VERSION_CLAIM] = user.auth_version
+        return token
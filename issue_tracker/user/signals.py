@@ -0,0 +1,21 @@
+"""
+Signal handlers evicting users from the authentication cache.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import ProjectMembership, User
+from user.authentication import user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.id)
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def evict_member(sender, instance, **kwargs):
+    """Reload the member so its new membership version is seen."""
+    user_cache.invalidate(instance.user_id)
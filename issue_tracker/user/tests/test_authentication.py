@@ -0,0 +1,113 @@
+"""
+Tests for the cached JWT authentication.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.authentication import user_cache
+
+
+TOKEN_URL = reverse('user:token_obtain_pair')
+REFRESH_URL = reverse('user:token_refresh')
+ME_URL = reverse('user:me')
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test authenticating with tokens and revoking them."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123', name='Test'
+        )
+        self.client = APIClient()
+        res = self.client.post(
+            TOKEN_URL, {'email': 'test@example.com', 'password': 'testpass123'}
+        )
+        self.access = res.data['access']
+        self.refresh = res.data['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def test_user_cached(self):
+        """Test only the first request with a token loads the user."""
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_password_change_revokes_tokens(self):
+        """Test tokens issued before a password change are rejected."""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {'password': 'newpass123'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(REFRESH_URL, {'refresh': self.refresh})
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {res.data["access"]}'
+        )
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_admin_deactivation_revokes_tokens(self):
+        """Test deactivating a user in the admin rejects its tokens."""
+        self.client.get(ME_URL)
+        admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass123'
+        )
+        admin_client = APIClient()
+        admin_client.force_login(admin_user)
+
+        url = reverse('admin:core_user_change', args=[self.user.id])
+        res = admin_client.post(url, {
+            'email': self.user.email,
+            'name': self.user.name,
+            'is_active': False,
+        })
+        self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_keeps_access_changed_elsewhere(self):
+        """Test updates through a cached user keep access changes."""
+        self.client.get(ME_URL)
+        # Changed by another process: the cached copy is not evicted.
+        get_user_model().objects.filter(id=self.user.id).update(
+            is_active=False, auth_version=F('auth_version') + 1
+        )
+
+        res = self.client.patch(ME_URL, {'name': 'New name'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'New name')
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.auth_version, 2)
+
+    def test_cached_copy_never_saves_access_fields(self):
+        """Test saving a cached user leaves its access fields alone."""
+        self.client.get(ME_URL)
+        cached = user_cache.get(self.user.id)
+        get_user_model().objects.filter(id=self.user.id).update(
+            is_active=False
+        )
+
+        cached.name = 'New name'
+        cached.save()
+        cached.is_active = True
+        cached.save(update_fields=['is_active'])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'New name')
+        self.assertFalse(self.user.is_active)
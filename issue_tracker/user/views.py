@@ -1,10 +1,10 @@
 """
 Views for the user API.
 """
+from django.contrib.auth import get_user_model
 from rest_framework import generics, permissions
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
-# Create your views here.
+from user.authentication import CachedJWTAuthentication
 from user.serializers import (
     UserSerializer,
 )
@@ -18,9 +18,13 @@ class CreateUserView(generics.CreateAPIView):
 class UserMangerView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authenticated user."""
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # request.user may be a stale cached copy; updates start from the
+        # current row.
+        return get_user_model().objects.get(pk=self.request.user.pk)
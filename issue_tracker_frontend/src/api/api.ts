@@ -63,6 +63,11 @@ export const getIssuesAssignedTo = () => {
   return axiosInstance.get('/issues/assigned');
 };
 
+// Follows the `next` link of a cursor-paginated list.
+export const getNextPage = (url: string) => {
+  return axiosInstance.get(url);
+};
+
 export const getIssueDetails = (issueId: number) => {
   return axiosInstance.get(`/issues/${issueId}/`);
 };
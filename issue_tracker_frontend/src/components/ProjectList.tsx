@@ -28,11 +28,7 @@ const ProjectList: React.FC<Props> = ({ projects }) => {
               <div className="d-flex justify-content-between align-items-center">
                 <Card.Title>{project.name}</Card.Title>
                 <Badge bg="primary">
-                  {
-                    project.issues.filter((issue) => issue.status === "Open")
-                      .length
-                  }{" "}
-                  open
+                  {project.open_issue_count} open
                 </Badge>
               </div>
               <Card.Text className="text-muted">
@@ -18,7 +18,12 @@ export interface Project {
   name: string;
   members: User[];
   memberships: Membership[];
-  issues: Issue[];
+  open_issue_count: number;
+  closed_issue_count: number;
+  high_priority_issue_count: number;
+  overdue_issue_count: number;
+  member_count: number;
+  issues_url: string;
   description: string;
 }
 
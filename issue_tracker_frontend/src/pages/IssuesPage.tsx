@@ -1,7 +1,7 @@
 // src/pages/IssuesPage.tsx
 import React, { useState, useEffect } from "react";
-import { Tabs, Tab, Container, Row, Col, Spinner } from "react-bootstrap";
-import { getIssuesCreatedBy, getIssuesAssignedTo } from "../api/api";
+import { Tabs, Tab, Container, Row, Col, Spinner, Button } from "react-bootstrap";
+import { getIssuesCreatedBy, getIssuesAssignedTo, getNextPage } from "../api/api";
 import IssueContainer from "../components/IssueContainer";
 import { Issue } from "../interfaces/interfaces";
 import styles from "./IssueDetailsPage.module.css";
@@ -10,16 +10,21 @@ const IssuesPage: React.FC = () => {
   const [key, setKey] = useState("createdBy");
   const [createdByIssues, setCreatedByIssues] = useState<Issue[]>([]);
   const [assignedToIssues, setAssignedToIssues] = useState<Issue[]>([]);
+  const [createdByNext, setCreatedByNext] = useState<string | null>(null);
+  const [assignedToNext, setAssignedToNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true); 
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchIssues = async () => {
       try {
         setLoading(true); 
         const createdByResponse = await getIssuesCreatedBy();
-        setCreatedByIssues(createdByResponse.data);
+        setCreatedByIssues(createdByResponse.data.results);
+        setCreatedByNext(createdByResponse.data.next);
         const assignedToResponse = await getIssuesAssignedTo();
-        setAssignedToIssues(assignedToResponse.data);
+        setAssignedToIssues(assignedToResponse.data.results);
+        setAssignedToNext(assignedToResponse.data.next);
         setLoading(false); 
       } catch (error) {
         console.error("Failed to fetch issues", error);
@@ -28,6 +33,40 @@ const IssuesPage: React.FC = () => {
     fetchIssues();
   }, []);
 
+  const loadMore = async (
+    url: string,
+    setIssues: React.Dispatch<React.SetStateAction<Issue[]>>,
+    setNext: (next: string | null) => void
+  ) => {
+    setLoadingMore(true);
+    try {
+      const response = await getNextPage(url);
+      setIssues((issues) => [...issues, ...response.data.results]);
+      setNext(response.data.next);
+    } catch (error) {
+      console.error("Failed to fetch more issues", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMoreButton = (
+    next: string | null,
+    setIssues: React.Dispatch<React.SetStateAction<Issue[]>>,
+    setNext: (next: string | null) => void
+  ) =>
+    next && (
+      <div className="d-flex justify-content-center my-3">
+        <Button
+          variant="outline-primary"
+          disabled={loadingMore}
+          onClick={() => loadMore(next, setIssues, setNext)}
+        >
+          {loadingMore ? "Loading..." : "Load more"}
+        </Button>
+      </div>
+    );
+
   return (
     <div className="login-container">
       {loading && (
@@ -49,6 +88,7 @@ const IssuesPage: React.FC = () => {
               </Col>
             ))}
           </Row>
+          {loadMoreButton(createdByNext, setCreatedByIssues, setCreatedByNext)}
         </Tab>
         <Tab eventKey="assignedTo" title="Assigned to">
           <Row>
@@ -58,6 +98,7 @@ const IssuesPage: React.FC = () => {
               </Col>
             ))}
           </Row>
+          {loadMoreButton(assignedToNext, setAssignedToIssues, setAssignedToNext)}
         </Tab>
       </Tabs>
     </Container>
@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useMemo } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import { getIssuesForProject, getProjectMembers } from "../api/api";
+import { getIssuesForProject, getNextPage, getProjectMembers } from "../api/api";
 import IssueContainer from "../components/IssueContainer";
 import Select from 'react-select';
 import {
@@ -25,7 +25,10 @@ const ProjectIssues: React.FC = () => {
   const { projectId } = useParams();
   const navigate = useNavigate();
   const [issues, setIssues] = useState<Issue[]>([]);
+  // The `next` link of the last page of issues loaded, if any.
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
   const [sortBy, setSortBy] = useState("date");
   const [sortOrder, setSortOrder] = useState("desc");
@@ -47,7 +50,8 @@ const ProjectIssues: React.FC = () => {
             selectedLabels,
             selectedAssignees
           );
-          setIssues(response.data);
+          setIssues(response.data.results);
+          setNextUrl(response.data.next);
         } finally {
           setLoading(false);
         }
@@ -119,6 +123,20 @@ const ProjectIssues: React.FC = () => {
   const currentItems = filteredIssues.slice(indexOfFirstItem, indexOfLastItem);
   const totalPages = Math.ceil(filteredIssues.length / itemsPerPage);
 
+  const handleLoadMore = async () => {
+    if (!nextUrl) {
+      return;
+    }
+    setLoadingMore(true);
+    try {
+      const response = await getNextPage(nextUrl);
+      setIssues((loaded) => [...loaded, ...response.data.results]);
+      setNextUrl(response.data.next);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreateIssue = () => {
     navigate(`/project/${projectId}/issues/create`);
   };
@@ -251,6 +269,17 @@ const ProjectIssues: React.FC = () => {
           />
         </Pagination>
       </div>
+      {nextUrl && (
+        <div className="d-flex justify-content-center mt-2">
+          <Button
+            variant="outline-primary"
+            disabled={loadingMore}
+            onClick={handleLoadMore}
+          >
+            {loadingMore ? "Loading..." : "Load more issues"}
+          </Button>
+        </div>
+      )}
     </Container>
   );
 };